@@ -1,6 +1,4 @@
 from django.contrib.auth.models import User
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny
@@ -8,6 +6,15 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from monitoring import metrics
+from ticketing.docs import openapi, swagger_auto_schema
+
+SIGN_UPS = metrics.counter(
+    "ticketing_sign_ups_total",
+    "Sign-up attempts by outcome: succeeded or rejected.",
+    ["outcome"],
+)
+
 
 class SignUpView(APIView):
     """
@@ -62,6 +69,7 @@ class SignUpView(APIView):
 
         user = self._create_user(username, password)
         token = self._get_or_create_token(user)
+        SIGN_UPS.inc(outcome="succeeded")
 
         return Response(
             {"token": token.key},
@@ -92,6 +100,7 @@ class SignUpView(APIView):
         :return: The HTTP response object.
         :rtype: Response
         """
+        SIGN_UPS.inc(outcome="rejected")
         return Response(
             {"error": message},
             status=status_code,
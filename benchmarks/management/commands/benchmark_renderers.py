@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import renderers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the render time and the bytes on the wire of seat maps rendered "
+        "with DRF's JSON renderer, the orjson renderer and the run-length encoding."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=lambda value: [int(size) for size in value.split(",")],
+            default=[1000, 10000, 50000],
+            help="Comma separated numbers of seats.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'renderer':<8} {'seats':>7} {'render ms':>10} {'gzip ms':>8} "
+            f"{'bytes':>9} {'gzip':>8} {'brotli':>8}"
+        )
+        for size in options["sizes"]:
+            for result in renderers.run(size, repeat=options["repeat"]):
+                brotli_bytes = result["brotli_bytes"]
+                self.stdout.write(
+                    f"{result['name']:<8} {result['seats']:>7} "
+                    f"{result['render_ms']:>10.2f} {result['gzip_ms']:>8.2f} "
+                    f"{result['bytes']:>9} {result['gzip_bytes']:>8} "
+                    f"{brotli_bytes if brotli_bytes is not None else '-':>8}"
+                )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import serializers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the DRF model serializers and JSON renderer with the fast-path "
+        "read serializers and renderer, in µs per object."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=lambda value: [int(size) for size in value.split(",")],
+            default=[1000, 10000],
+            help="Comma separated numbers of objects to serialize.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'benchmark':<20} {'objects':>8} {'current µs':>11} "
+            f"{'fast µs':>9} {'speedup':>8}"
+        )
+        for size in options["sizes"]:
+            for result in serializers.run(size, repeat=options["repeat"]):
+                self.stdout.write(
+                    f"{result['name']:<20} {result['objects']:>8} "
+                    f"{result['current_us_per_object']:>11.2f} "
+                    f"{result['fast_us_per_object']:>9.2f} "
+                    f"{result['speedup']:>7.1f}x"
+                )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a worker in a fresh interpreter under `python -X importtime` and "
+        "report where its start-up time goes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module",
+            default="ticketing.settings",
+            help="Settings module of the measured worker, e.g. "
+            "ticketing.settings_production.",
+        )
+        parser.add_argument("--top", type=int, default=15)
+
+    def handle(self, *args, **options):
+        summary = startup.summarize(
+            startup.measure_imports(options["settings_module"]), top=options["top"]
+        )
+
+        self.stdout.write(
+            f"{options['settings_module']}: {summary['modules']} modules imported "
+            f"in {summary['total_ms']:.1f}ms"
+        )
+        self.stdout.write("\nPackages by self time:")
+        for package, milliseconds in summary["packages"]:
+            self.stdout.write(f"  {milliseconds:>8.1f}ms  {package}")
+        self.stdout.write("\nModules by cumulative time:")
+        for module, milliseconds in summary["slowest"]:
+            self.stdout.write(f"  {milliseconds:>8.1f}ms  {module}")
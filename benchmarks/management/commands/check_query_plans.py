@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a season in a rolled back transaction, explain every query of the "
+        "hot paths and fail on full scans and sorts that no index serves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--matches", type=int, default=200)
+        parser.add_argument("--seats-per-match", type=int, default=500)
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the plan of every query, not only of those with problems.",
+        )
+
+    def handle(self, *args, **options):
+        results = query_plans.check(options["matches"], options["seats_per_match"])
+
+        failed = [result for result in results if result["problems"]]
+        for result in results if options["verbose_plans"] else failed:
+            self.stdout.write(query_plans.format_result(result) + "\n")
+
+        paths = len({result["path"] for result in results})
+        if failed:
+            raise CommandError(
+                f"{len(failed)} of {len(results)} queries in {paths} hot paths "
+                "are not served by an index."
+            )
+        self.stdout.write(f"{len(results)} queries in {paths} hot paths use indexes.")
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the facade lookups, validators, serializers, sign-up and the reserve "
+        "flow at several numbers of seats, or compare two runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=lambda value: [int(size) for size in value.split(",")],
+            default=[1000, 100000, 1000000],
+            help="Comma separated numbers of seats to seed.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--benchmark",
+            action="append",
+            dest="names",
+            help="Only run this benchmark; can be given several times.",
+        )
+        parser.add_argument(
+            "--output", type=Path, help="Write the results to this JSON file."
+        )
+        parser.add_argument(
+            "--compare",
+            nargs=2,
+            type=Path,
+            metavar=("BASELINE", "CURRENT"),
+            help="Compare two result files instead of running the benchmarks.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Slowdown in percent flagged as a regression by --compare.",
+        )
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            return self.compare(*options["compare"], options["threshold"] / 100)
+
+        results = []
+        self.stdout.write(f"{'benchmark':<45} {'seats':>8} {'µs/call':>11}")
+        for size in options["sizes"]:
+            for result in suite.run(size, options["repeat"], options["names"]):
+                results.append(result)
+                self.stdout.write(
+                    f"{result['name']:<45} {result['size']:>8} "
+                    f"{result['us_per_call']:>11.1f}"
+                )
+        if options["output"]:
+            suite.save(options["output"], results)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def compare(self, baseline: Path, current: Path, threshold: float):
+        comparisons = suite.compare(
+            suite.load(baseline), suite.load(current), threshold
+        )
+        self.stdout.write(
+            f"{'benchmark':<45} {'seats':>8} {'before µs':>11} {'after µs':>11} "
+            f"{'change':>8}"
+        )
+        for comparison in comparisons:
+            self.stdout.write(
+                f"{comparison['name']:<45} {comparison['size']:>8} "
+                f"{comparison['baseline_us']:>11.1f} {comparison['current_us']:>11.1f} "
+                f"{comparison['change']:>+8.1%}"
+                + ("  REGRESSION" if comparison["regression"] else "")
+            )
+
+        regressions = [c for c in comparisons if c["regression"]]
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} of {len(comparisons)} benchmarks are more than "
+                f"{threshold:.0%} slower."
+            )
@@ -0,0 +1,376 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from benchmarks.utils import rolled_back
+from jobs import facade as jobs_facade
+from matches import facade as matches_facade
+from matches.models import Match, MatchParticipation, Seat, SeatEvent, Team
+from matches.seatmap import invalidate_seat_map
+from matches.serializers import MatchSerializer
+from outbox import facade as outbox_facade
+from reservation import archive, export, tickets
+from reservation import facade as reservation_facade
+from reservation.models import Reservation
+from stadiums.models import Stadium
+
+# Statements whose plan is not worth checking.
+SKIPPED = ("INSERT", "SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT", "EXPLAIN")
+
+SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)")
+POSTGRESQL_SCAN = re.compile(r"\bSeq Scan on (\w+)")
+
+
+@dataclass
+class Seed:
+    """
+    The rows seeded for the hot paths, and a few of them to query.
+    """
+
+    admin: User
+    user: User
+    stadium: Stadium
+    match: Match
+    seat: Seat
+    reservation: Reservation
+    teams: list[Team] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class HotPath:
+    """
+    A hot code path whose queries must be served by indexes.
+
+    `run` is called with the seed in a transaction that is rolled back afterwards,
+    and every query it sends is explained. A full scan of a table fails the check
+    unless the table is in `allow_scans`, and so does a sort the plan cannot
+    avoid with an index unless `allow_sort` is set.
+    """
+
+    name: str
+    run: Callable[[Seed], object]
+    allow_scans: tuple[str, ...] = ()
+    allow_sort: bool = False
+
+
+HOT_PATHS: list[HotPath] = []
+
+
+def hot_path(name: str, allow_scans: tuple[str, ...] = (), allow_sort: bool = False):
+    """
+    Register a function as a hot path, see `HotPath`.
+    """
+
+    def decorator(function: Callable[[Seed], object]):
+        HOT_PATHS.append(HotPath(name, function, allow_scans, allow_sort))
+        return function
+
+    return decorator
+
+
+def seed(matches: int, seats_per_match: int) -> Seed:
+    """
+    Seed a season: `matches` matches over as many days at ten stadiums between
+    twenty teams, each with `seats_per_match` seats, a third of them reserved.
+    The last match is archived, unless it is the only one.
+    """
+    admin = User.objects.create_superuser(username="plans_admin")
+    user = User.objects.create_user(username="plans_user")
+    stadiums = Stadium.objects.bulk_create(
+        Stadium(name=f"Plans {number}", location="Plans City") for number in range(10)
+    )
+    teams = Team.objects.bulk_create(Team(name=f"Plans {n}") for n in range(20))
+    start = timezone.localdate() + timedelta(days=1)
+    created = Match.objects.bulk_create(
+        Match(
+            stadium=stadiums[number % 10],
+            home_side=teams[number % 10 * 2],
+            away_side=teams[number % 10 * 2 + 1],
+            match_day=start + timedelta(days=number // 10),
+            match_time=time(18),
+        )
+        for number in range(matches)
+    )
+    MatchParticipation.objects.bulk_create(
+        MatchParticipation(
+            team_id=team_id,
+            match=match,
+            match_day=match.match_day,
+            match_time=match.match_time,
+        )
+        for match in created
+        for team_id in (match.home_side_id, match.away_side_id)
+    )
+    if matches > 1:
+        Match.objects.filter(id=created[-1].id).update(
+            match_day=date(2000, 1, 1), archived_at=timezone.now()
+        )
+
+    # One match at a time, so seeding a million seats never holds them all.
+    for match in created:
+        seats = Seat.objects.bulk_create(
+            Seat(match=match, seat_number=number, is_reserved=number % 3 == 0)
+            for number in range(1, seats_per_match + 1)
+        )
+        reserved = [seat for seat in seats if seat.is_reserved]
+        Reservation.objects.bulk_create(
+            Reservation(user=user, match=match, seat=seat) for seat in reserved
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SeatEvent._meta.db_table} "
+                "(match_id, seat_id, old_state, new_state, created_at) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [
+                    (match.id, seat.id, "available", "reserved", timezone.now())
+                    for seat in reserved
+                ],
+            )
+        invalidate_seat_map(match.id)
+    with connection.cursor() as cursor:
+        # Give the planner the statistics it has in production.
+        cursor.execute("ANALYZE")
+
+    match = created[matches // 2]
+    seat = Seat.objects.filter(match=match, is_reserved=False).first()
+    return Seed(
+        admin=admin,
+        user=user,
+        stadium=stadiums[0],
+        match=match,
+        seat=seat,
+        reservation=Reservation.objects.filter(match=match).first(),
+        teams=teams,
+    )
+
+
+def explain(sql: str, params=None) -> list[str]:
+    """
+    :return: The plan of a query, one line per step.
+    :rtype: list[str]
+    """
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return [" ".join(str(value) for value in row) for row in cursor.fetchall()]
+
+
+def find_problems(
+    plan: list[str], allow_scans: tuple[str, ...] = (), allow_sort: bool = False
+) -> list[str]:
+    """
+    :param plan: The plan of a query, as returned by `explain`.
+    :type plan: list[str]
+    :param allow_scans: The tables the query may scan.
+    :type allow_scans: tuple[str, ...]
+    :param allow_sort: Whether the query may sort rows that no index orders.
+    :type allow_sort: bool
+    :return: The full scans and sorts of the plan that are not allowed.
+    :rtype: list[str]
+    """
+    problems = []
+    for line in plan:
+        scan = SQLITE_SCAN.search(line) or POSTGRESQL_SCAN.search(line)
+        if scan and scan[1] not in allow_scans:
+            problems.append(f"full scan of {scan[1]}")
+        if not allow_sort and ("USE TEMP B-TREE" in line or "Sort  (" in line):
+            problems.append("sort without an index")
+    return problems
+
+
+def check(matches: int = 200, seats_per_match: int = 500) -> list[dict]:
+    """
+    Explain every query of the hot paths on seeded data.
+
+    :param matches: The number of matches to seed.
+    :type matches: int
+    :param seats_per_match: The number of seats of each match.
+    :type seats_per_match: int
+    :return: One result per query: the hot path, the SQL, its plan and its
+        problems.
+    :rtype: list[dict]
+    """
+    results = []
+    with rolled_back():
+        seeded = seed(matches, seats_per_match)
+        for path in HOT_PATHS:
+            queries = []
+
+            def record(execute, sql, params, many, context):
+                if not many and not sql.lstrip().upper().startswith(SKIPPED):
+                    queries.append((sql, params))
+                return execute(sql, params, many, context)
+
+            # The API paths go through the test client, whose host is `testserver`.
+            hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+            with rolled_back(), override_settings(ALLOWED_HOSTS=hosts):
+                with connection.execute_wrapper(record):
+                    path.run(seeded)
+            for sql, params in queries:
+                plan = explain(sql, params)
+                results.append(
+                    {
+                        "path": path.name,
+                        "sql": sql,
+                        "plan": plan,
+                        "problems": find_problems(
+                            plan, path.allow_scans, path.allow_sort
+                        ),
+                    }
+                )
+    return results
+
+
+@hot_path("matches.facade.get_match_by_id")
+def _get_match(seed: Seed):
+    matches_facade.get_match_by_id(seed.match.id)
+
+
+@hot_path("matches.facade.get_unreserved_seat_by_id")
+def _get_unreserved_seat(seed: Seed):
+    matches_facade.get_unreserved_seat_by_id(seed.seat.id, seed.match.id)
+
+
+@hot_path("matches.facade.safe_reserve_seat_by_id")
+def _safe_reserve_seat(seed: Seed):
+    matches_facade.safe_reserve_seat_by_id(seed.seat.id, seed.seat.updated_at)
+
+
+@hot_path("matches.facade.add_seats")
+def _add_seats(seed: Seed):
+    matches_facade.add_seats(seed.match.id, [100001, 100002])
+
+
+@hot_path("matches.facade.mark_seats_sold")
+def _mark_seats_sold(seed: Seed):
+    matches_facade.mark_seats_sold(
+        Seat.objects.filter(match=seed.match, seat_number__lte=10)
+    )
+
+
+@hot_path("matches.facade.get_seat_events_after")
+def _get_seat_events(seed: Seed):
+    matches_facade.get_seat_events_after(0, match_id=seed.match.id, limit=100)
+
+
+@hot_path("MatchSerializer validation")
+def _validate_match(seed: Seed):
+    MatchSerializer(
+        data={
+            "stadium": seed.stadium.id,
+            "home_side": seed.teams[0].name,
+            "away_side": seed.teams[5].name,
+            "match_day": seed.match.match_day,
+            "match_time": "18:00:00",
+        }
+    ).is_valid()
+
+
+@hot_path("reserve a seat")
+def _reserve(seed: Seed):
+    client = APIClient()
+    client.force_authenticate(user=seed.user)
+    client.post(
+        "/api/reservation/reserve/", {"match": seed.match.id, "seat": seed.seat.id}
+    )
+
+
+# A team has a few dozen home matches a season, sorted by kick-off in memory.
+@hot_path("reserve a season", allow_sort=True)
+def _reserve_season(seed: Seed):
+    client = APIClient()
+    client.force_authenticate(user=seed.user)
+    client.post(
+        "/api/reservation/reserve/season/",
+        {"seat_number": 1, "team": seed.match.home_side_id},
+        format="json",
+    )
+
+
+# A page of upcoming matches is read in the order of the index. Counting them reads
+# at most `EstimatedCountPaginator.exact_count_limit` rows into a subquery.
+@hot_path("match list", allow_scans=("matches_match", "subquery"))
+def _match_list(seed: Seed):
+    client = APIClient()
+    client.force_authenticate(user=seed.user)
+    client.get("/api/matches/")
+
+
+@hot_path("seat map")
+def _seat_map(seed: Seed):
+    client = APIClient()
+    client.force_authenticate(user=seed.user)
+    client.get(f"/api/matches/match/{seed.match.id}/seat-map/")
+
+
+@hot_path("reservation.facade.cancel_reservation")
+def _cancel_reservation(seed: Seed):
+    reservation_facade.cancel_reservation(seed.reservation.id, seed.user.id)
+
+
+@hot_path("reservation.facade.release_seats")
+def _release_seats(seed: Seed):
+    reservation_facade.release_seats(seed.match.id, seat_from=1, seat_to=30)
+
+
+# The tickets revoked since the last poll are few, so the planner may sort them
+# rather than read every cancellation of the match in ID order.
+@hot_path("reservation.facade.get_revoked_reservation_ids", allow_sort=True)
+def _revoked_reservations(seed: Seed):
+    reservation_facade.get_revoked_reservation_ids(
+        seed.match.id, since=timezone.now() - timedelta(hours=1)
+    )
+
+
+@hot_path("reservation.facade.check_in")
+def _check_in(seed: Seed):
+    reservation = seed.reservation
+    token = tickets.sign_ticket(
+        tickets.Ticket(
+            reservation.id, reservation.match_id, reservation.seat_id, seed.user.id
+        )
+    )
+    reservation_facade.check_in(
+        seed.match.id,
+        [{"ticket": token, "gate": "North", "scanned_at": timezone.now()}],
+    )
+
+
+# The export reads every reservation of the match, in seat order.
+@hot_path("reservation export", allow_sort=True)
+def _export(seed: Seed):
+    list(export.iter_export_rows(seed.match.id))
+
+
+@hot_path("reservation.archive.get_archivable_matches")
+def _archivable_matches(seed: Seed):
+    list(archive.get_archivable_matches(date(2001, 1, 1)))
+
+
+@hot_path("jobs.facade.claim_next_job")
+def _claim_job(seed: Seed):
+    jobs_facade.claim_next_job("plans")
+
+
+@hot_path("outbox.facade.claim_batch")
+def _claim_outbox(seed: Seed):
+    outbox_facade.claim_batch("plans", 100, 60)
+
+
+def format_result(result: dict) -> str:
+    """
+    :return: A result of `check` as text: the query, its plan and its problems.
+    :rtype: str
+    """
+    lines = [f"{result['path']}: {result['sql']}"]
+    lines += [f"    {line}" for line in result["plan"]]
+    lines += [f"    ! {problem}" for problem in result["problems"]]
+    return "\n".join(lines)
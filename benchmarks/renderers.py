@@ -0,0 +1,76 @@
+import gzip
+import random
+
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.utils import best_time
+from matches.renderers import SeatMapRLERenderer
+from ticketing.renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+RENDERERS = {
+    "json": JSONRenderer(),
+    "orjson": FastJSONRenderer(),
+    "rle": SeatMapRLERenderer(),
+}
+
+
+def make_seat_map(size: int, sold: float = 0.5) -> list[dict]:
+    """
+    Build the seat map of a venue with `size` seats, sold in blocks of 1 to 6 seats
+    as group bookings are, so the run-length encoding is not flattered.
+
+    :param size: The number of seats.
+    :type size: int
+    :param sold: The share of blocks that are sold.
+    :type sold: float
+    :return: The seat map, as `SeatMapSerializer` returns it.
+    :rtype: list[dict]
+    """
+    generator = random.Random(size)
+    seats = []
+    while len(seats) < size:
+        reserved = generator.random() < sold
+        for _ in range(generator.randint(1, 6)):
+            number = len(seats) + 1
+            seats.append({"id": number, "seat_number": number, "is_reserved": reserved})
+    return seats[:size]
+
+
+def run(size: int, repeat: int = 5) -> list[dict]:
+    """
+    Measure the render time and the bytes on the wire of a seat map per renderer.
+
+    :param size: The number of seats of the seat map.
+    :type size: int
+    :param repeat: The number of runs, of which the fastest is kept.
+    :type repeat: int
+    :return: One result per renderer, with the render and compression times in
+        milliseconds and the raw, gzip and (if installed) brotli sizes in bytes.
+    :rtype: list[dict]
+    """
+    seat_map = make_seat_map(size)
+    results = []
+    for name, renderer in RENDERERS.items():
+        content = renderer.render(seat_map)
+        gzipped = gzip.compress(content, compresslevel=6, mtime=0)
+        result = {
+            "name": name,
+            "seats": size,
+            "render_ms": best_time(lambda: renderer.render(seat_map), repeat) * 1000,
+            "gzip_ms": best_time(
+                lambda: gzip.compress(content, compresslevel=6, mtime=0), repeat
+            )
+            * 1000,
+            "bytes": len(content),
+            "gzip_bytes": len(gzipped),
+            "brotli_bytes": None,
+        }
+        if brotli is not None:
+            result["brotli_bytes"] = len(brotli.compress(content, quality=5))
+        results.append(result)
+    return results
@@ -0,0 +1,87 @@
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.utils import (
+    best_time,
+    rolled_back,
+    seed_matches,
+    seed_seats,
+    seed_stadiums,
+)
+from matches.models import Match, Seat
+from matches.serializers import (
+    MatchListSerializer,
+    MatchSerializer,
+    SeatMapSerializer,
+    SeatSerializer,
+)
+from stadiums.models import Stadium
+from stadiums.serializers import StadiumListSerializer, StadiumSerializer
+from ticketing.renderers import FastJSONRenderer
+
+
+def _compare(name: str, count: int, current, fast, repeat: int) -> dict:
+    current_time = best_time(current, repeat)
+    fast_time = best_time(fast, repeat)
+    return {
+        "name": name,
+        "objects": count,
+        "current_us_per_object": current_time / count * 1e6,
+        "fast_us_per_object": fast_time / count * 1e6,
+        "speedup": current_time / fast_time if fast_time else float("inf"),
+    }
+
+
+def run(size: int, repeat: int = 5) -> list[dict]:
+    """
+    Compare the `ModelSerializer` classes with their fast-path counterparts.
+
+    Each comparison serializes (and, for the renderers, renders) `size` objects
+    seeded in a rolled back transaction and reports µs per object.
+
+    :param size: The number of seats, and of matches and stadiums, to serialize.
+    :type size: int
+    :param repeat: The number of runs, of which the fastest is kept.
+    :type repeat: int
+    :return: One result per comparison.
+    :rtype: list[dict]
+    """
+    with rolled_back():
+        stadium = seed_stadiums(size)[0]
+        match = seed_matches(size, stadium)[0]
+        seed_seats(size, match)
+
+        stadiums = Stadium.objects.order_by("name", "location")
+        matches = Match.objects.order_by("match_day", "match_time", "id")
+        seats = Seat.objects.filter(match=match).order_by("seat_number")
+        seat_map = SeatMapSerializer(seats).data
+
+        return [
+            _compare(
+                "stadium list",
+                size,
+                lambda: StadiumSerializer(stadiums, many=True).data,
+                lambda: StadiumListSerializer(stadiums).data,
+                repeat,
+            ),
+            _compare(
+                "match list",
+                size,
+                lambda: MatchSerializer(matches, many=True).data,
+                lambda: MatchListSerializer(matches).data,
+                repeat,
+            ),
+            _compare(
+                "seat map",
+                size,
+                lambda: SeatSerializer(seats, many=True).data,
+                lambda: SeatMapSerializer(seats).data,
+                repeat,
+            ),
+            _compare(
+                "seat map rendering",
+                size,
+                lambda: JSONRenderer().render(seat_map),
+                lambda: FastJSONRenderer().render(seat_map),
+                repeat,
+            ),
+        ]
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Builds the WSGI application and resolves the URLconf, which imports every
+# middleware, view and serializer a worker needs before serving its first request.
+STARTUP_SCRIPT = (
+    "from django.core.wsgi import get_wsgi_application\n"
+    "get_wsgi_application()\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def measure_imports(settings_module: str) -> list[dict]:
+    """
+    Start a worker in a fresh interpreter under `-X importtime`.
+
+    :param settings_module: The Django settings module the worker starts with.
+    :type settings_module: str
+    :return: One entry per imported module with its `self_us`, `cumulative_us`
+        and nesting `depth`, in import completion order.
+    :rtype: list[dict]
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            }
+        )
+    return imports
+
+
+def summarize(imports: list[dict], top: int = 15) -> dict:
+    """
+    Summarize an import-time measurement.
+
+    :param imports: The result of `measure_imports`.
+    :type imports: list[dict]
+    :param top: The number of packages and modules to report.
+    :type top: int
+    :return: The total import time, the packages with the highest self time and
+        the modules with the highest cumulative time, all in milliseconds.
+    :rtype: dict
+    """
+    packages = defaultdict(int)
+    for entry in imports:
+        packages[entry["module"].split(".")[0]] += entry["self_us"]
+
+    return {
+        "total_ms": sum(e["self_us"] for e in imports) / 1000,
+        "modules": len(imports),
+        "packages": [
+            (package, self_us / 1000)
+            for package, self_us in sorted(
+                packages.items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        ],
+        "slowest": [
+            (entry["module"], entry["cumulative_us"] / 1000)
+            for entry in sorted(
+                imports, key=lambda entry: entry["cumulative_us"], reverse=True
+            )[:top]
+        ],
+    }
@@ -0,0 +1,247 @@
+import itertools
+import json
+import platform
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from benchmarks.query_plans import Seed, seed
+from benchmarks.utils import rolled_back
+from matches import facade as matches_facade
+from matches.models import Seat
+from matches.serializers import MatchSerializer, SeatSerializer
+from stadiums.serializers import StadiumSerializer
+
+SEATS_PER_MATCH = 1000
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    A microbenchmark.
+
+    `setup` is called with the seeded data and returns the function to time, which
+    is called `number` times per run. Everything runs in a transaction that is
+    rolled back afterwards, so the function may write.
+    """
+
+    name: str
+    setup: Callable[[Seed], Callable[[], object]]
+    number: int = 100
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, number: int = 100):
+    """
+    Register a function as the setup of a benchmark, see `Benchmark`.
+    """
+
+    def decorator(setup: Callable[[Seed], Callable[[], object]]):
+        BENCHMARKS.append(Benchmark(name, setup, number))
+        return setup
+
+    return decorator
+
+
+def time_per_call(function: Callable[[], object], number: int, repeat: int) -> float:
+    """
+    :return: The seconds per call of the fastest of `repeat` runs of `number` calls.
+    :rtype: float
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(size: int, repeat: int = 5, names: list[str] | None = None) -> list[dict]:
+    """
+    Run the benchmarks on a season of `size` seats.
+
+    Seats are seeded 1,000 per match, a third of them reserved, in a transaction
+    that is rolled back, so the lookups run against tables of realistic size.
+
+    :param size: The number of seats to seed.
+    :type size: int
+    :param repeat: The number of runs, of which the fastest is kept.
+    :type repeat: int
+    :param names: The benchmarks to run, all by default.
+    :type names: list[str] | None
+    :return: One result per benchmark, in µs per call.
+    :rtype: list[dict]
+    """
+    results = []
+    with rolled_back():
+        seeded = seed(
+            matches=max(size // SEATS_PER_MATCH, 1),
+            seats_per_match=min(size, SEATS_PER_MATCH),
+        )
+        for bench in BENCHMARKS:
+            if names and bench.name not in names:
+                continue
+            # Enough seats for every reservation of the reserve flow, and requests
+            # from the test client.
+            with rolled_back(), override_settings(
+                RESERVATION_MAX_SEATS_PER_USER=None,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            ):
+                function = bench.setup(seeded)
+                seconds = time_per_call(function, bench.number, repeat)
+            results.append(
+                {
+                    "name": bench.name,
+                    "size": size,
+                    "us_per_call": seconds * 1e6,
+                    "calls": bench.number,
+                }
+            )
+    return results
+
+
+def environment() -> dict:
+    """
+    :return: What the timings of a run depend on, stored with its results.
+    :rtype: dict
+    """
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+    }
+
+
+def save(path: Path, results: list[dict]):
+    path.write_text(
+        json.dumps({"environment": environment(), "results": results}, indent=2)
+    )
+
+
+def load(path: Path) -> list[dict]:
+    return json.loads(path.read_text())["results"]
+
+
+def compare(baseline: list[dict], current: list[dict], threshold: float) -> list[dict]:
+    """
+    Compare two runs benchmark by benchmark.
+
+    :param baseline: The results of the reference run.
+    :type baseline: list[dict]
+    :param current: The results of the run to check.
+    :type current: list[dict]
+    :param threshold: The relative slowdown flagged as a regression, e.g. 0.1 for
+        10% slower.
+    :type threshold: float
+    :return: One comparison per benchmark and size of both runs, with the relative
+        `change` of the time per call, positive when slower.
+    :rtype: list[dict]
+    """
+    before = {(result["name"], result["size"]): result for result in baseline}
+    comparisons = []
+    for result in current:
+        reference = before.get((result["name"], result["size"]))
+        if reference is None:
+            continue
+        change = result["us_per_call"] / reference["us_per_call"] - 1
+        comparisons.append(
+            {
+                "name": result["name"],
+                "size": result["size"],
+                "baseline_us": reference["us_per_call"],
+                "current_us": result["us_per_call"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return comparisons
+
+
+@benchmark("matches.facade.get_match_by_id", number=1000)
+def _get_match(seed: Seed):
+    return lambda: matches_facade.get_match_by_id(seed.match.id)
+
+
+@benchmark("matches.facade.get_unreserved_seat_by_id", number=1000)
+def _get_unreserved_seat(seed: Seed):
+    return lambda: matches_facade.get_unreserved_seat_by_id(seed.seat.id, seed.match.id)
+
+
+@benchmark("matches.facade.get_seat_events_after")
+def _get_seat_events(seed: Seed):
+    return lambda: matches_facade.get_seat_events_after(
+        0, match_id=seed.match.id, limit=100
+    )
+
+
+@benchmark("MatchSerializer.validate")
+def _validate_match(seed: Seed):
+    data = {
+        "stadium": seed.stadium.id,
+        "home_side": seed.teams[0].name,
+        "away_side": seed.teams[5].name,
+        "match_day": seed.match.match_day,
+        "match_time": "18:00:00",
+    }
+    return lambda: MatchSerializer(data=data).is_valid()
+
+
+@benchmark("StadiumSerializer.validate", number=1000)
+def _validate_stadium(seed: Seed):
+    data = {"name": seed.stadium.name, "location": "Elsewhere"}
+    return lambda: StadiumSerializer(data=data).is_valid()
+
+
+@benchmark("SeatSerializer(many=True)", number=10)
+def _serialize_seats(seed: Seed):
+    seats = list(Seat.objects.filter(match=seed.match).order_by("seat_number"))
+    return lambda: SeatSerializer(seats, many=True).data
+
+
+def _post(client: APIClient, path: str, data: dict):
+    # Timing error responses would flatter the benchmark.
+    response = client.post(path, data)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{path} answered {response.status_code}: {response.data}")
+    return response
+
+
+# Dominated by the password hasher, as sign-ups are in production.
+@benchmark("SignUpView", number=5)
+def _sign_up(seed: Seed):
+    client = APIClient()
+    usernames = (f"benchmark_{number}" for number in itertools.count())
+    return lambda: _post(
+        client,
+        "/api/auth/signup/",
+        {"username": next(usernames), "password": "secret"},
+    )
+
+
+@benchmark("reserve flow", number=50)
+def _reserve(seed: Seed):
+    client = APIClient()
+    client.force_authenticate(user=seed.user)
+    seat_ids = iter(
+        Seat.objects.filter(match=seed.match, is_reserved=False)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    return lambda: _post(
+        client,
+        "/api/reservation/reserve/",
+        {"match": seed.match.id, "seat": next(seat_ids)},
+    )
@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from benchmarks import query_plans, renderers, serializers, startup, suite
+
+
+class SerializerBenchmarkTest(TestCase):
+    def test_run(self):
+        results = serializers.run(size=10, repeat=1)
+
+        self.assertEqual(
+            [result["name"] for result in results],
+            ["stadium list", "match list", "seat map", "seat map rendering"],
+        )
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("benchmark_serializers", sizes=[10], repeat=1, stdout=stdout)
+        self.assertIn("seat map", stdout.getvalue())
+
+
+class StartupBenchmarkTest(TestCase):
+    def test_summarize(self):
+        imports = [
+            {"module": "yaml", "self_us": 3000, "cumulative_us": 3000, "depth": 1},
+            {
+                "module": "drf_yasg.app",
+                "self_us": 500,
+                "cumulative_us": 500,
+                "depth": 1,
+            },
+            {"module": "drf_yasg", "self_us": 1500, "cumulative_us": 5000, "depth": 0},
+        ]
+
+        summary = startup.summarize(imports, top=1)
+
+        self.assertEqual(summary["total_ms"], 5.0)
+        self.assertEqual(summary["packages"], [("yaml", 3.0)])
+        self.assertEqual(summary["slowest"], [("drf_yasg", 5.0)])
+
+    @mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": "benchmark"})
+    def test_production_profile_skips_docs(self):
+        modules = {
+            entry["module"]
+            for entry in startup.measure_imports("ticketing.settings_production")
+        }
+
+        self.assertIn("matches.views", modules)
+        self.assertNotIn("drf_yasg", modules)
+        self.assertNotIn("pkg_resources", modules)
+
+
+class RendererBenchmarkTest(TestCase):
+    def test_run(self):
+        results = renderers.run(size=100, repeat=1)
+
+        self.assertEqual(
+            [result["name"] for result in results], ["json", "orjson", "rle"]
+        )
+        self.assertLess(results[2]["bytes"], results[1]["bytes"])
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("benchmark_renderers", sizes=[100], repeat=1, stdout=stdout)
+        self.assertIn("rle", stdout.getvalue())
+
+
+class QueryPlanTest(TestCase):
+    def test_hot_paths_use_indexes(self):
+        results = query_plans.check(matches=20, seats_per_match=50)
+
+        self.assertEqual(
+            {result["path"] for result in results},
+            {path.name for path in query_plans.HOT_PATHS},
+        )
+        self.assertEqual([result for result in results if result["problems"]], [])
+
+    def test_find_problems(self):
+        sqlite_plan = [
+            "2 0 0 SCAN matches_seat",
+            "5 0 0 SEARCH reservation_reservation USING INDEX x (seat_id=?)",
+            "28 0 0 USE TEMP B-TREE FOR ORDER BY",
+        ]
+        postgresql_plan = [
+            "Sort  (cost=10.1..10.2 rows=30 width=8)",
+            "  ->  Seq Scan on matches_seat  (cost=0.00..9.9 rows=30 width=8)",
+        ]
+
+        self.assertEqual(
+            query_plans.find_problems(sqlite_plan),
+            ["full scan of matches_seat", "sort without an index"],
+        )
+        self.assertEqual(
+            query_plans.find_problems(postgresql_plan),
+            ["sort without an index", "full scan of matches_seat"],
+        )
+        self.assertEqual(
+            query_plans.find_problems(
+                sqlite_plan, allow_scans=("matches_seat",), allow_sort=True
+            ),
+            [],
+        )
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("check_query_plans", matches=20, seats_per_match=50, stdout=stdout)
+        self.assertIn("use indexes", stdout.getvalue())
+
+
+class SuiteTest(TestCase):
+    def test_run(self):
+        results = suite.run(size=300, repeat=1)
+
+        self.assertEqual(
+            [result["name"] for result in results],
+            [bench.name for bench in suite.BENCHMARKS],
+        )
+        self.assertTrue(all(result["us_per_call"] > 0 for result in results))
+
+    def test_compare(self):
+        baseline = [
+            {"name": "lookup", "size": 1000, "us_per_call": 100.0},
+            {"name": "lookup", "size": 100000, "us_per_call": 100.0},
+            {"name": "removed", "size": 1000, "us_per_call": 100.0},
+        ]
+        current = [
+            {"name": "lookup", "size": 1000, "us_per_call": 105.0},
+            {"name": "lookup", "size": 100000, "us_per_call": 150.0},
+            {"name": "added", "size": 1000, "us_per_call": 100.0},
+        ]
+
+        comparisons = suite.compare(baseline, current, threshold=0.1)
+
+        self.assertEqual([c["size"] for c in comparisons], [1000, 100000])
+        self.assertEqual([c["regression"] for c in comparisons], [False, True])
+        self.assertAlmostEqual(comparisons[1]["change"], 0.5)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "baseline.json"
+            call_command(
+                "run_benchmarks",
+                sizes=[300],
+                repeat=1,
+                names=["matches.facade.get_match_by_id"],
+                output=baseline,
+                stdout=io.StringIO(),
+            )
+            data = json.loads(baseline.read_text())
+            self.assertEqual(data["environment"]["database"], "sqlite")
+
+            current = Path(directory) / "current.json"
+            data["results"][0]["us_per_call"] *= 2
+            current.write_text(json.dumps(data))
+            stdout = io.StringIO()
+            call_command("run_benchmarks", compare=[baseline, baseline], stdout=stdout)
+            self.assertNotIn("REGRESSION", stdout.getvalue())
+            with self.assertRaises(CommandError):
+                call_command(
+                    "run_benchmarks",
+                    compare=[baseline, current],
+                    stdout=io.StringIO(),
+                )
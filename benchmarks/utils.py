@@ -0,0 +1,85 @@
+import time
+from datetime import date, timedelta
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from matches.models import Match, Seat, Team
+from stadiums.models import Stadium
+
+
+@contextmanager
+def rolled_back() -> Iterator[None]:
+    """
+    Run the enclosed block in a transaction that is always rolled back, so
+    benchmarks can seed data on any database without leaving it behind.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def best_time(func: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Return the fastest of `repeat` runs of `func`, in seconds.
+
+    :param func: The function to time.
+    :type func: Callable
+    :param repeat: The number of runs.
+    :type repeat: int
+    :return: The best run time in seconds.
+    :rtype: float
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def seed_stadiums(count: int) -> list[Stadium]:
+    """
+    Create `count` stadiums.
+    """
+    return Stadium.objects.bulk_create(
+        Stadium(name=f"Stadium {number}", location="Benchmark City")
+        for number in range(count)
+    )
+
+
+def seed_matches(count: int, stadium: Stadium) -> list[Match]:
+    """
+    Create `count` matches at one stadium, one per day, between two teams.
+    """
+    home_side, away_side = Team.objects.bulk_create(
+        [Team(name=f"Home {stadium.pk}"), Team(name=f"Away {stadium.pk}")]
+    )
+    return Match.objects.bulk_create(
+        Match(
+            stadium=stadium,
+            home_side=home_side,
+            away_side=away_side,
+            match_day=date(2000, 1, 1) + timedelta(days=number),
+            match_time="18:00:00",
+        )
+        for number in range(count)
+    )
+
+
+def seed_seats(count: int, match: Match, reserved_every: int = 3) -> None:
+    """
+    Create `count` seats for a match, every `reserved_every`-th one reserved.
+    """
+    Seat.objects.bulk_create(
+        (
+            Seat(
+                match=match,
+                seat_number=number,
+                is_reserved=number % reserved_every == 0,
+            )
+            for number in range(1, count + 1)
+        ),
+        batch_size=5000,
+    )
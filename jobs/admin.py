@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "task", "status", "progress", "total", "created_at"]
+    list_filter = ["status", "task"]
+    raw_id_fields = ["created_by"]
+    ordering = ["-id"]
@@ -0,0 +1,185 @@
+import threading
+import traceback
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import get_task
+from monitoring import metrics
+
+JOBS = metrics.counter(
+    "ticketing_jobs_total",
+    "Background jobs finished, by task and status.",
+    ["task", "status"],
+)
+JOB_DURATION = metrics.histogram(
+    "ticketing_job_duration_seconds",
+    "Time spent running background jobs, by task.",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+
+def enqueue(task: str, params: dict, user: User | None = None) -> Job:
+    """
+    Queue a job. Inside a transaction, workers only see it once it commits.
+
+    :param task: The name of a registered task.
+    :type task: str
+    :param params: The keyword arguments of the task, serializable to JSON.
+    :type params: dict
+    :param user: The user the job is run for.
+    :type user: User | None
+    :raises LookupError: If the task is not registered.
+    :return: The queued job.
+    :rtype: Job
+    """
+    get_task(task)
+    return Job.objects.create(task=task, params=params, created_by=user)
+
+
+def claim_next_job(worker: str, candidates: int = 10) -> Job | None:
+    """
+    Claim the oldest queued job for a worker.
+
+    Jobs are claimed with a conditional `UPDATE` from `queued` to `running`, so
+    when workers race for the same job exactly one of them wins, on any database
+    and without holding locks. The losers try the next candidates.
+
+    :param worker: The name of the worker.
+    :type worker: str
+    :param candidates: The number of queued jobs read at once.
+    :type candidates: int
+    :return: The claimed job, or None if the queue is empty.
+    :rtype: Job | None
+    """
+    queued = Job.objects.filter(status=Job.Status.QUEUED)
+    for job_id in queued.order_by("id").values_list("id", flat=True)[:candidates]:
+        now = timezone.now()
+        claimed = queued.filter(id=job_id).update(
+            status=Job.Status.RUNNING,
+            worker=worker,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def fail_stale_jobs() -> int:
+    """
+    Fail the running jobs whose worker stopped sending heartbeats.
+
+    Like a task that raises, a lost job is not run again: its task may have
+    committed part of its work. Clients enqueue the job again once they checked
+    what was done.
+
+    :return: The number of jobs failed.
+    :rtype: int
+    """
+    now = timezone.now()
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.JOBS_STALE_AFTER),
+    ).update(status=Job.Status.FAILED, error="Worker lost", finished_at=now)
+
+
+def output_path(job: Job, filename: str) -> Path:
+    """
+    Path of a file written by a job, served by the job download view once the
+    task returns `filename` as the `file` of its result.
+
+    :param job: The job.
+    :type job: Job
+    :param filename: The name of the file, without directories.
+    :type filename: str
+    :return: The path of the file, in `JOBS_OUTPUT_DIR`.
+    :rtype: Path
+    """
+    directory = Path(settings.JOBS_OUTPUT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"job-{job.id}-{Path(filename).name}"
+
+
+class Heartbeat(threading.Thread):
+    """
+    Thread refreshing the heartbeat and publishing the progress of a running job.
+
+    It runs on its own database connection, so the progress of a task is visible
+    while the task is still inside a transaction.
+    """
+
+    def __init__(self, job: Job, interval: float):
+        super().__init__(name=f"heartbeat-{job.id}", daemon=True)
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        id=self.job.id,
+                        status=Job.Status.RUNNING,
+                        worker=self.job.worker,
+                    ).update(
+                        heartbeat_at=timezone.now(),
+                        progress=self.job.progress,
+                        total=self.job.total,
+                    )
+                except DatabaseError:
+                    # SQLite is locked while the task writes; try again later.
+                    pass
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job: Job):
+    """
+    Run a claimed job and record its outcome.
+
+    An exception raised by the task fails the job with its traceback; the task
+    is not retried, as it may have committed part of its work.
+
+    :param job: The job, claimed by this worker.
+    :type job: Job
+    """
+    heartbeat = Heartbeat(job, settings.JOBS_HEARTBEAT_INTERVAL)
+    heartbeat.start()
+    started = timezone.now()
+    try:
+        result = get_task(job.task)(job, **job.params)
+    except Exception:
+        status, result, error = Job.Status.FAILED, None, traceback.format_exc()
+    else:
+        status, error = Job.Status.SUCCEEDED, ""
+    finally:
+        heartbeat.stop()
+
+    # A job failed as stale while its task was still running records the actual
+    # outcome.
+    finished = timezone.now()
+    Job.objects.filter(id=job.id).update(
+        status=status,
+        result=result,
+        error=error,
+        progress=job.progress,
+        total=job.total,
+        heartbeat_at=finished,
+        finished_at=finished,
+    )
+    JOBS.inc(task=job.task, status=status)
+    JOB_DURATION.observe((finished - started).total_seconds(), task=job.task)
@@ -0,0 +1,83 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker, default_name
+
+
+def _run_worker(poll_interval: float, burst: bool):
+    stop = threading.Event()
+    handlers = {
+        signum: signal.signal(signum, lambda *args: stop.set())
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        Worker(default_name(), poll_interval).run(stop, burst=burst)
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the database queue. SIGTERM or SIGINT stop the "
+        "workers once their current job is finished."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes to run.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait while the queue is empty. Defaults to "
+            "JOBS_POLL_INTERVAL.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options["poll_interval"] or settings.JOBS_POLL_INTERVAL
+        processes = max(1, options["processes"])
+        self.stdout.write(f"Running {processes} job worker(s)")
+        if processes == 1:
+            _run_worker(poll_interval, options["burst"])
+            return
+
+        # Forked workers must not share the connection of the parent.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_run_worker, args=(poll_interval, options["burst"]))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        def forward(signum, frame):
+            # Each worker finishes its current job, then exits.
+            for worker in workers:
+                worker.terminate()
+
+        handlers = {
+            signum: signal.signal(signum, forward)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
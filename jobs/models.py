@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by the `run_jobs` workers.
+
+    `task` names a function registered with `jobs.registry.register`, called with
+    the job and `params`. While a job runs, its worker refreshes `heartbeat_at`
+    and publishes `progress` out of `total`; a job whose heartbeat stops is
+    failed, as its task may have committed part of its work.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now=False, auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "job"
+        verbose_name_plural = "jobs"
+        indexes = [models.Index(fields=["status", "id"], name="job_status_idx")]
+
+    def __str__(self):
+        return f"{self.task}#{self.id} ({self.status})"
+
+    def set_progress(self, progress: int, total: int | None = None):
+        """
+        Report the progress of the task.
+
+        Only the instance is updated; the worker's heartbeat publishes it, so a task
+        can report progress as often as it likes, even inside a transaction.
+
+        :param progress: The number of items done.
+        :type progress: int
+        :param total: The total number of items, if known.
+        :type total: int | None
+        """
+        self.progress = progress
+        if total is not None:
+            self.total = total
+
+    @property
+    def output_file(self) -> str | None:
+        """
+        The name of the file written by the job, returned by the task as the
+        `file` of its result.
+        """
+        if self.status != self.Status.SUCCEEDED or not isinstance(self.result, dict):
+            return None
+        return self.result.get("file")
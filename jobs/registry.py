@@ -0,0 +1,34 @@
+from collections.abc import Callable
+
+TASKS: dict[str, Callable] = {}
+
+
+def register(name: str) -> Callable[[Callable], Callable]:
+    """
+    Register a function as the task `name`.
+
+    The function is called with the running `Job` and its params as keyword
+    arguments, and returns the JSON-serializable result of the job.
+
+    :param name: The name jobs refer to the task by.
+    :type name: str
+    :return: The decorator.
+    :rtype: Callable
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if TASKS.setdefault(name, function) is not function:
+            raise ValueError(f"Task {name} is already registered.")
+        return function
+
+    return decorator
+
+
+def get_task(name: str) -> Callable:
+    """
+    :raises LookupError: If no task of that name is registered.
+    """
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name}")
@@ -0,0 +1,46 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from jobs.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Job model.
+
+    ---
+    # Fields
+    - `id`: The unique identifier for the job.
+    - `task`: The task run by the job.
+    - `status`: `queued`, `running`, `succeeded` or `failed`.
+    - `progress`: The number of items done.
+    - `total`: The total number of items, if known.
+    - `result`: The result of the task, once succeeded.
+    - `error`: Why the job failed.
+    - `download`: The URL of the file written by the job, if any.
+    - `created_at`, `started_at`, `finished_at`: When the job was queued, last
+      started and finished.
+    """
+
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "task",
+            "status",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "download",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_download(self, job: Job) -> str | None:
+        if job.output_file is None:
+            return None
+        return reverse("job-download", kwargs={"job_id": job.id})
@@ -0,0 +1,208 @@
+import io
+import signal
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jobs import facade as jobs_facade
+from jobs.models import Job
+from jobs.registry import TASKS, get_task, register
+from jobs.worker import Worker
+
+
+@register("jobs.tests.add")
+def add(job: Job, a: int, b: int) -> int:
+    job.set_progress(1, 1)
+    return a + b
+
+
+@register("jobs.tests.fail")
+def fail(job: Job):
+    raise RuntimeError("Task failed")
+
+
+class RegistryTest(TestCase):
+    def test_app_tasks_are_registered(self):
+        self.assertIn("matches.add_seats", TASKS)
+        self.assertIn("reservation.release_seats", TASKS)
+        self.assertIn("reservation.export", TASKS)
+
+    def test_register_twice(self):
+        with self.assertRaises(ValueError):
+            register("jobs.tests.add")(lambda job: None)
+
+    def test_unknown_task(self):
+        with self.assertRaises(LookupError):
+            get_task("jobs.tests.unknown")
+        with self.assertRaises(LookupError):
+            jobs_facade.enqueue("jobs.tests.unknown", {})
+
+
+class JobQueueTest(TestCase):
+    def test_claim_oldest_job(self):
+        first = jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        jobs_facade.enqueue("jobs.tests.add", {"a": 3, "b": 4})
+
+        job = jobs_facade.claim_next_job("worker-1")
+        self.assertEqual(job.id, first.id)
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual((job.worker, job.attempts), ("worker-1", 1))
+
+    def test_claim_is_exclusive(self):
+        job = jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        self.assertEqual(jobs_facade.claim_next_job("worker-1").id, job.id)
+        self.assertIsNone(jobs_facade.claim_next_job("worker-2"))
+
+    def test_claim_skips_jobs_claimed_concurrently(self):
+        first = jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        second = jobs_facade.enqueue("jobs.tests.add", {"a": 3, "b": 4})
+        # Another worker claims the first job between the read and the update.
+        update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            if kwargs.get("worker") == "worker-2":
+                update(Job.objects.filter(id=first.id), status=Job.Status.RUNNING)
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", racing_update):
+            job = jobs_facade.claim_next_job("worker-2")
+        self.assertEqual(job.id, second.id)
+        first.refresh_from_db()
+        self.assertEqual(first.worker, "")
+
+    def test_run_job(self):
+        jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        self.assertTrue(Worker("worker-1").run_once())
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.result, 3)
+        self.assertEqual((job.progress, job.total), (1, 1))
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(Worker("worker-1").run_once())
+
+    def test_failed_job(self):
+        jobs_facade.enqueue("jobs.tests.fail", {})
+        Worker("worker-1").run_once()
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIsNone(job.result)
+        self.assertIn("RuntimeError: Task failed", job.error)
+
+    def test_outcome_of_job_failed_as_stale_is_recorded(self):
+        jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        job = jobs_facade.claim_next_job("worker-1")
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.FAILED, error="Worker lost"
+        )
+
+        jobs_facade.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.Status.SUCCEEDED, ""))
+
+    @override_settings(JOBS_STALE_AFTER=60)
+    def test_fail_stale_jobs(self):
+        lost = jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        alive = jobs_facade.enqueue("jobs.tests.add", {"a": 5, "b": 6})
+        Job.objects.update(status=Job.Status.RUNNING, worker="lost", attempts=1)
+        Job.objects.filter(id=lost.id).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=61)
+        )
+        Job.objects.filter(id=alive.id).update(heartbeat_at=timezone.now())
+
+        self.assertEqual(jobs_facade.fail_stale_jobs(), 1)
+        lost.refresh_from_db()
+        self.assertEqual((lost.status, lost.error), (Job.Status.FAILED, "Worker lost"))
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, Job.Status.RUNNING)
+        # A lost job is not run again.
+        self.assertFalse(Worker("worker-1").run_once())
+
+    def test_worker_survives_database_errors(self):
+        jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        claim_next_job = jobs_facade.claim_next_job
+        calls = iter([OperationalError("database is locked")])
+
+        def flaky_claim(name):
+            error = next(calls, None)
+            if error:
+                raise error
+            return claim_next_job(name)
+
+        with mock.patch("jobs.facade.claim_next_job", flaky_claim):
+            with self.assertLogs("jobs.worker", "ERROR"):
+                Worker("worker-1", poll_interval=0).run(threading.Event(), burst=True)
+
+        self.assertEqual(Job.objects.get().status, Job.Status.SUCCEEDED)
+
+    def test_run_jobs_command_restores_signal_handlers(self):
+        context = mock.Mock()
+        handlers = [
+            signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)
+        ]
+
+        with mock.patch("multiprocessing.get_context", return_value=context):
+            call_command("run_jobs", "--processes", "2", stdout=io.StringIO())
+
+        self.assertEqual(context.Process.return_value.join.call_count, 2)
+        self.assertEqual(
+            [signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)],
+            handlers,
+        )
+
+    def test_run_jobs_command(self):
+        jobs_facade.enqueue("jobs.tests.add", {"a": 1, "b": 2})
+        jobs_facade.enqueue("jobs.tests.fail", {})
+
+        call_command("run_jobs", "--burst", stdout=io.StringIO())
+        self.assertEqual(
+            sorted(Job.objects.values_list("status", flat=True)),
+            [Job.Status.FAILED, Job.Status.SUCCEEDED],
+        )
+
+
+class JobViewTest(APITestCase):
+    def setUp(self):
+        self.super_user = User.objects.create_superuser(username="super_user")
+        self.normal_user = User.objects.create_user(username="normal_user")
+        self.job = jobs_facade.enqueue(
+            "jobs.tests.add", {"a": 1, "b": 2}, user=self.super_user
+        )
+        self.endpoint = f"/api/jobs/{self.job.id}/"
+
+        self.client.force_authenticate(user=self.super_user)
+
+    def test_poll_job(self):
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], Job.Status.QUEUED)
+        self.assertIsNone(response.data["download"])
+
+        Worker("worker-1").run_once()
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.data["status"], Job.Status.SUCCEEDED)
+        self.assertEqual(response.data["result"], 3)
+
+    def test_poll_invalid_job(self):
+        response = self.client.get("/api/jobs/100/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data.get("error"), "Job not found")
+
+    def test_download_without_file(self):
+        response = self.client.get(f"{self.endpoint}download/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_poll_job_as_normal_user(self):
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
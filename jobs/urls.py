@@ -0,0 +1,8 @@
+from django.urls import path
+
+from jobs.views import JobDownloadView, JobView
+
+urlpatterns = [
+    path("<int:job_id>/", JobView.as_view(), name="job-detail"),
+    path("<int:job_id>/download/", JobDownloadView.as_view(), name="job-download"),
+]
@@ -0,0 +1,130 @@
+from django.http import FileResponse
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jobs import facade as jobs_facade
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+from ticketing.docs import swagger_auto_schema
+
+
+def prefers_async(request: Request) -> bool:
+    """
+    :return: Whether the client asked for the work to be done in the background,
+        with the `Prefer: respond-async` header (RFC 7240).
+    :rtype: bool
+    """
+    preferences = request.headers.get("Prefer", "")
+    return "respond-async" in (p.strip() for p in preferences.split(","))
+
+
+def accepted(job: Job) -> Response:
+    """
+    Answer a request handed over to a background job.
+
+    :param job: The queued job.
+    :type job: Job
+    :return: A 202 response with the job, whose status URL is also in `Location`.
+    :rtype: Response
+    """
+    url = reverse("job-detail", kwargs={"job_id": job.id})
+    return Response(
+        {"job": job.id, "status": job.status, "url": url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
+
+
+class JobView(APIView):
+    """
+    View for polling a background job.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Responses
+    - 200 OK: The status, progress and result of the job.
+    - 404 Not Found: Job not found.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            200: JobSerializer,
+            404: "Not Found. Job not found.",
+        },
+    )
+    def get(self, request: Request, job_id: int):
+        """
+        Get a background job.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param job_id: The ID of the job.
+        :type job_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        job = Job.objects.filter(id=job_id).first()
+        if job is None:
+            return Response(
+                {"error": "Job not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(JobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+class JobDownloadView(APIView):
+    """
+    View for downloading the file written by a background job, such as an export.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Responses
+    - 200 OK: The file.
+    - 404 Not Found: Job not found, not finished or without a file.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            200: "The file.",
+            404: "Not Found. Job not found, not finished or without a file.",
+        },
+    )
+    def get(self, request: Request, job_id: int):
+        """
+        Download the file of a background job.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param job_id: The ID of the job.
+        :type job_id: int
+        :return: The HTTP response object.
+        :rtype: FileResponse
+        """
+        job = Job.objects.filter(id=job_id).first()
+        filename = job.output_file if job else None
+        path = jobs_facade.output_path(job, filename) if filename else None
+        if path is None or not path.is_file():
+            return Response(
+                {"error": "File not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return FileResponse(
+            path.open("rb"),
+            as_attachment=True,
+            filename=filename,
+            content_type=job.result.get("content_type"),
+        )
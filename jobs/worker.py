@@ -0,0 +1,69 @@
+import logging
+import os
+import socket
+import threading
+
+from django.db import DatabaseError, close_old_connections
+
+from jobs import facade as jobs_facade
+
+logger = logging.getLogger(__name__)
+
+
+def default_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Worker:
+    """
+    Loop claiming and running queued jobs, one at a time.
+
+    Workers only share the database, so any number of them can run, in as many
+    processes and on as many hosts as needed.
+    """
+
+    def __init__(self, name: str | None = None, poll_interval: float = 1.0):
+        self.name = name or default_name()
+        self.poll_interval = poll_interval
+
+    def run_once(self) -> bool:
+        """
+        Fail stale jobs, then claim and run the next queued job.
+
+        :return: Whether a job was run.
+        :rtype: bool
+        """
+        close_old_connections()
+        jobs_facade.fail_stale_jobs()
+        job = jobs_facade.claim_next_job(self.name)
+        if job is None:
+            return False
+        jobs_facade.run_job(job)
+        return True
+
+    def run(self, stop: threading.Event, burst: bool = False):
+        """
+        Run jobs until `stop` is set, polling every `poll_interval` seconds while
+        the queue is empty. A running job is finished before stopping.
+
+        Database errors, such as SQLite staying locked past its timeout while
+        another process holds a long transaction, are logged and retried after
+        `poll_interval` seconds. A job whose outcome could not be recorded stays
+        running, and is failed once its heartbeat is stale.
+
+        :param stop: The event stopping the worker.
+        :type stop: threading.Event
+        :param burst: Stop as soon as the queue is empty.
+        :type burst: bool
+        """
+        while not stop.is_set():
+            try:
+                ran = self.run_once()
+            except DatabaseError:
+                logger.exception("Job worker %s lost the database, retrying", self.name)
+                stop.wait(self.poll_interval)
+                continue
+            if not ran:
+                if burst:
+                    break
+                stop.wait(self.poll_interval)
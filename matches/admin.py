@@ -1,6 +1,105 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-from matches.models import Match, Seat
+from matches import facade as matches_facade
+from matches.models import Match, MatchParticipation, Seat, Team
+from matches.serializers import MatchSerializer
+from reservation import facade as reservation_facade
+from ticketing.paginator import EstimatedCountPaginator
 
-admin.site.register(Match)
-admin.site.register(Seat)
+
+@admin.register(Team)
+class TeamAdmin(admin.ModelAdmin):
+    list_display = ["id", "name"]
+    search_fields = ["name"]
+    ordering = ["name"]
+
+
+class MatchAdminForm(forms.ModelForm):
+    class Meta:
+        model = Match
+        fields = "__all__"
+
+    def clean(self):
+        """
+        Reject a slot one of the sides already plays in, which `book_sides` would
+        otherwise only find out as an `IntegrityError` once the match is saved.
+        """
+        data = super().clean()
+        sides = [data.get("home_side"), data.get("away_side")]
+        busy = MatchParticipation.objects.filter(
+            team__in=[side for side in sides if side is not None],
+            match_day=data.get("match_day"),
+            match_time=data.get("match_time"),
+        )
+        if self.instance.pk is not None:
+            busy = busy.exclude(match_id=self.instance.pk)
+        if busy.exists():
+            raise forms.ValidationError(MatchSerializer.SIDES_BUSY)
+        return data
+
+
+@admin.register(Match)
+class MatchAdmin(admin.ModelAdmin):
+    form = MatchAdminForm
+    list_display = [
+        "id",
+        "home_side",
+        "away_side",
+        "match_day",
+        "match_time",
+        "stadium",
+        "status",
+        "on_sale_at",
+    ]
+    list_select_related = ["stadium", "home_side", "away_side"]
+    list_filter = ["status", "stadium", "archived_at"]
+    search_fields = ["home_side__name", "away_side__name"]
+    autocomplete_fields = ["home_side", "away_side"]
+    ordering = ["-match_day", "-match_time"]
+
+    @transaction.atomic
+    def save_model(self, request: HttpRequest, obj: Match, form, change: bool):
+        super().save_model(request, obj, form, change)
+        matches_facade.book_sides(obj)
+
+
+@admin.register(Seat)
+class SeatAdmin(admin.ModelAdmin):
+    """
+    Admin for seats, built to stay responsive with millions of rows.
+
+    - Rows are listed from the seat table alone: `Seat.__str__` and the columns only
+      use the match ID, and the match is edited through a raw ID widget instead of a
+      select listing every match.
+    - Both filters are served by the `(is_reserved, match)` index.
+    - Pages are counted with `EstimatedCountPaginator`, and the total count of the
+      unfiltered table is not shown.
+    - The actions update every selected seat with a single statement.
+    """
+
+    list_display = ["id", "match_id", "seat_number", "is_reserved", "updated_at"]
+    list_filter = ["is_reserved", "match"]
+    raw_id_fields = ["match"]
+    ordering = ["-id"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["release_seats", "mark_seats_sold"]
+
+    @admin.action(description="Release selected seats and cancel their reservations")
+    def release_seats(self, request: HttpRequest, queryset: QuerySet[Seat]):
+        result = reservation_facade.release_selected_seats(queryset)
+        self.message_user(
+            request,
+            "Released %(released_seats)d seats, cancelled %(cancelled_reservations)d "
+            "reservations." % result,
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Mark selected seats as sold")
+    def mark_seats_sold(self, request: HttpRequest, queryset: QuerySet[Seat]):
+        sold = matches_facade.mark_seats_sold(queryset)
+        self.message_user(request, f"Marked {sold} seats as sold.", messages.SUCCESS)
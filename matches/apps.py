@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class MatchesConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'matches'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "matches"
+
+    def ready(self):
+        from matches.models import Match, Seat
+        from matches.seatmap import (
+            invalidate_seat_map_of_match,
+            invalidate_seat_map_of_seat,
+        )
+        from matches.state import invalidate_match_state
+
+        post_save.connect(invalidate_match_state, sender=Match)
+        post_delete.connect(invalidate_match_state, sender=Match)
+        post_save.connect(invalidate_seat_map_of_match, sender=Match)
+        post_delete.connect(invalidate_seat_map_of_match, sender=Match)
+        post_save.connect(invalidate_seat_map_of_seat, sender=Seat)
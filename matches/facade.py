@@ -1,14 +1,326 @@
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
-from matches.models import Match, Seat
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from matches.models import Match, MatchParticipation, Seat, SeatEvent
+from matches.seatmap import invalidate_seat_map
 
 
 def get_match_by_id(id: int) -> Match | None:
     return Match.objects.filter(id=id).first()
 
 
-def get_unreserved_seat_by_id(id: int) -> Seat | None:
-    return Seat.objects.filter(id=id, is_reserved=False).first()
+def book_sides(match: Match):
+    """
+    Record the slot of a match in the schedule of both its sides.
+
+    Replaces the previous participations of the match, so it also follows a change
+    of sides or slot. Must run in the transaction saving the match.
+
+    :param match: The saved match.
+    :type match: Match
+    :raises IntegrityError: If a side already plays another match in the slot.
+    """
+    MatchParticipation.objects.filter(match=match).delete()
+    MatchParticipation.objects.bulk_create(
+        MatchParticipation(
+            team_id=team_id,
+            match=match,
+            match_day=match.match_day,
+            match_time=match.match_time,
+        )
+        for team_id in (match.home_side_id, match.away_side_id)
+    )
+
+
+def add_seats(
+    match_id: int,
+    seat_numbers: list[int],
+    chunk_size: int = 1000,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Add seats to a match, all or none.
+
+    Duplicates are looked up with one query per chunk of seat numbers, instead of
+    one per seat, and seats are inserted in chunks in a single transaction.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param seat_numbers: The numbers of the new seats.
+    :type seat_numbers: list[int]
+    :param chunk_size: The number of seats looked up and inserted at a time.
+    :type chunk_size: int
+    :param progress: Called with the number of seats inserted so far.
+    :type progress: Callable[[int], None] | None
+    :raises ValueError: If a seat number is repeated or already exists.
+    :return: The number of seats created.
+    :rtype: int
+    """
+    duplicates = {
+        number for number, count in Counter(seat_numbers).items() if count > 1
+    }
+    for start in range(0, len(seat_numbers), chunk_size):
+        duplicates.update(
+            Seat.objects.filter(
+                match_id=match_id,
+                seat_number__in=seat_numbers[start : start + chunk_size],
+            ).values_list("seat_number", flat=True)
+        )
+    if duplicates:
+        raise ValueError(
+            "Seats already exist or are repeated: "
+            + ", ".join(map(str, sorted(duplicates)[:10]))
+        )
+
+    with transaction.atomic():
+        for start in range(0, len(seat_numbers), chunk_size):
+            chunk = seat_numbers[start : start + chunk_size]
+            Seat.objects.bulk_create(
+                Seat(match_id=match_id, seat_number=number) for number in chunk
+            )
+            if progress is not None:
+                progress(start + len(chunk))
+        invalidate_seat_map(match_id)
+    return len(seat_numbers)
+
+
+def add_seat_stream(
+    match_id: int, seat_numbers: Iterable[int], chunk_size: int = 1000
+) -> int:
+    """
+    Add a stream of seats to a match, all or none, in constant memory.
+
+    Unlike `add_seats`, only one chunk of seat numbers is held at a time. Each chunk
+    is checked with one query against the seats of the match, which include the
+    chunks inserted before it, and the unique index on `(match, seat_number)`
+    catches seats added concurrently.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param seat_numbers: The numbers of the new seats, read as they are inserted.
+    :type seat_numbers: Iterable[int]
+    :param chunk_size: The number of seats looked up and inserted at a time.
+    :type chunk_size: int
+    :raises ValueError: If a seat number is repeated or already exists.
+    :return: The number of seats created.
+    :rtype: int
+    """
+    seat_numbers = iter(seat_numbers)
+    created = 0
+    try:
+        with transaction.atomic():
+            while chunk := list(islice(seat_numbers, chunk_size)):
+                duplicates = {
+                    number for number, count in Counter(chunk).items() if count > 1
+                }
+                duplicates.update(
+                    Seat.objects.filter(
+                        match_id=match_id, seat_number__in=chunk
+                    ).values_list("seat_number", flat=True)
+                )
+                if duplicates:
+                    raise ValueError(
+                        "Seats already exist or are repeated: "
+                        + ", ".join(map(str, sorted(duplicates)[:10]))
+                    )
+                Seat.objects.bulk_create(
+                    Seat(match_id=match_id, seat_number=number) for number in chunk
+                )
+                created += len(chunk)
+            invalidate_seat_map(match_id)
+    except IntegrityError as exc:
+        raise ValueError("Seats already exist or are repeated") from exc
+    return created
+
+
+def get_unreserved_seat_by_id(id: int, match_id: int | None = None) -> Seat | None:
+    seats = Seat.objects.filter(id=id, is_reserved=False)
+    if match_id is not None:
+        seats = seats.filter(match_id=match_id)
+    return seats.first()
+
+
+def safe_reserve_seat_by_id(id: int, updated_at: datetime) -> bool:
+    """
+    Reserve a seat only if nobody touched it since it was read.
+
+    :return: True if this call claimed the seat, False on a concurrent update.
+    :rtype: bool
+    """
+    updated = Seat.objects.filter(
+        id=id, updated_at=updated_at, is_reserved=False
+    ).update(is_reserved=True, updated_at=timezone.now())
+    return updated == 1
+
+
+def get_home_match_ids(team_id: int, stadium_id: int | None = None) -> list[int]:
+    """
+    :param team_id: The ID of the home side.
+    :type team_id: int
+    :param stadium_id: Only the matches at this stadium, if given.
+    :type stadium_id: int | None
+    :return: The IDs of the scheduled home matches of the team that are not
+        archived, in schedule order.
+    :rtype: list[int]
+    """
+    matches = Match.objects.filter(
+        home_side_id=team_id,
+        status=Match.Status.SCHEDULED,
+        archived_at__isnull=True,
+    )
+    if stadium_id is not None:
+        matches = matches.filter(stadium_id=stadium_id)
+    return list(
+        matches.order_by("match_day", "match_time").values_list("id", flat=True)
+    )
+
+
+def get_unreserved_seats_by_number(
+    seat_number: int, match_ids: Iterable[int]
+) -> dict[int, int]:
+    """
+    Look up the same seat in several matches with one query.
+
+    :param seat_number: The seat number.
+    :type seat_number: int
+    :param match_ids: The IDs of the matches.
+    :type match_ids: Iterable[int]
+    :return: The ID of the seat by match, for the matches where it is unreserved.
+    :rtype: dict[int, int]
+    """
+    return dict(
+        Seat.objects.filter(
+            match_id__in=match_ids, seat_number=seat_number, is_reserved=False
+        ).values_list("match_id", "id")
+    )
+
+
+def safe_reserve_seats_by_id(ids: list[int]) -> bool:
+    """
+    Reserve seats, all or none, with a single conditional `UPDATE`.
+
+    Must run in a transaction, which is rolled back when this returns False.
+
+    :param ids: The IDs of the seats, read as unreserved.
+    :type ids: list[int]
+    :return: True if this call claimed every seat, False if another request
+        reserved one of them since it was read.
+    :rtype: bool
+    """
+    updated = Seat.objects.filter(id__in=ids, is_reserved=False).update(
+        is_reserved=True, updated_at=timezone.now()
+    )
+    return updated == len(ids)
+
+
+def mark_seats_sold(seats: QuerySet[Seat]) -> int:
+    """
+    Mark the available seats of a queryset as sold without a reservation.
+
+    Used for seats sold outside the API, e.g. at the box office. The seats are
+    claimed with a single `UPDATE` and the change is logged per match.
+
+    :param seats: The seats to mark; reserved seats are skipped.
+    :type seats: QuerySet[Seat]
+    :return: The number of seats marked as sold.
+    :rtype: int
+    """
+    available_seats = seats.filter(is_reserved=False)
+    with transaction.atomic():
+        seat_ids = list(
+            available_seats.select_for_update()
+            .order_by("match_id", "seat_number")
+            .values_list("match_id", "id")
+        )
+        sold = available_seats.update(is_reserved=True, updated_at=timezone.now())
+        for match_id, rows in groupby(seat_ids, key=itemgetter(0)):
+            record_seat_events(
+                match_id=match_id,
+                seat_ids=[seat_id for _, seat_id in rows],
+                old_state=SeatEvent.State.AVAILABLE,
+                new_state=SeatEvent.State.RESERVED,
+            )
+    return sold
+
+
+def record_seat_events(
+    match_id: int,
+    seat_ids: Iterable[int],
+    old_state: SeatEvent.State,
+    new_state: SeatEvent.State,
+) -> None:
+    """
+    Append one event per seat to the seat change log.
+
+    Must be called inside the transaction that performs the state change so the
+    log never disagrees with `Seat`. Events are inserted with one statement per
+    batch of 1,000 seats.
+    """
+    record_seat_events_of_matches(
+        ((match_id, seat_id) for seat_id in seat_ids), old_state, new_state
+    )
+
+
+def record_seat_events_of_matches(
+    seats: Iterable[tuple[int, int]],
+    old_state: SeatEvent.State,
+    new_state: SeatEvent.State,
+) -> None:
+    """
+    Like `record_seat_events`, for seats of several matches at once.
+
+    :param seats: The match ID and seat ID of each seat.
+    :type seats: Iterable[tuple[int, int]]
+    """
+    SeatEvent.objects.bulk_create(
+        (
+            SeatEvent(
+                match_id=match_id,
+                seat_id=seat_id,
+                old_state=old_state,
+                new_state=new_state,
+            )
+            for match_id, seat_id in seats
+        ),
+        batch_size=1000,
+    )
+
+
+def get_seat_events_after(
+    cursor: int, match_id: int | None = None, limit: int = 1000
+) -> list[SeatEvent]:
+    """
+    Return up to `limit` events with a sequence greater than `cursor`, oldest first.
+
+    Unless the database serializes commits, an event can commit after one with a
+    greater ID was returned; consumers on such databases should read a window
+    below their cursor again, as `matches.seatmap` does.
+    """
+    events = SeatEvent.objects.filter(id__gt=cursor)
+    if match_id is not None:
+        events = events.filter(match_id=match_id)
+    return list(events.order_by("id")[:limit])
+
 
+def iter_seat_events(
+    cursor: int = 0, match_id: int | None = None, chunk_size: int = 1000
+) -> Iterator[SeatEvent]:
+    """
+    Yield every event after `cursor`, fetching them in chunks of `chunk_size`.
 
-def safe_reserve_seat_by_id(id: int, updated_at: datetime) -> None:
-    Seat.objects.filter(id=id, updated_at=updated_at).update(is_reserved=True)
+    Each chunk is a keyset query on the primary key, so the cost of a chunk does
+    not depend on how far into the log the consumer already is.
+    """
+    while True:
+        events = get_seat_events_after(cursor, match_id=match_id, limit=chunk_size)
+        yield from events
+        if len(events) < chunk_size:
+            return
+        cursor = events[-1].id
@@ -0,0 +1,363 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, time
+from itertools import count
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from matches.models import Match, MatchParticipation, Seat, Team
+from matches.seatmap import invalidate_seat_map
+from stadiums.models import Stadium
+
+BATCH_SIZE = 5000
+
+
+class SeasonLoaderError(Exception):
+    """
+    Raised when a record of the season file is malformed or references an
+    unknown stadium or match.
+    """
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class ScheduleConflictError(Exception):
+    """
+    Raised when a match books a team that already plays in the same slot.
+    """
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """
+    Stream the records of a season file.
+
+    `.csv` files are read with a header row, anything else as JSON Lines. Both
+    share the same keys, CSV rows simply leave the columns of other record types
+    empty.
+
+    :param path: The path of the season file.
+    :type path: Path
+    :return: An iterator over the records, one dict per line.
+    :rtype: Iterator[dict]
+    """
+    with open(path, encoding="utf-8", newline="") as season_file:
+        if path.suffix == ".csv":
+            for row in csv.DictReader(season_file):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in season_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class SeasonLoader:
+    """
+    Bulk loader for stadiums, teams, matches and seats.
+
+    Records are buffered per model and inserted in batches that ignore rows
+    violating the natural unique keys, which makes re-running a load a no-op.
+    Foreign keys are resolved through in-memory maps instead of one lookup per
+    row; a buffer is flushed early when a later record needs the IDs of the rows
+    it holds.
+
+    Teams are matched by name regardless of case and surrounding whitespace, and
+    created on first use. A match booking a team that already plays in the same
+    slot is rejected with the line it comes from.
+
+    # Record types
+    - `stadium`: `name`, `location`.
+    - `match`: `stadium_name`, `stadium_location`, `home_side`, `away_side`,
+      `match_day`, `match_time`.
+    - `seats`: `stadium_name`, `stadium_location`, `match_day`, `match_time` and
+      either `seat_number` or an inclusive `seat_from`/`seat_to` range.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self.counts = {"stadiums": 0, "teams": 0, "matches": 0, "seats": 0}
+
+        self._stadium_ids: dict[tuple[str, str], int] = {
+            (name, location): id
+            for id, name, location in Stadium.objects.values_list(
+                "id", "name", "location"
+            )
+        }
+        self._match_ids: dict[tuple[int, date, time], int] = {
+            (stadium_id, match_day, match_time): id
+            for id, stadium_id, match_day, match_time in Match.objects.values_list(
+                "id", "stadium_id", "match_day", "match_time"
+            )
+        }
+        self._team_ids: dict[str, int] = {
+            name.casefold(): id for id, name in Team.objects.values_list("id", "name")
+        }
+        self._booked: set[tuple[str, date, time]] = {
+            (name.casefold(), match_day, match_time)
+            for name, match_day, match_time in MatchParticipation.objects.values_list(
+                "team__name", "match_day", "match_time"
+            )
+        }
+        self._stadiums: dict[tuple[str, str], Stadium] = {}
+        self._teams: dict[str, Team] = {}
+        self._matches: dict[tuple[int, date, time], tuple[str, str]] = {}
+        self._seats: list[tuple[int, int]] = []
+
+    def load(self, records: Iterable[dict]) -> dict[str, int]:
+        """
+        Load every record and flush the remaining buffers.
+
+        :param records: The season records.
+        :type records: Iterable[dict]
+        :raises SeasonLoaderError: If a record is malformed or invalid.
+        :return: The number of new stadiums, teams and matches, and of inserted
+            seats.
+        :rtype: dict[str, int]
+        """
+        records = iter(records)
+        for line in count(1):
+            # Records are parsed while iterating, so a malformed line surfaces here.
+            try:
+                record = next(records)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as error:
+                raise SeasonLoaderError(line, f"malformed record ({error})")
+
+            try:
+                self._load_record(record)
+            except (KeyError, TypeError, ValueError) as error:
+                raise SeasonLoaderError(line, f"invalid record ({error!r})")
+            except (LookupError, ScheduleConflictError) as error:
+                raise SeasonLoaderError(line, str(error))
+
+        self._flush_stadiums()
+        self._flush_teams()
+        self._flush_matches()
+        self._flush_seats()
+        return self.counts
+
+    def _load_record(self, record: dict):
+        record_type = record["type"]
+        if record_type == "stadium":
+            self._add_stadium(record)
+        elif record_type == "match":
+            self._add_match(record)
+        elif record_type == "seats":
+            self._add_seats(record)
+        else:
+            raise ValueError(f"unknown record type {record_type}")
+
+    def _add_stadium(self, record: dict):
+        key = (record["name"], record["location"])
+        if key in self._stadium_ids or key in self._stadiums:
+            return
+
+        self._stadiums[key] = Stadium(name=key[0], location=key[1])
+        self.counts["stadiums"] += 1
+        if len(self._stadiums) >= self.batch_size:
+            self._flush_stadiums()
+
+    def _add_match(self, record: dict):
+        sides = (
+            self._add_team(record["home_side"]),
+            self._add_team(record["away_side"]),
+        )
+        if sides[0] == sides[1]:
+            raise ValueError("home and away sides are the same")
+
+        key = self._match_key(record)
+        if key in self._match_ids or key in self._matches:
+            return
+
+        for side, name in zip(sides, (record["home_side"], record["away_side"])):
+            if (side, key[1], key[2]) in self._booked:
+                raise ScheduleConflictError(
+                    f"{name.strip()} already plays on {key[1]} {key[2]}"
+                )
+        self._booked.update((side, key[1], key[2]) for side in sides)
+
+        self._matches[key] = sides
+        self.counts["matches"] += 1
+        if len(self._matches) >= self.batch_size:
+            self._flush_matches()
+
+    def _add_team(self, name: str) -> str:
+        """
+        Register a team if it is new.
+
+        :return: The key of the team in `_team_ids`.
+        :rtype: str
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("empty team name")
+        key = name.casefold()
+        if key not in self._team_ids and key not in self._teams:
+            self._teams[key] = Team(name=name)
+            self.counts["teams"] += 1
+        return key
+
+    def _add_seats(self, record: dict):
+        match_id = self._get_match_id(self._match_key(record))
+        if "seat_number" in record:
+            seat_numbers = [int(record["seat_number"])]
+        else:
+            seat_numbers = range(int(record["seat_from"]), int(record["seat_to"]) + 1)
+
+        for seat_number in seat_numbers:
+            self._seats.append((match_id, seat_number))
+            if len(self._seats) >= self.batch_size:
+                self._flush_seats()
+
+    def _match_key(self, record: dict) -> tuple[int, date, time]:
+        stadium_id = self._get_stadium_id(
+            (record["stadium_name"], record["stadium_location"])
+        )
+        return (
+            stadium_id,
+            date.fromisoformat(record["match_day"]),
+            time.fromisoformat(record["match_time"]),
+        )
+
+    def _get_stadium_id(self, key: tuple[str, str]) -> int:
+        if key in self._stadiums:
+            self._flush_stadiums()
+        if key not in self._stadium_ids:
+            raise LookupError(f"unknown stadium {key[0]} ({key[1]})")
+        return self._stadium_ids[key]
+
+    def _get_match_id(self, key: tuple[int, date, time]) -> int:
+        if key in self._matches:
+            self._flush_matches()
+        if key not in self._match_ids:
+            raise LookupError(f"unknown match at stadium {key[0]} on {key[1]} {key[2]}")
+        return self._match_ids[key]
+
+    def _flush_stadiums(self):
+        if not self._stadiums:
+            return
+
+        Stadium.objects.bulk_create(self._stadiums.values(), ignore_conflicts=True)
+        names = {name for name, _ in self._stadiums}
+        self._stadium_ids.update(
+            ((name, location), id)
+            for id, name, location in Stadium.objects.filter(
+                name__in=names
+            ).values_list("id", "name", "location")
+        )
+        self._stadiums.clear()
+
+    def _flush_teams(self):
+        if not self._teams:
+            return
+
+        Team.objects.bulk_create(self._teams.values(), ignore_conflicts=True)
+        self._team_ids.update(
+            (name.casefold(), id)
+            for id, name in Team.objects.named(
+                *(team.name for team in self._teams.values())
+            ).values_list("id", "name")
+        )
+        self._teams.clear()
+
+    def _flush_matches(self):
+        if not self._matches:
+            return
+
+        self._flush_teams()
+        Match.objects.bulk_create(
+            (
+                Match(
+                    stadium_id=stadium_id,
+                    home_side_id=self._team_ids[home_side],
+                    away_side_id=self._team_ids[away_side],
+                    match_day=match_day,
+                    match_time=match_time,
+                )
+                for (stadium_id, match_day, match_time), (
+                    home_side,
+                    away_side,
+                ) in self._matches.items()
+            ),
+            ignore_conflicts=True,
+        )
+        days = {match_day for _, match_day, _ in self._matches}
+        self._match_ids.update(
+            ((stadium_id, match_day, match_time), id)
+            for id, stadium_id, match_day, match_time in Match.objects.filter(
+                match_day__in=days
+            ).values_list("id", "stadium_id", "match_day", "match_time")
+        )
+        MatchParticipation.objects.bulk_create(
+            (
+                MatchParticipation(
+                    team_id=self._team_ids[side],
+                    match_id=self._match_ids[key],
+                    match_day=key[1],
+                    match_time=key[2],
+                )
+                for key, sides in self._matches.items()
+                for side in sides
+            ),
+            ignore_conflicts=True,
+        )
+        self._matches.clear()
+
+    def _flush_seats(self):
+        if not self._seats:
+            return
+
+        match_ids = {match_id for match_id, _ in self._seats}
+        seats = Seat.objects.filter(match_id__in=match_ids)
+        with transaction.atomic():
+            # Existing seats are ignored, so count the inserted ones from the seats
+            # of the batch's matches before and after, whatever the driver reports.
+            before = seats.count()
+            if connection.vendor in ("postgresql", "sqlite"):
+                self._insert_seats()
+            else:
+                Seat.objects.bulk_create(
+                    (
+                        Seat(match_id=match_id, seat_number=seat_number)
+                        for match_id, seat_number in self._seats
+                    ),
+                    batch_size=self.batch_size,
+                    ignore_conflicts=True,
+                )
+            self.counts["seats"] += seats.count() - before
+            for match_id in match_ids:
+                invalidate_seat_map(match_id)
+        self._seats.clear()
+
+    def _insert_seats(self):
+        """
+        Insert the buffered seats with one statement executed per seat.
+
+        Seats outnumber everything else by orders of magnitude, and building a
+        model instance per seat makes `bulk_create` about seven times slower. Both
+        PostgreSQL and SQLite accept the standard `ON CONFLICT DO NOTHING`, so the
+        statement is written out rather than built from backend internals.
+        """
+        opts = Seat._meta
+        fields = [
+            opts.get_field(name)
+            for name in ("match", "seat_number", "is_reserved", "updated_at")
+        ]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        updated_at = opts.get_field("updated_at").get_db_prep_value(
+            timezone.now(), connection
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {connection.ops.quote_name(opts.db_table)} ({columns}) "
+                "VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING",
+                [
+                    (match_id, seat_number, False, updated_at)
+                    for match_id, seat_number in self._seats
+                ],
+            )
@@ -0,0 +1,43 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matches.loader import BATCH_SIZE, SeasonLoader, SeasonLoaderError, iter_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Load stadiums, teams, matches and seats from a JSONL or CSV season file in "
+        "batched inserts. Rows that already exist are skipped, so re-running the "
+        "same file is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of rows inserted per statement batch.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        loader = SeasonLoader(batch_size=options["batch_size"])
+        start = time.perf_counter()
+        try:
+            counts = loader.load(iter_records(path))
+        except SeasonLoaderError as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - start
+
+        rows = sum(counts.values())
+        self.stdout.write(
+            f"Loaded {counts['stadiums']} stadiums, {counts['teams']} teams, "
+            f"{counts['matches']} matches and {counts['seats']} seats in {elapsed:.2f}s "
+            f"({rows / elapsed if elapsed else 0:.0f} rows/sec)"
+        )
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from matches import seatmap
+
+
+class Command(BaseCommand):
+    help = (
+        "Cache the seat maps of the matches going on sale soon and check them "
+        "against the database. Run it every few minutes, ahead of the on-sales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=float,
+            default=settings.SEAT_MAP_PREWARM_WINDOW,
+            help="Warm the matches going on sale within this many seconds.",
+        )
+        parser.add_argument(
+            "--match",
+            type=int,
+            action="append",
+            dest="match_ids",
+            help="Warm this match instead; can be given several times.",
+        )
+
+    def handle(self, *args, **options):
+        match_ids = options["match_ids"] or seatmap.get_matches_going_on_sale(
+            timedelta(seconds=options["window"])
+        )
+
+        inconsistent = 0
+        for match_id in match_ids:
+            result = seatmap.prewarm(match_id)
+            self.stdout.write(
+                f"Match {match_id}: {result['seats']} seats, "
+                f"{result['available']} available"
+            )
+            if result["mismatches"]:
+                inconsistent += 1
+                self.stderr.write(
+                    f"Match {match_id}: the cached seat map disagreed with the "
+                    f"database on {len(result['mismatches'])} seats and was rebuilt"
+                )
+
+        if inconsistent:
+            raise CommandError(
+                f"{inconsistent} of {len(match_ids)} seat maps were inconsistent."
+            )
+        self.stdout.write(f"Warmed {len(match_ids)} seat maps.")
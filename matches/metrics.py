@@ -0,0 +1,12 @@
+from monitoring import metrics
+
+# Shared by the views and the background tasks, which must not import the views.
+MATCHES_CREATED = metrics.counter(
+    "ticketing_matches_created_total",
+    "Matches created.",
+)
+SEATS_CREATED = metrics.counter(
+    "ticketing_seats_created_total",
+    "Seats added per match.",
+    ["match"],
+)
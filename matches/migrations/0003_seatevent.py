@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0002_seat_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_state', models.CharField(choices=[('available', 'Available'), ('reserved', 'Reserved')], max_length=16)),
+                ('new_state', models.CharField(choices=[('available', 'Available'), ('reserved', 'Reserved')], max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.match')),
+                ('seat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.seat')),
+            ],
+            options={
+                'verbose_name': 'seat event',
+                'verbose_name_plural': 'seat events',
+                'indexes': [models.Index(fields=['match', 'id'], name='seatevent_match_cursor_idx')],
+            },
+        ),
+    ]
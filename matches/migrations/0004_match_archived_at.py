@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0003_seatevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
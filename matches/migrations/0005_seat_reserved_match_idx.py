@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0004_match_archived_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['is_reserved', 'match'], name='seat_reserved_match_idx'),
+        ),
+    ]
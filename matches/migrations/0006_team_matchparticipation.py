@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0005_seat_reserved_match_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'verbose_name': 'team',
+                'verbose_name_plural': 'teams',
+            },
+        ),
+        migrations.CreateModel(
+            name='MatchParticipation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_day', models.DateField()),
+                ('match_time', models.TimeField()),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.match')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='matches.team')),
+            ],
+            options={
+                'verbose_name': 'match participation',
+                'verbose_name_plural': 'match participations',
+                'constraints': [models.UniqueConstraint(fields=('team', 'match_day', 'match_time'), name='participation_team_slot_unique')],
+            },
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_team',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='matches.team'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='away_team',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='matches.team'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def populate_teams(apps, schema_editor):
+    """
+    Create one team per distinct side name and link the matches to them.
+
+    Names that only differ by surrounding whitespace or case are the same team,
+    spelled as it first appears. A team booked twice in the same slot keeps the
+    participation of its first match only, as the old schema did not prevent it.
+    """
+    Team = apps.get_model('matches', 'Team')
+    Match = apps.get_model('matches', 'Match')
+    MatchParticipation = apps.get_model('matches', 'MatchParticipation')
+
+    spellings = {}
+    for home_side, away_side in Match.objects.order_by('id').values_list('home_side', 'away_side'):
+        for name in (home_side, away_side):
+            spellings.setdefault(name.strip().casefold(), name.strip())
+    Team.objects.bulk_create(Team(name=name) for name in spellings.values())
+    team_ids = {
+        name.casefold(): id for id, name in Team.objects.values_list('id', 'name')
+    }
+
+    def team_id(name):
+        return team_ids[name.strip().casefold()]
+
+    matches = []
+    participations = []
+    for match in Match.objects.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        match.home_team_id = team_id(match.home_side)
+        match.away_team_id = team_id(match.away_side)
+        matches.append(match)
+        participations.extend(
+            MatchParticipation(
+                team_id=id,
+                match_id=match.id,
+                match_day=match.match_day,
+                match_time=match.match_time,
+            )
+            for id in (match.home_team_id, match.away_team_id)
+        )
+        if len(matches) >= BATCH_SIZE:
+            Match.objects.bulk_update(matches, ['home_team', 'away_team'])
+            MatchParticipation.objects.bulk_create(participations, ignore_conflicts=True)
+            matches, participations = [], []
+
+    Match.objects.bulk_update(matches, ['home_team', 'away_team'])
+    MatchParticipation.objects.bulk_create(participations, ignore_conflicts=True)
+
+
+def unpopulate_teams(apps, schema_editor):
+    Match = apps.get_model('matches', 'Match')
+    for match in Match.objects.select_related('home_team', 'away_team').iterator():
+        match.home_side = match.home_team.name
+        match.away_side = match.away_team.name
+        match.save(update_fields=['home_side', 'away_side'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0006_team_matchparticipation'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_teams, unpopulate_teams),
+    ]
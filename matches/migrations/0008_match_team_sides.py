@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0007_populate_teams'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='match',
+            name='home_side',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='away_side',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='home_team',
+            new_name='home_side',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='away_team',
+            new_name='away_side',
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='home_side',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='home_matches', to='matches.team'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='away_side',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='away_matches', to='matches.team'),
+        ),
+    ]
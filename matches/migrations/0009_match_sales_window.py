@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0008_match_team_sides'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='off_sale_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='on_sale_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('postponed', 'Postponed'), ('cancelled', 'Cancelled'), ('played', 'Played')], default='scheduled', max_length=16),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0009_match_sales_window'),
+        ('stadiums', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['match_day', 'match_time', 'id'], name='match_schedule_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0010_match_schedule_idx'),
+        ('stadiums', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.CheckConstraint(check=models.Q(('home_side', models.F('away_side')), _negated=True), name='match_sides_differ', violation_error_message='Home and away sides are the same'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:45
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0011_match_sides_differ'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='name',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='team',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='team_name_unique', violation_error_message='A team with this name already exists.'),
+        ),
+    ]
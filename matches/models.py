@@ -1,22 +1,126 @@
 from django.db import models
+from django.db.models.functions import Lower
+
+
+class TeamQuerySet(models.QuerySet):
+    def named(self, *names: str) -> "TeamQuerySet":
+        """
+        Filter teams by name, ignoring case, with the index of `team_name_unique`.
+        """
+        return self.alias(lower_name=Lower("name")).filter(
+            lower_name__in=[name.lower() for name in names]
+        )
+
+
+class Team(models.Model):
+    """
+    A team. Names are unique regardless of case, as the API, the season loader and
+    the migration that created the teams all compare them that way.
+    """
+
+    name = models.CharField(max_length=50)
+
+    objects = TeamQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "team"
+        verbose_name_plural = "teams"
+        constraints = [
+            models.UniqueConstraint(
+                Lower("name"),
+                name="team_name_unique",
+                violation_error_message="A team with this name already exists.",
+            )
+        ]
+
+    def __str__(self):
+        return self.name
 
 
 class Match(models.Model):
+    """
+    A match and its sales window.
+
+    Seats can be reserved while the match is scheduled, from `on_sale_at` until
+    `off_sale_at`. Without `on_sale_at` the match is on sale as soon as it is
+    created, and without `off_sale_at` sales close at kick-off.
+    """
+
+    class Status(models.TextChoices):
+        SCHEDULED = "scheduled"
+        POSTPONED = "postponed"
+        CANCELLED = "cancelled"
+        PLAYED = "played"
+
     stadium = models.ForeignKey("stadiums.Stadium", on_delete=models.PROTECT)
-    home_side = models.CharField(max_length=50)
-    away_side = models.CharField(max_length=50)
+    home_side = models.ForeignKey(
+        Team, on_delete=models.PROTECT, related_name="home_matches"
+    )
+    away_side = models.ForeignKey(
+        Team, on_delete=models.PROTECT, related_name="away_matches"
+    )
     match_day = models.DateField(auto_now=False, auto_now_add=False)
     match_time = models.TimeField(auto_now=False, auto_now_add=False)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.SCHEDULED
+    )
+    on_sale_at = models.DateTimeField(null=True, blank=True)
+    off_sale_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "match"
         verbose_name_plural = "matches"
         unique_together = ["stadium", "match_day", "match_time"]
+        constraints = [
+            models.CheckConstraint(
+                check=~models.Q(home_side=models.F("away_side")),
+                name="match_sides_differ",
+                violation_error_message="Home and away sides are the same",
+            )
+        ]
+        indexes = [
+            # Serves the match list and the archiving sweep in schedule order.
+            models.Index(
+                fields=["match_day", "match_time", "id"],
+                condition=models.Q(archived_at__isnull=True),
+                name="match_schedule_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.home_side} vs {self.away_side} on {self.match_day}:{self.match_time} at {self.stadium}"
 
 
+class MatchParticipation(models.Model):
+    """
+    The slot a team plays a match in, one row per side.
+
+    The slot is copied from the match so the unique constraint on
+    `(team, match_day, match_time)` makes the database enforce that a team plays
+    at most one match per slot, and checking a team's schedule is a single probe
+    of its index.
+    """
+
+    team = models.ForeignKey(Team, on_delete=models.PROTECT)
+    match = models.ForeignKey(Match, on_delete=models.CASCADE)
+    match_day = models.DateField(auto_now=False, auto_now_add=False)
+    match_time = models.TimeField(auto_now=False, auto_now_add=False)
+
+    class Meta:
+        verbose_name = "match participation"
+        verbose_name_plural = "match participations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "match_day", "match_time"],
+                name="participation_team_slot_unique",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.team_id}:{self.match_id}"
+
+
 class Seat(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
     seat_number = models.IntegerField()
@@ -27,6 +131,41 @@ class Seat(models.Model):
         verbose_name = "seat"
         verbose_name_plural = "seats"
         unique_together = ["match", "seat_number"]
+        indexes = [
+            models.Index(
+                fields=["is_reserved", "match"], name="seat_reserved_match_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.match_id}:{self.seat_number}"
+
+
+class SeatEvent(models.Model):
+    """
+    Append-only log of seat state changes.
+
+    Rows are written in the same transaction as the change they describe and are
+    never updated, so the auto-incremented primary key is the monotonic sequence
+    consumers use as their cursor.
+    """
+
+    class State(models.TextChoices):
+        AVAILABLE = "available"
+        RESERVED = "reserved"
+
+    match = models.ForeignKey(Match, on_delete=models.CASCADE)
+    seat = models.ForeignKey(Seat, on_delete=models.CASCADE)
+    old_state = models.CharField(max_length=16, choices=State.choices)
+    new_state = models.CharField(max_length=16, choices=State.choices)
+    created_at = models.DateTimeField(auto_now=False, auto_now_add=True)
+
+    class Meta:
+        verbose_name = "seat event"
+        verbose_name_plural = "seat events"
+        indexes = [
+            models.Index(fields=["match", "id"], name="seatevent_match_cursor_idx")
+        ]
 
     def __str__(self):
-        return f"{self.match.id}:{self.seat_number}"
+        return f"{self.id}:{self.seat_id}:{self.old_state}->{self.new_state}"
@@ -0,0 +1,73 @@
+from rest_framework.renderers import BaseRenderer
+
+from ticketing.renderers import FastJSONRenderer
+
+
+class SeatMapRLERenderer(BaseRenderer):
+    """
+    Run-length encoded seat map, negotiated with its media type or `?format=rle`.
+
+    Seats are created in ranges, so along a seat map ordered by seat number the IDs
+    and seat numbers usually both grow by one, and reservations come in blocks.
+    Each run of such seats is sent as `[first_id, first_seat_number, length,
+    is_reserved]`, which shrinks the seat map of a big venue from hundreds of KB to
+    a few KB. Anything but a seat list, such as an error, is rendered as plain JSON.
+    """
+
+    media_type = "application/vnd.ticketing.seat-map-rle+json"
+    format = "rle"
+    charset = None
+
+    _json_renderer = FastJSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            data = {"runs": encode_seat_runs(data)}
+        return self._json_renderer.render(data, None, renderer_context)
+
+
+def encode_seat_runs(seats: list[dict]) -> list[list[int]]:
+    """
+    Encode a seat map into runs.
+
+    :param seats: Seats with `id`, `seat_number` and `is_reserved`, ordered by
+        seat number.
+    :type seats: list[dict]
+    :return: `[first_id, first_seat_number, length, is_reserved]` runs.
+    :rtype: list[list[int]]
+    """
+    runs = []
+    run = None
+    for seat in seats:
+        id, seat_number, reserved = seat["id"], seat["seat_number"], seat["is_reserved"]
+        if (
+            run is not None
+            and id == run[0] + run[2]
+            and seat_number == run[1] + run[2]
+            and reserved == run[3]
+        ):
+            run[2] += 1
+        else:
+            run = [id, seat_number, 1, int(reserved)]
+            runs.append(run)
+    return runs
+
+
+def decode_seat_runs(runs: list[list[int]]) -> list[dict]:
+    """
+    Decode runs back into the seat map.
+
+    :param runs: The result of `encode_seat_runs`.
+    :type runs: list[list[int]]
+    :return: Seats with `id`, `seat_number` and `is_reserved`.
+    :rtype: list[dict]
+    """
+    return [
+        {
+            "id": id + offset,
+            "seat_number": seat_number + offset,
+            "is_reserved": bool(reserved),
+        }
+        for id, seat_number, length, reserved in runs
+        for offset in range(length)
+    ]
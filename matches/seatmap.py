@@ -0,0 +1,255 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from matches.models import Match, Seat, SeatEvent
+
+# Past this many changes since the snapshot, reading the seats again is cheaper
+# than replaying the events.
+MAX_REPLAYED_EVENTS = 1000
+
+# Unless the database serializes commits, as SQLite does, an event can commit
+# after one with a greater ID was read, i.e. below the cursor. Events up to this
+# many IDs below the cursor are read again so such late events are still
+# replayed. One committed later than that is only picked up when the snapshot
+# expires, after `SEAT_MAP_CACHE_TIMEOUT` seconds.
+LATE_EVENT_WINDOW = 200
+
+
+@dataclass
+class SeatMap:
+    """
+    Snapshot of the seat map of a match, as of the seat event `cursor`.
+
+    Seats are held in flat arrays ordered by seat number, which pickle to a few
+    bytes per seat, instead of one dict per seat.
+    """
+
+    match_id: int
+    cursor: int
+    ids: array = field(default_factory=lambda: array("q"))
+    seat_numbers: array = field(default_factory=lambda: array("q"))
+    reserved: bytearray = field(default_factory=bytearray)
+
+    @property
+    def available(self) -> int:
+        return len(self.reserved) - sum(self.reserved)
+
+    def apply(self, events: list[SeatEvent]) -> int | None:
+        """
+        Replay seat events on the snapshot and move its cursor past them.
+
+        Events carry the new state of the seat, so replaying one the snapshot
+        already reflects changes nothing.
+
+        :param events: Events of the match, oldest first.
+        :type events: list[SeatEvent]
+        :return: The number of seats whose state changed, or None if an event is
+            about a seat the snapshot does not know, in which case the snapshot
+            must be rebuilt.
+        :rtype: int | None
+        """
+        positions = {seat_id: position for position, seat_id in enumerate(self.ids)}
+        before = {}
+        for event in events:
+            position = positions.get(event.seat_id)
+            if position is None:
+                return None
+            before.setdefault(position, self.reserved[position])
+            self.reserved[position] = event.new_state == SeatEvent.State.RESERVED
+            self.cursor = max(self.cursor, event.id)
+        return sum(
+            self.reserved[position] != state for position, state in before.items()
+        )
+
+    def to_data(self) -> list[dict]:
+        """
+        :return: The seats with `id`, `seat_number` and `is_reserved`, as served
+            by `SeatMapView`.
+        :rtype: list[dict]
+        """
+        return [
+            {"id": id, "seat_number": seat_number, "is_reserved": bool(reserved)}
+            for id, seat_number, reserved in zip(
+                self.ids, self.seat_numbers, self.reserved
+            )
+        ]
+
+
+def get_cache():
+    return caches[settings.SEAT_MAP_CACHE]
+
+
+def _key(match_id: int) -> str:
+    return f"seat-map:{match_id}"
+
+
+def build_seat_map(match_id: int) -> SeatMap:
+    """
+    Read the seat map of a match from the database.
+
+    The cursor is read before the seats: a change committed in between is both in
+    the seats and after the cursor, and replaying it later is harmless.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :return: The snapshot.
+    :rtype: SeatMap
+    """
+    cursor = (
+        SeatEvent.objects.filter(match_id=match_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    seat_map = SeatMap(match_id, cursor or 0)
+    seats = (
+        Seat.objects.filter(match_id=match_id)
+        .order_by("seat_number")
+        .values_list("id", "seat_number", "is_reserved")
+    )
+    for id, seat_number, is_reserved in seats.iterator(chunk_size=10000):
+        seat_map.ids.append(id)
+        seat_map.seat_numbers.append(seat_number)
+        seat_map.reserved.append(is_reserved)
+    return seat_map
+
+
+def get_seat_map(match_id: int) -> SeatMap:
+    """
+    Return the seat map of a match from the cache, brought up to date.
+
+    A cached snapshot costs one indexed query for the seat events since it was
+    taken, and those of the `LATE_EVENT_WINDOW` IDs before. It is rebuilt from
+    the seats when it is missing, or when too much happened since.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :return: The up to date snapshot.
+    :rtype: SeatMap
+    """
+    cache = get_cache()
+    seat_map = cache.get(_key(match_id))
+    if seat_map is not None:
+        cursor = seat_map.cursor
+        events = list(
+            SeatEvent.objects.filter(
+                match_id=match_id, id__gt=cursor - LATE_EVENT_WINDOW
+            )
+            .order_by("id")
+            .only("id", "seat_id", "new_state")[
+                : LATE_EVENT_WINDOW + MAX_REPLAYED_EVENTS + 1
+            ]
+        )
+        if sum(event.id > cursor for event in events) <= MAX_REPLAYED_EVENTS:
+            changed = seat_map.apply(events)
+            if changed is not None:
+                if changed or seat_map.cursor != cursor:
+                    cache.set(_key(match_id), seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+                return seat_map
+
+    seat_map = build_seat_map(match_id)
+    cache.set(_key(match_id), seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+def invalidate_seat_map(match_id: int):
+    """
+    Evict the seat map of a match whose seats were added or removed.
+
+    The snapshot is evicted at once, and again when the current transaction
+    commits, so that one rebuilt in between from the seats of before the commit
+    does not stay cached.
+    """
+    cache = get_cache()
+    cache.delete(_key(match_id))
+    transaction.on_commit(lambda: cache.delete(_key(match_id)))
+
+
+def invalidate_seat_map_of_seat(sender, instance: Seat, **kwargs):
+    """
+    `post_save` receiver evicting the seat map of the saved seat.
+
+    There is no `post_delete` counterpart, as it would stop Django from deleting
+    the seats of a match in bulk; code deleting seats evicts the seat map itself.
+    """
+    invalidate_seat_map(instance.match_id)
+
+
+def invalidate_seat_map_of_match(sender, instance: Match, **kwargs):
+    """
+    `post_save` and `post_delete` receiver evicting the seat map of the match, so
+    that a match never inherits the snapshot of a rolled back one with its ID.
+    """
+    invalidate_seat_map(instance.id)
+
+
+def get_matches_going_on_sale(window: timedelta) -> list[int]:
+    """
+    :param window: How far ahead to look.
+    :type window: timedelta
+    :return: The IDs of the scheduled matches whose sales open within `window`.
+    :rtype: list[int]
+    """
+    now = timezone.now()
+    return list(
+        Match.objects.filter(
+            status=Match.Status.SCHEDULED,
+            archived_at__isnull=True,
+            on_sale_at__gt=now,
+            on_sale_at__lte=now + window,
+        )
+        .order_by("on_sale_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def prewarm(match_id: int) -> dict:
+    """
+    Cache the seat map of a match and check it against the database.
+
+    The cached snapshot, brought up to date with the seat events, is compared
+    with one read from the seats afterwards. A mismatch means the cache missed a
+    change, e.g. seats written without an event. Either way the snapshot is
+    replaced by the one read from the database, which restarts its timeout.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :return: The match, its numbers of seats and available seats, and the IDs of
+        the seats the cached snapshot had wrong, if any.
+    :rtype: dict
+    """
+    seat_map = get_seat_map(match_id)
+    expected = build_seat_map(match_id)
+    if expected.cursor != seat_map.cursor:
+        # Seats changed in the meantime: compare as of the same cursor.
+        seat_map = get_seat_map(match_id)
+
+    mismatches = _diff(seat_map, expected)
+    get_cache().set(_key(match_id), expected, settings.SEAT_MAP_CACHE_TIMEOUT)
+
+    return {
+        "match": match_id,
+        "seats": len(expected.ids),
+        "available": expected.available,
+        "mismatches": mismatches,
+    }
+
+
+def _diff(cached: SeatMap, expected: SeatMap) -> list[int]:
+    if cached.ids != expected.ids or cached.seat_numbers != expected.seat_numbers:
+        return sorted(set(cached.ids).symmetric_difference(expected.ids)) or list(
+            expected.ids
+        )
+    return [
+        id
+        for id, reserved, expected_reserved in zip(
+            expected.ids, cached.reserved, expected.reserved
+        )
+        if reserved != expected_reserved
+    ]
@@ -1,10 +1,60 @@
 from django.core.exceptions import ValidationError
-from django.db.models import Q
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_serializer_method
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
-from matches.models import Match, Seat
+from matches import facade as matches_facade
+from matches.models import Match, MatchParticipation, Seat, SeatEvent, Team
+from ticketing.serializers import ValuesSerializer
+
+
+class TeamSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Team model.
+
+    ---
+    # Fields
+    - `id`: The unique identifier for the team.
+    - `name`: The name of the team, used to refer to it in matches.
+
+    # Validations
+    - A team with the same name, ignoring case, should not already exist.
+    """
+
+    class Meta:
+        model = Team
+        fields = ["id", "name"]
+
+    def validate_name(self, name):
+        """
+        Validate that no team has the same name, compared case-insensitively as
+        the season loader does.
+
+        :param name: The name of the team.
+        :type name: str
+        :raises serializers.ValidationError: If the name is taken.
+        :return: The name.
+        :rtype: str
+        """
+        if Team.objects.named(name).exists():
+            raise serializers.ValidationError("A team with this name already exists.")
+        return name
+
+
+class TeamNameField(serializers.SlugRelatedField):
+    """
+    A team referred to by its name, ignoring case.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(slug_field="name", queryset=Team.objects.all(), **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+        team = self.get_queryset().named(data).first()
+        if team is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+        return team
 
 
 class MatchSerializer(serializers.ModelSerializer):
@@ -15,24 +65,49 @@ class MatchSerializer(serializers.ModelSerializer):
     # Fields
     - `id`: The unique identifier for the match.
     - `stadium`: The stadium where the match is held.
-    - `home_side`: The home side participating in the match.
-    - `away_side`: The away side participating in the match.
+    - `home_side`: The name of the home team.
+    - `away_side`: The name of the away team.
     - `match_day`: The day on which the match takes place.
     - `match_time`: The time at which the match starts.
+    - `status`: `scheduled`, `postponed`, `cancelled` or `played`. Seats can only be
+      reserved while the match is scheduled.
+    - `on_sale_at`: When sales open. Optional, sales open right away by default.
+    - `off_sale_at`: When sales close. Optional, sales close at kick-off by default.
 
     # Validations
+    - Home and away sides should be existing teams, named in any case.
     - Home and away sides should be different.
     - Check if home or away sides have a match on the selected match day and time.
     - Check if the stadium is busy on the selected match day and time.
+    - Sales should open before they close.
     """
 
+    SIDES_BUSY = (
+        "Home side or away side have a match on the selected match day and time"
+    )
+    STADIUM_BUSY = "Stadium is busy on the selected match day and time"
+
+    home_side = TeamNameField()
+    away_side = TeamNameField()
+
     class Meta:
         model = Match
-        fields = ["id", "stadium", "home_side", "away_side", "match_day", "match_time"]
+        fields = [
+            "id",
+            "stadium",
+            "home_side",
+            "away_side",
+            "match_day",
+            "match_time",
+            "status",
+            "on_sale_at",
+            "off_sale_at",
+        ]
 
     def validate(self, data):
         self._validate_sides(data)
         self._validate_stadium(data)
+        self._validate_sales_window(data)
         return super().validate(data)
 
     def _validate_sides(self, data):
@@ -43,26 +118,11 @@ class MatchSerializer(serializers.ModelSerializer):
         :type data: dict
         :raises ValidationError: If validation fails.
         """
-        home_side = data.get("home_side")
-        away_side = data.get("away_side")
-        match_day = data.get("match_day")
-        match_time = data.get("match_time")
-
-        if home_side == away_side:
+        if data.get("home_side") == data.get("away_side"):
             raise ValidationError("Home and away sides are the same")
 
-        sides_have_match = Match.objects.filter(
-            Q(home_side=home_side)
-            | Q(away_side=home_side)
-            | Q(home_side=away_side)
-            | Q(away_side=away_side),
-            match_day=match_day,
-            match_time=match_time,
-        ).exists()
-        if sides_have_match:
-            raise ValidationError(
-                "Home side or away side have a match on the selected match day and time"
-            )
+        if self._sides_are_busy(data):
+            raise ValidationError(self.SIDES_BUSY)
 
     def _validate_stadium(self, data):
         """
@@ -72,17 +132,66 @@ class MatchSerializer(serializers.ModelSerializer):
         :type data: dict
         :raises ValidationError: If validation fails.
         """
-        match_day = data.get("match_day")
-        match_time = data.get("match_time")
-        stadium = data.get("stadium")
-
-        is_stadium_busy = Match.objects.filter(
-            stadium=stadium,
-            match_day=match_day,
-            match_time=match_time,
+        if self._stadium_is_busy(data):
+            raise ValidationError(self.STADIUM_BUSY)
+
+    def _sides_are_busy(self, data) -> bool:
+        return MatchParticipation.objects.filter(
+            team__in=[data.get("home_side"), data.get("away_side")],
+            match_day=data.get("match_day"),
+            match_time=data.get("match_time"),
         ).exists()
-        if is_stadium_busy:
-            raise ValidationError("Stadium is busy on the selected match day and time")
+
+    def _stadium_is_busy(self, data) -> bool:
+        return Match.objects.filter(
+            stadium=data.get("stadium"),
+            match_day=data.get("match_day"),
+            match_time=data.get("match_time"),
+        ).exists()
+
+    def _validate_sales_window(self, data):
+        """
+        Validate that sales open before they close.
+
+        :param data: The data to be validated.
+        :type data: dict
+        :raises ValidationError: If validation fails.
+        """
+        on_sale_at = data.get("on_sale_at")
+        off_sale_at = data.get("off_sale_at")
+
+        if on_sale_at and off_sale_at and on_sale_at >= off_sale_at:
+            raise ValidationError("Sales should open before they close")
+
+    def create(self, validated_data):
+        """
+        Create the match and the participations of both sides.
+
+        The participations are the authority on the sides' schedule: if a concurrent
+        request booked one of the sides in the same slot after validation, the
+        unique constraint rejects this match as a whole. Likewise for a match
+        created at the stadium in the same slot. The slot is read again to tell
+        these races apart from any other constraint violation, which is raised
+        as is.
+
+        :param validated_data: The validated match data.
+        :type validated_data: dict
+        :raises ValidationError: If the stadium or a side was booked in the
+            meantime.
+        :return: The created match.
+        :rtype: Match
+        """
+        try:
+            with transaction.atomic():
+                match = super().create(validated_data)
+                matches_facade.book_sides(match)
+        except IntegrityError:
+            if self._stadium_is_busy(validated_data):
+                raise serializers.ValidationError(self.STADIUM_BUSY)
+            if self._sides_are_busy(validated_data):
+                raise serializers.ValidationError(self.SIDES_BUSY)
+            raise
+        return match
 
 
 class SeatSerializer(serializers.ModelSerializer):
@@ -100,3 +209,118 @@ class SeatSerializer(serializers.ModelSerializer):
     class Meta:
         model = Seat
         fields = ["id", "match", "seat_number", "is_reserved"]
+
+
+class SeatUploadSerializer(serializers.Serializer):
+    """
+    Serializer for the seats of a large upload, added by a background job.
+
+    Only the shape of the data is validated; duplicates are checked by the job.
+
+    ---
+    # Fields
+    - `seat_number`: The seat number.
+    """
+
+    seat_number = serializers.IntegerField()
+
+
+class SeatEventSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the SeatEvent model.
+
+    ---
+    # Fields
+    - `sequence`: The position of the event in the change log, used as the cursor.
+    - `match`: The match the seat belongs to.
+    - `seat`: The seat whose state changed.
+    - `old_state`: The state before the change.
+    - `new_state`: The state after the change.
+    - `created_at`: When the change was committed.
+    """
+
+    sequence = serializers.IntegerField(source="id", read_only=True)
+
+    class Meta:
+        model = SeatEvent
+        fields = ["sequence", "match", "seat", "old_state", "new_state", "created_at"]
+
+
+class SeatUploadQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a seat upload.
+
+    ---
+    # Fields
+    - `stream`: Whether to stream the upload, e.g. `true` or `0`. Defaults to false.
+    """
+
+    stream = serializers.BooleanField(default=False)
+
+
+class SeatEventsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the seat change log.
+
+    ---
+    # Fields
+    - `after`: Return only events with a greater sequence. Defaults to 0.
+    - `limit`: Maximum number of events to return. Defaults to 500.
+    """
+
+    after = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
+
+
+class MatchListQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the match listing.
+
+    ---
+    # Fields
+    - `page`: The page to return, from 1. Defaults to 1.
+    - `page_size`: Maximum number of matches per page. Defaults to 100.
+    """
+
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=500, default=100)
+
+
+class MatchListSerializer(ValuesSerializer):
+    """
+    Read-only fast-path serializer for match listings.
+
+    ---
+    # Fields
+    Same as `MatchSerializer`.
+    """
+
+    fields = {
+        "id": "id",
+        "stadium": "stadium_id",
+        "home_side": "home_side__name",
+        "away_side": "away_side__name",
+        "match_day": "match_day",
+        "match_time": "match_time",
+        "status": "status",
+        "on_sale_at": "on_sale_at",
+        "off_sale_at": "off_sale_at",
+    }
+
+
+class SeatMapSerializer(ValuesSerializer):
+    """
+    Read-only fast-path serializer for the seat map of a match.
+
+    ---
+    # Fields
+    - `id`: The unique identifier for the seat.
+    - `seat_number`: The seat number.
+    - `is_reserved`: Indicates whether the seat is reserved.
+    """
+
+    fields = {
+        "id": "id",
+        "seat_number": "seat_number",
+        "is_reserved": "is_reserved",
+    }
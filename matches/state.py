@@ -0,0 +1,120 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from matches.models import Match
+
+NOT_ON_SALE = "Match is not on sale yet"
+SALES_CLOSED = "Sales are closed for this match"
+
+
+@dataclass(frozen=True)
+class MatchState:
+    """
+    What the reservation path needs to know about a match, without its relations.
+    """
+
+    id: int
+    status: str
+    on_sale_at: datetime | None
+    off_sale_at: datetime
+
+    @classmethod
+    def from_row(cls, id, status, on_sale_at, off_sale_at, match_day, match_time):
+        if off_sale_at is None:
+            off_sale_at = timezone.make_aware(datetime.combine(match_day, match_time))
+        return cls(id, status, on_sale_at, off_sale_at)
+
+    def sale_error(self, now: datetime) -> str | None:
+        """
+        :param now: The current time.
+        :type now: datetime
+        :return: Why seats of the match cannot be reserved at `now`, or None if
+            the match is on sale.
+        :rtype: str | None
+        """
+        if self.status != Match.Status.SCHEDULED or now >= self.off_sale_at:
+            return SALES_CLOSED
+        if self.on_sale_at is not None and now < self.on_sale_at:
+            return NOT_ON_SALE
+        return None
+
+
+class MatchStateCache:
+    """
+    Per-process cache of match states, each kept for `ttl` seconds.
+
+    During a pre-sale stampede, every request for a match that is not on sale is
+    answered from memory. Misses are cached too, so unknown IDs cost one query per
+    `ttl` as well. Saving or deleting a match evicts it from the cache of the
+    process doing it; other processes see the change within `ttl`. When `max_size`
+    states are cached, the oldest entry is evicted.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict[int, tuple[float, MatchState | None]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "MatchStateCache":
+        return cls(
+            ttl=settings.MATCH_STATE_CACHE_TTL,
+            max_size=settings.MATCH_STATE_CACHE_SIZE,
+        )
+
+    def get(self, match_id: int) -> MatchState | None:
+        """
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The state of the match, or None if it does not exist.
+        :rtype: MatchState | None
+        """
+        now = time.monotonic()
+        entry = self._entries.get(match_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        row = (
+            Match.objects.filter(id=match_id)
+            .values_list(
+                "id", "status", "on_sale_at", "off_sale_at", "match_day", "match_time"
+            )
+            .first()
+        )
+        state = MatchState.from_row(*row) if row else None
+        with self._lock:
+            self._entries.pop(match_id, None)
+            while len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+            self._entries[match_id] = (now + self.ttl, state)
+        return state
+
+    def invalidate(self, match_id: int | None = None):
+        """
+        Evict a match, or every match if `match_id` is None.
+        """
+        with self._lock:
+            if match_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(match_id, None)
+
+
+CACHE = MatchStateCache.from_settings()
+
+
+def get_match_state(match_id: int) -> MatchState | None:
+    return CACHE.get(match_id)
+
+
+def invalidate_match_state(sender, instance: Match, **kwargs):
+    """
+    `post_save` and `post_delete` receiver evicting the saved match.
+    """
+    CACHE.invalidate(instance.id)
@@ -0,0 +1,17 @@
+from jobs.models import Job
+from jobs.registry import register
+from matches import facade as matches_facade
+from matches.metrics import SEATS_CREATED
+
+
+@register("matches.add_seats")
+def add_seats(job: Job, match_id: int, seat_numbers: list[int]) -> dict:
+    """
+    Add a large upload of seats to a match, see `AddMatchSeatsView`.
+    """
+    job.set_progress(0, len(seat_numbers))
+    created = matches_facade.add_seats(
+        match_id, seat_numbers, progress=job.set_progress
+    )
+    SEATS_CREATED.inc(created, match=match_id)
+    return {"created": created}
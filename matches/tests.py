@@ -1,8 +1,33 @@
+import csv
+import io
+import json
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase
 
-from matches.models import Match, Seat
+from jobs.models import Job
+from jobs.worker import Worker
+from matches import facade, seatmap, state
+from matches.models import Match, MatchParticipation, Seat, SeatEvent, Team
+from matches.renderers import SeatMapRLERenderer, decode_seat_runs, encode_seat_runs
+from matches.serializers import MatchSerializer
+from matches.state import NOT_ON_SALE, SALES_CLOSED, MatchState, MatchStateCache
+from matches.views import AddMatchSeatsView
+from reservation.models import Reservation
 from stadiums.models import Stadium
 
 
@@ -14,6 +39,9 @@ class AddMatchViewTest(APITestCase):
         self.normal_user = User.objects.create_user(username="normal_user")
         self.stadium_1 = Stadium.objects.create(name="stadium_1", location="some_city")
         self.stadium_2 = Stadium.objects.create(name="stadium_2", location="some_city")
+        self.team_1, self.team_2, self.team_3, self.team_4 = Team.objects.bulk_create(
+            Team(name=f"Team {number}") for number in range(1, 5)
+        )
 
         self.client.force_authenticate(user=self.super_user)
 
@@ -33,48 +61,112 @@ class AddMatchViewTest(APITestCase):
             "stadium": stadium_id or self.stadium_1.id,
         }
 
+    def _create_match(self, home_side, away_side, stadium, data):
+        match = Match.objects.create(
+            home_side=home_side,
+            away_side=away_side,
+            match_day=data["match_day"],
+            match_time=data["match_time"],
+            stadium=stadium,
+        )
+        facade.book_sides(match)
+        return match
+
     def test_add_new_match(self):
         response = self.client.post(self.endpoint, self._create_match_data())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        match = Match.objects.get(stadium=self.stadium_1)
+        self.assertEqual(response.data.get("id"), match.id)
+        self.assertEqual(response.data.get("home_side"), "Team 1")
         self.assertEqual(
-            response.data.get("id"), Match.objects.get(stadium=self.stadium_1).id
+            set(
+                MatchParticipation.objects.filter(match=match).values_list(
+                    "team__name", flat=True
+                )
+            ),
+            {"Team 1", "Team 2"},
         )
 
+    def test_add_match_with_team_names_in_another_case(self):
+        data = self._create_match_data(home_side="team 1", away_side="TEAM 2")
+        response = self.client.post(self.endpoint, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data.get("away_side"), "Team 2")
+
+    def test_add_match_with_unknown_team(self):
+        data = self._create_match_data(away_side="Team 5")
+        response = self.client.post(path=self.endpoint, data=data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Team.objects.filter(name="Team 5").exists())
+
     def test_add_match_with_duplicate_home_side_and_datetime(self):
         data = self._create_match_data()
-        Match.objects.create(
-            home_side=data["home_side"],
-            away_side="Team 3",
-            match_day=data["match_day"],
-            match_time=data["match_time"],
-            stadium=self.stadium_2,
-        )
+        self._create_match(self.team_1, self.team_3, self.stadium_2, data)
         response = self.client.post(path=self.endpoint, data=data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_add_match_with_duplicate_away_side_and_datetime(self):
         data = self._create_match_data()
-        Match.objects.create(
-            home_side="Team 3",
-            away_side=data["home_side"],
-            match_day=data["match_day"],
-            match_time=data["match_time"],
-            stadium=self.stadium_2,
-        )
+        self._create_match(self.team_3, self.team_1, self.stadium_2, data)
         response = self.client.post(path=self.endpoint, data=data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_add_match_with_same_stadium_and_datetime(self):
         data = self._create_match_data()
-        Match.objects.create(
-            home_side="Team 3",
-            away_side="team_4",
+        self._create_match(self.team_3, self.team_4, self.stadium_1, data)
+        response = self.client.post(path=self.endpoint, data=data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_participation_rejects_team_booked_twice_in_slot(self):
+        data = self._create_match_data()
+        self._create_match(self.team_1, self.team_2, self.stadium_1, data)
+        match = Match.objects.create(
+            home_side=self.team_3,
+            away_side=self.team_2,
             match_day=data["match_day"],
             match_time=data["match_time"],
-            stadium=self.stadium_1,
+            stadium=self.stadium_2,
         )
-        response = self.client.post(path=self.endpoint, data=data)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            facade.book_sides(match)
+
+    def _validated_serializer(self, data):
+        serializer = MatchSerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer
+
+    def test_side_booked_after_validation(self):
+        data = self._create_match_data()
+        serializer = self._validated_serializer(data)
+        self._create_match(self.team_3, self.team_1, self.stadium_2, data)
+
+        with self.assertRaises(ValidationError) as context:
+            serializer.save()
+
+        self.assertEqual(context.exception.detail, [MatchSerializer.SIDES_BUSY])
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_stadium_booked_after_validation(self):
+        data = self._create_match_data()
+        serializer = self._validated_serializer(data)
+        self._create_match(self.team_3, self.team_4, self.stadium_1, data)
+
+        with self.assertRaises(ValidationError) as context:
+            serializer.save()
+
+        self.assertEqual(context.exception.detail, [MatchSerializer.STADIUM_BUSY])
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_busy_slot(self):
+        serializer = self._validated_serializer(self._create_match_data())
+
+        with mock.patch.object(
+            facade, "book_sides", side_effect=IntegrityError("some constraint")
+        ), self.assertRaises(IntegrityError):
+            serializer.save()
+
+        self.assertFalse(Match.objects.exists())
 
     def test_add_match_with_same_sides(self):
         data = self._create_match_data(away_side="Team 1")
@@ -128,15 +220,57 @@ class AddMatchViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class AddTeamViewTest(APITestCase):
+    def setUp(self):
+        self.endpoint = "/api/matches/team/"
+        self.client.force_authenticate(
+            user=User.objects.create_superuser(username="super_user")
+        )
+
+    def test_add_team(self):
+        response = self.client.post(self.endpoint, {"name": "Esteghlal"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], "Esteghlal")
+        self.assertTrue(Team.objects.filter(name="Esteghlal").exists())
+
+    def test_add_existing_team(self):
+        Team.objects.create(name="Esteghlal")
+
+        response = self.client.post(self.endpoint, {"name": "esteghlal"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Team.objects.count(), 1)
+
+    def test_team_names_are_unique_regardless_of_case(self):
+        Team.objects.create(name="Esteghlal")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Team.objects.create(name="ESTEGHLAL")
+        self.assertEqual(Team.objects.named("esteghlal").get().name, "Esteghlal")
+
+    def test_normal_user_cannot_add_team(self):
+        self.client.force_authenticate(
+            user=User.objects.create_user(username="normal_user")
+        )
+
+        response = self.client.post(self.endpoint, {"name": "Esteghlal"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class AddMatchSeatsViewTest(APITestCase):
     def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
         self.super_user = User.objects.create_superuser(username="super_user")
         self.normal_user = User.objects.create_user(username="normal_user")
         self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
         self.match = Match.objects.create(
             stadium=self.stadium,
-            home_side="Team 1",
-            away_side="Team 2",
+            home_side=self.team_1,
+            away_side=self.team_2,
             match_day="2024-01-01",
             match_time="15:00:00",
         )
@@ -173,3 +307,851 @@ class AddMatchSeatsViewTest(APITestCase):
         data = self._create_seats_data([1, 2])
         response = self.client.post(self.endpoint, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_add_seats_in_background(self):
+        data = self._create_seats_data(range(1, 6))
+        response = self.client.post(
+            self.endpoint, data, format="json", HTTP_PREFER="respond-async"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Seat.objects.filter(match=self.match).exists())
+
+        self.assertTrue(Worker("test").run_once())
+        job = Job.objects.get(id=response.data["job"])
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.result, {"created": 5})
+        self.assertEqual((job.progress, job.total), (5, 5))
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 5)
+
+    def test_large_upload_without_prefer_is_synchronous(self):
+        data = self._create_seats_data(range(1, 1502))
+        response = self.client.post(self.endpoint, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 1501)
+
+    def test_add_duplicate_seats_in_background(self):
+        Seat.objects.create(match=self.match, seat_number=1)
+        data = self._create_seats_data([1, 2, 3])
+        response = self.client.post(
+            self.endpoint, data, format="json", HTTP_PREFER="respond-async"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        Worker("test").run_once()
+        job = Job.objects.get(id=response.data["job"])
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("Seats already exist or are repeated: 1", job.error)
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 1)
+
+    def test_add_invalid_seats_in_background(self):
+        data = {"seats": [{"seat_number": "one"}]}
+        response = self.client.post(
+            self.endpoint, data, format="json", HTTP_PREFER="respond-async"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def _post_ndjson(self, seat_numbers):
+        body = "".join(
+            json.dumps({"seat_number": seat_number}) + "\n"
+            for seat_number in seat_numbers
+        )
+        return self.client.post(
+            self.endpoint, body, content_type="application/x-ndjson"
+        )
+
+    def test_stream_ndjson_upload(self):
+        with mock.patch("matches.views.AddMatchSeatsView.stream_chunk_size", 100):
+            response = self._post_ndjson(range(1, 1001))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1000)
+        self.assertGreater(response.data["peak_buffer_size"], 0)
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 1000)
+
+    def test_stream_json_upload(self):
+        data = self._create_seats_data([1, 2, 3])
+        response = self.client.post(f"{self.endpoint}?stream=true", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 3)
+
+    def test_stream_flag_is_a_boolean(self):
+        data = self._create_seats_data([1, 2])
+        response = self.client.post(
+            f"{self.endpoint}?stream=false", data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("created", response.data)
+
+        response = self.client.post(
+            f"{self.endpoint}?stream=maybe", data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("stream", response.data)
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 2)
+
+    def _stream_peak_memory(self, seat_numbers) -> int:
+        stream_seats = AddMatchSeatsView._stream_seats
+        peaks = []
+
+        def traced(view, request, match):
+            tracemalloc.start()
+            try:
+                return stream_seats(view, request, match)
+            finally:
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+        with mock.patch.object(AddMatchSeatsView, "_stream_seats", traced):
+            self._post_ndjson(seat_numbers)
+        return peaks[0]
+
+    def test_stream_memory_does_not_grow_with_upload(self):
+        with mock.patch("matches.views.AddMatchSeatsView.stream_chunk_size", 200):
+            small = self._stream_peak_memory(range(1, 1001))
+            large = self._stream_peak_memory(range(1001, 11001))
+
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 11000)
+        # Ten times the seats, about the same peak: one chunk at a time.
+        self.assertLess(large, small * 2)
+
+    def test_stream_rolls_back_duplicates(self):
+        Seat.objects.create(match=self.match, seat_number=1500)
+        with mock.patch("matches.views.AddMatchSeatsView.stream_chunk_size", 1000):
+            response = self._post_ndjson(range(1, 2001))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["error"], "Seats already exist or are repeated: 1500"
+        )
+
+        with mock.patch("matches.views.AddMatchSeatsView.stream_chunk_size", 2):
+            response = self._post_ndjson([10, 11, 12, 10])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["error"], "Seats already exist or are repeated: 10"
+        )
+        self.assertEqual(Seat.objects.filter(match=self.match).count(), 1)
+
+    def test_stream_invalid_upload(self):
+        response = self.client.post(
+            self.endpoint,
+            '{"seat_number": 1}\n{"seat_number": 2}\n{"seat_number": "x"}\n',
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data["seats"]), [2])
+
+        response = self.client.post(
+            self.endpoint,
+            '{"seat_number": 1}\n{"seat_number": ',
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.data["error"].startswith("Malformed upload"))
+        self.assertFalse(Seat.objects.filter(match=self.match).exists())
+
+
+class SeatEventsViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.super_user = User.objects.create_superuser(username="super_user")
+        self.normal_user = User.objects.create_user(username="normal_user")
+        self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.seats = [
+            Seat.objects.create(match=self.match, seat_number=number)
+            for number in range(1, 4)
+        ]
+        facade.record_seat_events(
+            match_id=self.match.id,
+            seat_ids=[seat.id for seat in self.seats],
+            old_state=SeatEvent.State.AVAILABLE,
+            new_state=SeatEvent.State.RESERVED,
+        )
+
+        self.endpoint = f"/api/matches/match/{self.match.id}/events/"
+
+        self.client.force_authenticate(user=self.super_user)
+
+    def test_list_events_in_pages(self):
+        response = self.client.get(self.endpoint, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get("events")), 2)
+        self.assertTrue(response.data.get("has_more"))
+
+        response = self.client.get(self.endpoint, {"after": response.data["cursor"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [event["seat"] for event in response.data.get("events")],
+            [self.seats[2].id],
+        )
+        self.assertFalse(response.data.get("has_more"))
+
+    def test_list_events_for_invalid_match(self):
+        response = self.client.get("/api/matches/match/100/events/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_events_as_normal_user(self):
+        self.client.force_authenticate(user=self.normal_user)
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_iter_events_in_chunks(self):
+        events = list(facade.iter_seat_events(match_id=self.match.id, chunk_size=2))
+        self.assertEqual(
+            [event.seat_id for event in events], [s.id for s in self.seats]
+        )
+
+
+class LoadSeasonCommandTest(APITestCase):
+    def setUp(self):
+        season_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(season_dir.cleanup)
+        self.season_dir = Path(season_dir.name)
+
+    def _write_jsonl(self, records):
+        path = self.season_dir / "season.jsonl"
+        path.write_text("".join(json.dumps(record) + "\n" for record in records))
+        return path
+
+    def _season_records(self):
+        match = {
+            "stadium_name": "stadium_1",
+            "stadium_location": "some_city",
+            "match_day": "2024-01-01",
+            "match_time": "15:00:00",
+        }
+        return [
+            {"type": "stadium", "name": "stadium_1", "location": "some_city"},
+            {"type": "match", "home_side": "Team 1", "away_side": "Team 2", **match},
+            {"type": "seats", "seat_from": 1, "seat_to": 100, **match},
+            {"type": "seats", "seat_number": 101, **match},
+        ]
+
+    def test_load_season(self):
+        path = self._write_jsonl(self._season_records())
+
+        call_command("load_season", path, batch_size=30, stdout=io.StringIO())
+
+        self.assertEqual(Stadium.objects.count(), 1)
+        self.assertEqual(Match.objects.count(), 1)
+        self.assertEqual(Seat.objects.filter(is_reserved=False).count(), 101)
+
+    def test_load_season_twice(self):
+        path = self._write_jsonl(self._season_records())
+
+        call_command("load_season", path, stdout=io.StringIO())
+        output = io.StringIO()
+        call_command("load_season", path, stdout=output)
+
+        self.assertEqual(Match.objects.count(), 1)
+        self.assertEqual(Seat.objects.count(), 101)
+        self.assertIn("0 matches and 0 seats", output.getvalue())
+
+    def test_load_season_from_csv(self):
+        path = self.season_dir / "season.csv"
+        with open(path, "w", newline="") as season_file:
+            writer = csv.DictWriter(
+                season_file,
+                fieldnames=[
+                    "type",
+                    "name",
+                    "location",
+                    "stadium_name",
+                    "stadium_location",
+                    "home_side",
+                    "away_side",
+                    "match_day",
+                    "match_time",
+                    "seat_number",
+                    "seat_from",
+                    "seat_to",
+                ],
+            )
+            writer.writeheader()
+            writer.writerows(self._season_records())
+
+        call_command("load_season", path, stdout=io.StringIO())
+
+        self.assertEqual(Seat.objects.count(), 101)
+
+    def test_load_season_creates_teams_once(self):
+        records = self._season_records()
+        records.append(
+            {
+                **records[1],
+                "home_side": " team 1 ",
+                "away_side": "Team 3",
+                "match_day": "2024-01-08",
+            }
+        )
+        path = self._write_jsonl(records)
+
+        call_command("load_season", path, stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(Team.objects.values_list("name", flat=True)),
+            ["Team 1", "Team 2", "Team 3"],
+        )
+        self.assertEqual(MatchParticipation.objects.count(), 4)
+
+    def test_load_season_with_team_playing_twice_in_slot(self):
+        records = self._season_records()
+        records.insert(
+            1, {"type": "stadium", "name": "stadium_2", "location": "some_city"}
+        )
+        records.append(
+            {**records[2], "stadium_name": "stadium_2", "home_side": "Team 3"}
+        )
+        path = self._write_jsonl(records)
+
+        with self.assertRaisesMessage(CommandError, "line 6: Team 2 already plays"):
+            call_command("load_season", path, stdout=io.StringIO())
+
+    def test_load_season_with_unknown_stadium(self):
+        path = self._write_jsonl(self._season_records()[1:])
+
+        with self.assertRaisesMessage(CommandError, "line 1: unknown stadium"):
+            call_command("load_season", path, stdout=io.StringIO())
+
+    def test_load_season_with_malformed_line(self):
+        path = self._write_jsonl(self._season_records())
+        with open(path, "a") as season_file:
+            season_file.write('{"type": "seats", \n')
+
+        with self.assertRaisesMessage(CommandError, "line 5: malformed record"):
+            call_command("load_season", path, stdout=io.StringIO())
+
+    def test_load_season_through_bulk_create(self):
+        # Backends without `ON CONFLICT DO NOTHING` go through `bulk_create`.
+        path = self._write_jsonl(self._season_records())
+
+        with mock.patch("matches.loader.connection", mock.Mock(vendor="oracle")):
+            call_command("load_season", path, stdout=io.StringIO())
+            output = io.StringIO()
+            call_command("load_season", path, stdout=output)
+
+        self.assertEqual(Seat.objects.count(), 101)
+        self.assertIn("0 seats", output.getvalue())
+
+
+class MatchListViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.endpoint = "/api/matches/"
+
+        self.user = User.objects.create_user(username="user")
+        self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.matches = [
+            Match.objects.create(
+                stadium=self.stadium,
+                home_side=self.team_1,
+                away_side=self.team_2,
+                match_day=match_day,
+                match_time="15:00:00",
+            )
+            for match_day in ("2024-01-02", "2024-01-01")
+        ]
+
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_matches(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "matches": MatchSerializer(reversed(self.matches), many=True).data,
+                "count": 2,
+                "has_more": False,
+            },
+        )
+
+    def test_list_matches_by_page(self):
+        response = self.client.get(self.endpoint, {"page_size": 1})
+        self.assertEqual(
+            [match["id"] for match in response.json()["matches"]],
+            [self.matches[1].id],
+        )
+        self.assertEqual(response.json()["count"], 2)
+        self.assertTrue(response.json()["has_more"])
+
+        response = self.client.get(self.endpoint, {"page": 2, "page_size": 1})
+        self.assertEqual(
+            [match["id"] for match in response.json()["matches"]],
+            [self.matches[0].id],
+        )
+        self.assertFalse(response.json()["has_more"])
+
+    def test_list_matches_past_last_page(self):
+        response = self.client.get(self.endpoint, {"page": 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_matches_with_invalid_page_size(self):
+        response = self.client.get(self.endpoint, {"page_size": 501})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_matches_unauthenticated(self):
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SeatMapViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.user = User.objects.create_user(username="user")
+        self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        for seat_number in (2, 1):
+            Seat.objects.create(
+                match=self.match, seat_number=seat_number, is_reserved=seat_number == 2
+            )
+
+        self.endpoint = f"/api/matches/match/{self.match.id}/seat-map/"
+
+        self.client.force_authenticate(user=self.user)
+
+    def test_seat_map(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(seat["seat_number"], seat["is_reserved"]) for seat in response.json()],
+            [(1, False), (2, True)],
+        )
+
+    def test_seat_map_for_invalid_match(self):
+        response = self.client.get("/api/matches/match/100/seat-map/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_seat_map_rle(self):
+        response = self.client.get(
+            self.endpoint, HTTP_ACCEPT=SeatMapRLERenderer.media_type
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], SeatMapRLERenderer.media_type)
+        self.assertEqual(
+            [
+                (seat["seat_number"], seat["is_reserved"])
+                for seat in decode_seat_runs(json.loads(response.content)["runs"])
+            ],
+            [(1, False), (2, True)],
+        )
+
+    def test_encode_seat_runs(self):
+        seats = [
+            {"id": 10, "seat_number": 1, "is_reserved": False},
+            {"id": 11, "seat_number": 2, "is_reserved": False},
+            {"id": 12, "seat_number": 3, "is_reserved": True},
+            {"id": 13, "seat_number": 4, "is_reserved": True},
+            {"id": 20, "seat_number": 5, "is_reserved": True},
+        ]
+
+        runs = encode_seat_runs(seats)
+
+        self.assertEqual(runs, [[10, 1, 2, 0], [12, 3, 2, 1], [20, 5, 1, 1]])
+        self.assertEqual(decode_seat_runs(runs), seats)
+
+
+class MatchStateCacheTest(APITestCase):
+    def setUp(self):
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.match = Match.objects.create(
+            stadium=Stadium.objects.create(name="some_stadium", location="some_city"),
+            home_side=team_1,
+            away_side=team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.cache = MatchStateCache(ttl=60, max_size=2)
+
+    def test_states_are_cached_until_they_expire(self):
+        with self.assertNumQueries(2):
+            match_state = self.cache.get(self.match.id)
+            self.assertIsNone(self.cache.get(self.match.id + 1))
+        with self.assertNumQueries(0):
+            self.assertIs(self.cache.get(self.match.id), match_state)
+            self.assertIsNone(self.cache.get(self.match.id + 1))
+
+        self.assertEqual(
+            match_state.off_sale_at, datetime(2024, 1, 1, 15, tzinfo=dt_timezone.utc)
+        )
+        with mock.patch("matches.state.time.monotonic", return_value=1e12):
+            with self.assertNumQueries(1):
+                self.cache.get(self.match.id)
+
+    def test_oldest_state_is_evicted(self):
+        for match_id in range(1, 4):
+            self.cache.get(match_id)
+
+        self.assertEqual(list(self.cache._entries), [2, 3])
+
+    def test_saving_a_match_evicts_its_state(self):
+        state.CACHE.get(self.match.id)
+
+        self.match.status = Match.Status.POSTPONED
+        self.match.save()
+
+        self.assertEqual(state.get_match_state(self.match.id).status, "postponed")
+
+    def test_sale_error(self):
+        now = timezone.now()
+        on_sale = MatchState(1, "scheduled", now, now + timedelta(hours=1))
+
+        self.assertIsNone(on_sale.sale_error(now))
+        self.assertEqual(on_sale.sale_error(now - timedelta(seconds=1)), NOT_ON_SALE)
+        self.assertEqual(on_sale.sale_error(now + timedelta(hours=1)), SALES_CLOSED)
+        self.assertEqual(
+            MatchState(1, "played", None, now + timedelta(hours=1)).sale_error(now),
+            SALES_CLOSED,
+        )
+
+
+class SeatMapCacheTest(APITestCase):
+    def setUp(self):
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=team_1,
+            away_side=team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+            on_sale_at=timezone.now() + timedelta(minutes=30),
+        )
+        facade.add_seats(self.match.id, [3, 1, 2])
+        self.seats = list(Seat.objects.order_by("seat_number"))
+        seatmap.get_cache().clear()
+
+    def _reserve(self, seat: Seat):
+        Seat.objects.filter(id=seat.id).update(is_reserved=True)
+        facade.record_seat_events(
+            self.match.id,
+            [seat.id],
+            SeatEvent.State.AVAILABLE,
+            SeatEvent.State.RESERVED,
+        )
+
+    def test_seat_map_is_cached(self):
+        with self.assertNumQueries(2):
+            seat_map = seatmap.get_seat_map(self.match.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(seatmap.get_seat_map(self.match.id), seat_map)
+
+        self.assertEqual(list(seat_map.seat_numbers), [1, 2, 3])
+        self.assertEqual(seat_map.available, 3)
+
+    def test_events_are_replayed(self):
+        seatmap.get_seat_map(self.match.id)
+        self._reserve(self.seats[1])
+
+        with self.assertNumQueries(1):
+            seat_map = seatmap.get_seat_map(self.match.id)
+
+        self.assertEqual(
+            [seat["is_reserved"] for seat in seat_map.to_data()], [False, True, False]
+        )
+        self.assertEqual(seat_map.cursor, SeatEvent.objects.get().id)
+
+    def test_late_events_below_the_cursor_are_replayed(self):
+        self._reserve(self.seats[0])
+        cursor = SeatEvent.objects.get().id + 5
+        SeatEvent.objects.create(
+            id=cursor,
+            match=self.match,
+            seat=self.seats[0],
+            old_state=SeatEvent.State.RESERVED,
+            new_state=SeatEvent.State.RESERVED,
+        )
+        self.assertEqual(seatmap.get_seat_map(self.match.id).cursor, cursor)
+
+        # Committed after the snapshot was taken, with an ID allocated before.
+        Seat.objects.filter(id=self.seats[2].id).update(is_reserved=True)
+        SeatEvent.objects.create(
+            id=cursor - 2,
+            match=self.match,
+            seat=self.seats[2],
+            old_state=SeatEvent.State.AVAILABLE,
+            new_state=SeatEvent.State.RESERVED,
+        )
+
+        with self.assertNumQueries(1):
+            seat_map = seatmap.get_seat_map(self.match.id)
+
+        self.assertEqual(
+            [seat["is_reserved"] for seat in seat_map.to_data()], [True, False, True]
+        )
+        self.assertEqual(seat_map.cursor, cursor)
+
+    def test_too_many_events_rebuild(self):
+        seatmap.get_seat_map(self.match.id)
+        self._reserve(self.seats[0])
+        self._reserve(self.seats[1])
+
+        with mock.patch("matches.seatmap.MAX_REPLAYED_EVENTS", 1):
+            with self.assertNumQueries(3):
+                seat_map = seatmap.get_seat_map(self.match.id)
+
+        self.assertEqual(seat_map.available, 1)
+
+    def test_adding_seats_evicts_the_seat_map(self):
+        seatmap.get_seat_map(self.match.id)
+
+        facade.add_seats(self.match.id, [4])
+
+        self.assertEqual(len(seatmap.get_seat_map(self.match.id).ids), 4)
+
+    def test_seat_map_view_is_served_from_the_cache(self):
+        self.client.force_authenticate(User.objects.create_user(username="user"))
+        endpoint = f"/api/matches/match/{self.match.id}/seat-map/"
+        self.client.get(endpoint)
+        self._reserve(self.seats[2])
+
+        response = self.client.get(endpoint)
+
+        self.assertEqual(
+            [seat["is_reserved"] for seat in response.json()], [False, False, True]
+        )
+
+    def test_prewarm_matches_going_on_sale(self):
+        later = Match.objects.create(
+            stadium=self.stadium,
+            home_side=Team.objects.create(name="Team 3"),
+            away_side=Team.objects.create(name="Team 4"),
+            match_day="2024-01-02",
+            match_time="15:00:00",
+            on_sale_at=timezone.now() + timedelta(hours=3),
+        )
+        out = io.StringIO()
+
+        call_command("prewarm_seat_maps", window=3600, stdout=out)
+
+        self.assertIn(f"Match {self.match.id}: 3 seats, 3 available", out.getvalue())
+        self.assertIn("Warmed 1 seat maps.", out.getvalue())
+        self.assertIsNotNone(seatmap.get_cache().get(f"seat-map:{self.match.id}"))
+        self.assertIsNone(seatmap.get_cache().get(f"seat-map:{later.id}"))
+
+    def test_prewarm_rebuilds_inconsistent_seat_maps(self):
+        seatmap.get_seat_map(self.match.id)
+        # Reserved without an event, so the cached snapshot cannot see it.
+        Seat.objects.filter(id=self.seats[0].id).update(is_reserved=True)
+
+        with self.assertRaisesMessage(
+            CommandError, "1 of 1 seat maps were inconsistent"
+        ):
+            call_command(
+                "prewarm_seat_maps",
+                match_ids=[self.match.id],
+                stdout=io.StringIO(),
+                stderr=io.StringIO(),
+            )
+
+        self.assertEqual(seatmap.get_seat_map(self.match.id).available, 2)
+        self.assertEqual(seatmap.prewarm(self.match.id)["mismatches"], [])
+
+
+class MatchAdminTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2, self.team_3 = Team.objects.bulk_create(
+            Team(name=f"Team {number}") for number in range(1, 4)
+        )
+        self.stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+        self.endpoint = "/admin/matches/match/add/"
+
+    def _post(self, home_side: Team, away_side: Team, stadium: Stadium | None = None):
+        return self.client.post(
+            self.endpoint,
+            {
+                "stadium": (stadium or self.stadium).id,
+                "home_side": home_side.id,
+                "away_side": away_side.id,
+                "match_day": "2024-01-01",
+                "match_time": "15:00:00",
+                "status": Match.Status.SCHEDULED,
+            },
+        )
+
+    def test_add_match_books_sides(self):
+        response = self._post(self.team_1, self.team_2)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(MatchParticipation.objects.count(), 2)
+
+    def test_busy_side_is_a_form_error(self):
+        self._post(self.team_1, self.team_2)
+        other_stadium = Stadium.objects.create(name="other", location="some_city")
+
+        response = self._post(self.team_2, self.team_3, stadium=other_stadium)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, MatchSerializer.SIDES_BUSY)
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_same_sides_is_a_form_error(self):
+        response = self._post(self.team_1, self.team_1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Home and away sides are the same")
+        self.assertFalse(Match.objects.exists())
+
+
+class SeatAdminTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.admin = User.objects.create_superuser(username="admin")
+        self.user = User.objects.create_user(username="user")
+        self.client.force_login(self.admin)
+        self.endpoint = "/admin/matches/seat/"
+
+        stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.match = Match.objects.create(
+            stadium=stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+
+    def _create_seats(self, count: int, **kwargs) -> list[Seat]:
+        start = Seat.objects.count() + 1
+        return Seat.objects.bulk_create(
+            Seat(match=self.match, seat_number=number, **kwargs)
+            for number in range(start, start + count)
+        )
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self._create_seats(2)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(self.endpoint).status_code, 200)
+
+        self._create_seats(50)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(self.client.get(self.endpoint).status_code, 200)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_release_seats_action(self):
+        seats = self._create_seats(3, is_reserved=True)
+        Reservation.objects.create(user=self.user, match=self.match, seat=seats[0])
+
+        response = self.client.post(
+            self.endpoint,
+            {
+                "action": "release_seats",
+                "_selected_action": [seats[0].id, seats[1].id],
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Seat.objects.filter(is_reserved=True).values_list("id", flat=True)),
+            [seats[2].id],
+        )
+        self.assertIsNotNone(Reservation.objects.get().cancelled_at)
+        self.assertEqual(
+            SeatEvent.objects.filter(new_state=SeatEvent.State.AVAILABLE).count(), 2
+        )
+
+    def test_mark_seats_sold_action(self):
+        seats = self._create_seats(3)
+
+        self.client.post(
+            self.endpoint,
+            {
+                "action": "mark_seats_sold",
+                "_selected_action": [seat.id for seat in seats[:2]],
+            },
+        )
+
+        self.assertEqual(Seat.objects.filter(is_reserved=True).count(), 2)
+        self.assertEqual(
+            SeatEvent.objects.filter(new_state=SeatEvent.State.RESERVED).count(), 2
+        )
+        self.assertFalse(Reservation.objects.exists())
+
+
+class PopulateTeamsMigrationTest(TransactionTestCase):
+    migrate_from = [("matches", "0005_seat_reserved_match_idx")]
+    migrate_to = [("matches", "0008_match_team_sides")]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_sides_are_deduplicated_into_teams(self):
+        apps = self._migrate(self.migrate_from)
+        Stadium = apps.get_model("stadiums", "Stadium")
+        stadium_1 = Stadium.objects.create(name="stadium_1", location="some_city")
+        stadium_2 = Stadium.objects.create(name="stadium_2", location="some_city")
+        OldMatch = apps.get_model("matches", "Match")
+        for stadium, home_side, away_side, match_day in [
+            (stadium_1, "Team 1", "Team 2", "2024-01-01"),
+            (stadium_1, " team 1", "TEAM 2 ", "2024-01-02"),
+            (stadium_2, "Team 2", "Team 3", "2024-01-02"),
+        ]:
+            OldMatch.objects.create(
+                stadium=stadium,
+                home_side=home_side,
+                away_side=away_side,
+                match_day=match_day,
+                match_time="15:00:00",
+            )
+
+        apps = self._migrate(self.migrate_to)
+
+        Match = apps.get_model("matches", "Match")
+        self.assertEqual(
+            sorted(
+                apps.get_model("matches", "Team").objects.values_list("name", flat=True)
+            ),
+            ["Team 1", "Team 2", "Team 3"],
+        )
+        self.assertEqual(
+            list(
+                Match.objects.order_by("id").values_list(
+                    "home_side__name", "away_side__name"
+                )
+            ),
+            [("Team 1", "Team 2"), ("Team 1", "Team 2"), ("Team 2", "Team 3")],
+        )
+        # Team 2 was booked twice on 2024-01-02, only its first match is kept.
+        self.assertEqual(
+            apps.get_model("matches", "MatchParticipation").objects.count(), 5
+        )
@@ -1,8 +1,25 @@
 from django.urls import path
 
-from matches.views import AddMatchView, AddMatchSeatsView
+from matches.views import (
+    AddMatchSeatsView,
+    AddMatchView,
+    AddTeamView,
+    MatchListView,
+    SeatEventsView,
+    SeatMapView,
+)
 
 urlpatterns = [
+    path(
+        "",
+        MatchListView.as_view(),
+        name="match-list",
+    ),
+    path(
+        "team/",
+        AddTeamView.as_view(),
+        name="add-team",
+    ),
     path(
         "match/",
         AddMatchView.as_view(),
@@ -13,4 +30,19 @@ urlpatterns = [
         AddMatchSeatsView.as_view(),
         name="add-match-seats",
     ),
+    path(
+        "match/<int:match_id>/seat-map/",
+        SeatMapView.as_view(),
+        name="match-seat-map",
+    ),
+    path(
+        "events/",
+        SeatEventsView.as_view(),
+        name="seat-events",
+    ),
+    path(
+        "match/<int:match_id>/events/",
+        SeatEventsView.as_view(),
+        name="match-seat-events",
+    ),
 ]
@@ -1,13 +1,38 @@
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+import io
+from collections.abc import Iterable, Iterator
+
+from django.core.paginator import EmptyPage
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from matches.models import Match
-from matches.serializers import MatchSerializer, SeatSerializer
+from jobs import facade as jobs_facade
+from jobs.views import accepted, prefers_async
+from matches import facade as matches_facade
+from matches import seatmap
+from matches.metrics import MATCHES_CREATED, SEATS_CREATED
+from matches.models import Match, Team
+from matches.renderers import SeatMapRLERenderer
+from matches.serializers import (
+    MatchListQuerySerializer,
+    MatchListSerializer,
+    MatchSerializer,
+    SeatEventSerializer,
+    SeatEventsQuerySerializer,
+    SeatSerializer,
+    SeatUploadQuerySerializer,
+    SeatUploadSerializer,
+    TeamSerializer,
+)
+from ticketing import jsonstream
+from ticketing.docs import openapi, swagger_auto_schema
+from ticketing.paginator import EstimatedCountPaginator
+from ticketing.renderers import FastJSONRenderer
+
+NDJSON = "application/x-ndjson"
 
 
 class BaseMatchView(APIView):
@@ -59,16 +84,68 @@ class BaseMatchView(APIView):
         return Response(data=data, status=status_code)
 
 
+class AddTeamView(BaseMatchView):
+    """
+    View for adding a new Team.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Request Body
+    - `name`: The name of the team.
+
+    # Responses
+    - 201 Created: Team created successfully.
+    - 400 Bad Request: Invalid request data.
+    """
+
+    serializer_class = TeamSerializer
+    model_class = Team
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={"name": openapi.Schema(type=openapi.TYPE_STRING)},
+            required=["name"],
+        ),
+        responses={
+            201: "Team created successfully.",
+            400: "Bad Request. Invalid request data.",
+        },
+    )
+    def post(self, request: Request):
+        """
+        Create a new Team.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return self._create_response(
+            data=serializer.data,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
 class AddMatchView(BaseMatchView):
     """
     View for adding a new Match.
 
     # Request Body
     - `stadium`: The stadium where the match will be held.
-    - `home_side`: The home side participating in the match.
-    - `away_side`: The away side participating in the match.
+    - `home_side`: The name of the home team.
+    - `away_side`: The name of the away team.
     - `match_day`: The day on which the match will take place.
     - `match_time`: The time at which the match will start.
+    - `status`: The status of the match, `scheduled` by default.
+    - `on_sale_at`: When sales open. Optional, sales open right away by default.
+    - `off_sale_at`: When sales close. Optional, sales close at kick-off by default.
 
     # Responses
     - 201 Created: Match created successfully.
@@ -87,6 +164,13 @@ class AddMatchView(BaseMatchView):
                 "away_side": openapi.Schema(type=openapi.TYPE_STRING),
                 "match_day": openapi.Schema(type=openapi.TYPE_STRING),
                 "match_time": openapi.Schema(type=openapi.TYPE_STRING),
+                "status": openapi.Schema(type=openapi.TYPE_STRING),
+                "on_sale_at": openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                ),
+                "off_sale_at": openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                ),
             },
             required=["stadium", "home_side", "away_side", "match_day", "match_time"],
         ),
@@ -107,6 +191,7 @@ class AddMatchView(BaseMatchView):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         match = serializer.save()
+        MATCHES_CREATED.inc()
         return self._create_response(
             data=self.serializer_class(match).data,
             status_code=status.HTTP_201_CREATED,
@@ -117,16 +202,31 @@ class AddMatchSeatsView(BaseMatchView):
     """
     View for adding seats to a Match.
 
+    Uploads sent with the `Prefer: respond-async` header are added by a background
+    job, polled at the URL of the response.
+
+    Uploads sent as NDJSON (`Content-Type: application/x-ndjson`, one seat per
+    line) or with `?stream=true` are streamed instead: the body is parsed
+    incrementally and the seats are validated and inserted in chunks, so memory
+    does not grow with the size of the upload. The response reports the most
+    characters of the body the parser held at once.
+
     # Request Body
     - `seats`: List of seat data.
 
+    # Query Parameters
+    - `stream`: Stream the upload, see above. A boolean, e.g. `true` or `0`.
+
     # Responses
-    - 201 Created: Seats created successfully.
-    - 400 Bad Request: Invalid request data or match not found.
+    - 201 Created: Seats created successfully, with the number of seats created
+      and the peak buffer size of a streamed upload.
+    - 202 Accepted: The job adding the seats.
+    - 400 Bad Request: Invalid request data, invalid `stream` or match not found.
     """
 
     serializer_class = SeatSerializer
     model_class = Match
+    stream_chunk_size = 1000
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -138,8 +238,17 @@ class AddMatchSeatsView(BaseMatchView):
                 )
             },
         ),
+        manual_parameters=[
+            openapi.Parameter(
+                "stream",
+                openapi.IN_QUERY,
+                description="Parse and insert the upload incrementally.",
+                type=openapi.TYPE_BOOLEAN,
+            )
+        ],
         responses={
             201: "Seats created successfully.",
+            202: "Accepted. The job adding the seats.",
             400: "Bad Request. Invalid request data or match not found.",
         },
     )
@@ -158,7 +267,27 @@ class AddMatchSeatsView(BaseMatchView):
         if response:
             return response
 
+        query = SeatUploadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        if request.content_type.startswith(NDJSON) or query.validated_data["stream"]:
+            return self._stream_seats(request, match)
+
         seats_data: list[dict[str, int]] = request.data.get("seats", [])
+        if prefers_async(request):
+            serializer = SeatUploadSerializer(data=seats_data, many=True)
+            serializer.is_valid(raise_exception=True)
+            job = jobs_facade.enqueue(
+                "matches.add_seats",
+                {
+                    "match_id": match.id,
+                    "seat_numbers": [
+                        seat["seat_number"] for seat in serializer.validated_data
+                    ],
+                },
+                user=request.user,
+            )
+            return accepted(job)
+
         for seat_data in seats_data:
             seat_data["match"] = match.id
 
@@ -167,7 +296,253 @@ class AddMatchSeatsView(BaseMatchView):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        SEATS_CREATED.inc(len(seats_data), match=match.id)
         return self._create_response(
             data={"message": "Seats created successfully"},
             status_code=status.HTTP_201_CREATED,
         )
+
+    def _stream_seats(self, request: Request, match: Match):
+        """
+        Add the seats of a streamed upload.
+
+        :param request: The HTTP request object, whose body is not read yet.
+        :type request: Request
+        :param match: The Match.
+        :type match: Match
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        # An empty body has no stream.
+        reader = jsonstream.JSONStreamReader(request.stream or io.BytesIO())
+        if request.content_type.startswith(NDJSON):
+            seats = jsonstream.iter_ndjson(reader)
+        else:
+            seats = jsonstream.iter_json_array(reader, key="seats")
+
+        try:
+            created = matches_facade.add_seat_stream(
+                match.id,
+                self._validate_seat_stream(seats),
+                chunk_size=self.stream_chunk_size,
+            )
+        except jsonstream.JSONStreamError as exc:
+            return self._create_response(
+                data={"error": f"Malformed upload: {exc}"},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError as exc:
+            return self._create_response(
+                data={"error": str(exc)},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        SEATS_CREATED.inc(created, match=match.id)
+        return self._create_response(
+            data={
+                "message": "Seats created successfully",
+                "created": created,
+                "peak_buffer_size": reader.peak_size,
+            },
+            status_code=status.HTTP_201_CREATED,
+        )
+
+    def _validate_seat_stream(self, seats: Iterable) -> Iterator[int]:
+        """
+        Validate streamed seat data one seat at a time.
+
+        A single serializer validates every seat: serializers reference their
+        fields and the fields their serializer, so one per chunk would leave garbage
+        cycles behind that only the cyclic collector frees, and memory would grow
+        with the upload.
+
+        :param seats: The seat data, as parsed from the upload.
+        :type seats: Iterable
+        :raises ValidationError: With the errors of the first invalid seat, by its
+            position in the upload.
+        :return: The seat numbers.
+        :rtype: Iterator[int]
+        """
+        serializer = SeatUploadSerializer()
+        for position, seat in enumerate(seats):
+            try:
+                yield serializer.run_validation(seat)["seat_number"]
+            except ValidationError as exc:
+                raise ValidationError({"seats": {position: exc.detail}}) from exc
+
+
+class SeatEventsView(BaseMatchView):
+    """
+    View for reading the seat change log incrementally.
+
+    Consumers keep the `cursor` of the last page and pass it back as `after` to
+    receive only the changes committed since, instead of rescanning seats.
+
+    # Query Parameters
+    - `after`: Return only events with a greater sequence. Defaults to 0.
+    - `limit`: Maximum number of events to return. Defaults to 500.
+
+    # Responses
+    - 200 OK: A page of events, the cursor to resume from and whether more remain.
+    - 400 Bad Request: Invalid query parameters.
+    - 404 Not Found: Match not found.
+    """
+
+    serializer_class = SeatEventSerializer
+    model_class = Match
+
+    @swagger_auto_schema(
+        query_serializer=SeatEventsQuerySerializer,
+        responses={
+            200: SeatEventSerializer(many=True),
+            400: "Bad Request. Invalid query parameters.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def get(self, request: Request, match_id: int | None = None):
+        """
+        List seat events after a cursor, optionally restricted to one match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the Match, or None for every match.
+        :type match_id: int | None
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        if match_id is not None:
+            _, response = self._get_object_or_404(pk=match_id, error="Match not found")
+            if response:
+                return response
+
+        query = SeatEventsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        cursor = query.validated_data["after"]
+        limit = query.validated_data["limit"]
+
+        events = matches_facade.get_seat_events_after(
+            cursor, match_id=match_id, limit=limit
+        )
+        return self._create_response(
+            data={
+                "events": self.serializer_class(events, many=True).data,
+                "cursor": events[-1].id if events else cursor,
+                "has_more": len(events) == limit,
+            },
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class MatchListView(BaseMatchView):
+    """
+    View for listing the matches that are not archived yet, a page at a time.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+
+    # Query Parameters
+    - `page`: The page to return, from 1. Defaults to 1.
+    - `page_size`: Maximum number of matches per page. Defaults to 100.
+
+    # Responses
+    - 200 OK: A page of matches, ordered by day and time, the number of matches
+      and whether more pages remain. The number is counted up to 10,000 matches,
+      see `EstimatedCountPaginator`.
+    - 400 Bad Request: Invalid query parameters.
+    - 404 Not Found: Page not found.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer]
+    serializer_class = MatchListSerializer
+    model_class = Match
+
+    @swagger_auto_schema(
+        query_serializer=MatchListQuerySerializer,
+        responses={
+            200: MatchSerializer(many=True),
+            400: "Bad Request. Invalid query parameters.",
+            404: "Not Found. Page not found.",
+        },
+    )
+    def get(self, request: Request):
+        """
+        List a page of matches.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        query = MatchListQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        matches = Match.objects.filter(archived_at__isnull=True).order_by(
+            "match_day", "match_time", "id"
+        )
+        paginator = EstimatedCountPaginator(matches, query.validated_data["page_size"])
+        try:
+            page = paginator.page(query.validated_data["page"])
+        except EmptyPage:
+            return self._create_response(
+                data={"error": "Page not found"},
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
+        return self._create_response(
+            data={
+                "matches": self.serializer_class(page.object_list).data,
+                "count": paginator.count,
+                "has_more": page.has_next(),
+            },
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class SeatMapView(BaseMatchView):
+    """
+    View for the seat map of a Match.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+
+    # Responses
+    - 200 OK: The seats of the match, ordered by seat number, from the seat map
+      cache, see `matches.seatmap`. Clients accepting
+      `application/vnd.ticketing.seat-map-rle+json` (or `?format=rle`) get the
+      run-length encoded seat map, see `SeatMapRLERenderer`.
+    - 404 Not Found: Match not found.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, SeatMapRLERenderer]
+    model_class = Match
+
+    @swagger_auto_schema(
+        responses={
+            200: "The seats of the match, ordered by seat number.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def get(self, request: Request, match_id: int):
+        """
+        List the seats of a Match and whether they are reserved.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the Match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        match, response = self._get_object_or_404(pk=match_id, error="Match not found")
+        if response:
+            return response
+
+        # The fields of `SeatMapSerializer`, served from the seat map cache.
+        return self._create_response(
+            data=seatmap.get_seat_map(match.id).to_data(),
+            status_code=status.HTTP_200_OK,
+        )
@@ -0,0 +1,62 @@
+import io
+import pstats
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.profiling import iter_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the profiles captured by the profiling middleware: the top "
+        "functions across all of them and the queries that took the most time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir", type=Path, help="Profile directory, PROFILING_DIR by default."
+        )
+        parser.add_argument(
+            "--path", default="", help="Only include requests under this path prefix."
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--sort", choices=["cumulative", "tottime", "ncalls"], default="cumulative"
+        )
+
+    def handle(self, *args, **options):
+        profiles = [
+            (profile, metadata)
+            for profile, metadata in iter_profiles(options["dir"])
+            if metadata["path"].startswith(options["path"])
+        ]
+        if not profiles:
+            raise CommandError("No profiles captured.")
+
+        durations = sorted(metadata["duration_ms"] for _, metadata in profiles)
+        self.stdout.write(
+            f"{len(profiles)} requests, median {durations[len(durations) // 2]:.1f}ms, "
+            f"max {durations[-1]:.1f}ms"
+        )
+
+        # pstats writes partial lines, which `self.stdout` would end with newlines.
+        report = io.StringIO()
+        stats = pstats.Stats(*(str(profile) for profile, _ in profiles), stream=report)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+        self.stdout.write(report.getvalue())
+
+        queries = defaultdict(lambda: [0, 0.0])
+        for _, metadata in profiles:
+            for query in metadata["queries"]:
+                queries[query["sql"]][0] += 1
+                queries[query["sql"]][1] += query["duration_ms"]
+
+        self.stdout.write(f"Queries by total time ({len(queries)} distinct):")
+        for sql, (count, total_ms) in sorted(
+            queries.items(), key=lambda item: item[1][1], reverse=True
+        )[: options["top"]]:
+            self.stdout.write(
+                f"  {total_ms:>9.1f}ms  {count:>6}x  {total_ms / count:>7.2f}ms avg  {sql}"
+            )
@@ -0,0 +1,418 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+
+# Seconds; fits both request latencies and single queries.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metric:
+    """
+    Base class of the metric types.
+
+    A metric holds one value per combination of label values. Updates take the
+    metric's lock for a dict lookup and an addition only, so contention between
+    threads stays negligible.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects the labels {', '.join(self.labelnames)}."
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> list:
+        """
+        :return: Pairs of label values and values, safe to serialize to JSON.
+        :rtype: list
+        """
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(value, other):
+        return value + other
+
+    def samples(self, key: tuple, value):
+        """
+        :return: The exposition samples of one value as (suffix, labels, value).
+        :rtype: Iterator[tuple[str, dict, float]]
+        """
+        yield "", dict(zip(self.labelnames, key)), value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Gauge, summed across processes or, with `mode="max"`, reporting the largest
+    value of any process. Gauges of processes that exited are dropped.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), mode="sum"):
+        super().__init__(name, documentation, labelnames)
+        if mode not in ("sum", "max"):
+            raise ValueError(f"Unknown gauge mode {mode}.")
+        self.mode = mode
+
+    def merge(self, value, other):
+        return max(value, other) if self.mode == "max" else value + other
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Histogram with fixed buckets.
+
+    Each value is a list of per-bucket counts, the last one for `+Inf`, followed by
+    the sum of the observations. Counts are made cumulative on exposition only.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), list(value)] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(value, other):
+        return [a + b for a, b in zip(value, other)]
+
+    def samples(self, key: tuple, value):
+        labels = dict(zip(self.labelnames, key))
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), value[:-1]):
+            cumulative += count
+            yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield "_sum", labels, value[-1]
+        yield "_count", labels, cumulative
+
+
+class Registry:
+    """
+    Registry of the metrics of a process, rendered in the Prometheus text format.
+
+    Under a multi-process server every worker has its own registry. When
+    `METRICS_DIR` is set, each process writes a snapshot of its values to
+    `metrics-<pid>-<start>.json` in that directory at most every
+    `METRICS_FLUSH_INTERVAL` seconds and when it exits, and `collect` sums the
+    snapshots of all processes, so whichever worker serves `/metrics` reports the
+    totals. Counters and histograms of exited processes are kept so totals never
+    go backwards; the directory should be emptied when the server is restarted.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._last_flush = 0.0
+        self._filename = "metrics-%d-%d.json" % (os.getpid(), time.time_ns())
+        for metric in self._metrics.values():
+            metric._values = {}
+            metric._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Register a metric, or return the registered metric of the same name.
+
+        :param metric: The metric.
+        :type metric: Metric
+        :return: The registered metric.
+        :rtype: Metric
+        """
+        with self._lock:
+            registered = self._metrics.setdefault(metric.name, metric)
+        if type(registered) is not type(metric):
+            raise ValueError(
+                f"{metric.name} is already registered as a {registered.type}."
+            )
+        return registered
+
+    def snapshot(self) -> dict:
+        return {
+            name: metric.snapshot()
+            for name, metric in list(self._metrics.items())
+            if metric._values
+        }
+
+    def flush(self):
+        """
+        Write the snapshot of this process to `METRICS_DIR`, if set.
+        """
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+
+        directory = Path(directory)
+        path = directory / self._filename
+        snapshot = self.snapshot()
+        if not snapshot and not path.exists():
+            # Management commands and idle workers leave no files behind.
+            return
+
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"pid": os.getpid(), **snapshot}))
+        os.replace(tmp_path, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        """
+        Flush if the last flush is older than `METRICS_FLUSH_INTERVAL`.
+        """
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def collect(self) -> dict:
+        """
+        Merge the values of every process sharing `METRICS_DIR`.
+
+        :return: The merged values per metric name, keyed by label values.
+        :rtype: dict
+        """
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush()
+            snapshots = []
+            for path in Path(directory).glob("metrics-*.json"):
+                try:
+                    snapshot = json.loads(path.read_text())
+                except (OSError, ValueError):
+                    # Removed or replaced while being read.
+                    continue
+                if not _is_alive(snapshot.pop("pid")):
+                    snapshot = {
+                        name: values
+                        for name, values in snapshot.items()
+                        if not isinstance(self._metrics.get(name), Gauge)
+                    }
+                snapshots.append(snapshot)
+
+        collected = {}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                merged = collected.setdefault(name, {})
+                for key, value in values:
+                    key = tuple(key)
+                    merged[key] = (
+                        metric.merge(merged[key], value) if key in merged else value
+                    )
+        return collected
+
+    def render(self) -> str:
+        """
+        :return: Every metric in the Prometheus text exposition format.
+        :rtype: str
+        """
+        collected = self.collect()
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in sorted(collected.get(name, {}).items()):
+                for suffix, labels, sample in metric.samples(key, value):
+                    lines.append(
+                        f"{name}{suffix}{_format_labels(labels)} {_format_value(sample)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = (
+        '%s="%s"'
+        % (name, value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in labels.items()
+    )
+    return "{%s}" % ",".join(pairs)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+# Workers forked from a preloaded application start from zero under their own name,
+# instead of reporting the values of the parent process a second time.
+os.register_at_fork(after_in_child=REGISTRY._reset)
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames=(), mode: str = "sum") -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, mode))
+
+
+def histogram(
+    name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+HTTP_REQUESTS = counter(
+    "ticketing_http_requests_total",
+    "HTTP requests by view, method and status code.",
+    ["view", "method", "status"],
+)
+HTTP_REQUEST_DURATION = histogram(
+    "ticketing_http_request_duration_seconds",
+    "Time spent serving HTTP requests by view and method.",
+    ["view", "method"],
+)
+HTTP_REQUESTS_IN_PROGRESS = gauge(
+    "ticketing_http_requests_in_progress",
+    "HTTP requests being served.",
+)
+DB_QUERY_DURATION = histogram(
+    "ticketing_db_query_duration_seconds",
+    "Time spent executing database queries by connection and statement type.",
+    ["alias", "statement"],
+)
+
+
+class MetricsMiddleware:
+    """
+    Count requests and measure their latency per view.
+
+    Requests are labelled with the URL name of the view, so the label values are
+    bounded by the URLconf. It should come first in `MIDDLEWARE` to measure the
+    whole request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, view=view, method=request.method
+        )
+        HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REGISTRY.maybe_flush()
+        return response
+
+
+class DatabaseMetrics:
+    """
+    Database execute wrapper measuring every query, installed on each connection.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - started,
+                alias=self.alias,
+                statement=sql.lstrip().split(" ", 1)[0].upper(),
+            )
+
+
+def install_database_metrics(sender, connection: BaseDatabaseWrapper, **kwargs):
+    """
+    `connection_created` receiver installing `DatabaseMetrics` on a connection.
+
+    The signal is sent again whenever the connection is reopened, and the wrapper
+    list outlives the underlying connection, so it is only installed once. It is
+    inserted first: the connection may be opened by the first query inside an
+    `execute_wrapper()` block, which removes the last wrapper when it exits.
+    """
+    if not any(isinstance(w, DatabaseMetrics) for w in connection.execute_wrappers):
+        connection.execute_wrappers.insert(0, DatabaseMetrics(connection.alias))
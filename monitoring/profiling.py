@@ -0,0 +1,161 @@
+import cProfile
+import hmac
+import json
+import random
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+def get_profile_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+class ProfilingMiddleware:
+    """
+    Profile sampled requests with cProfile and capture their SQL.
+
+    A request is profiled when it is picked at `PROFILING_SAMPLE_RATE`, or when it
+    carries `PROFILING_TOKEN` in the `X-Profile-Token` header. Each profile is
+    written to `PROFILING_DIR` as a `.prof` file with a `.json` file next to it
+    holding the request, its duration and its queries. Only the newest
+    `PROFILING_MAX_FILES` profiles are kept. Profiled responses carry the profile's
+    name in the `X-Profile-Id` header.
+
+    When the sample rate is 0 and no token is configured, the middleware removes
+    itself from the chain at start-up, so it costs nothing at all.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+        self.token = getattr(settings, "PROFILING_TOKEN", None)
+        if not self.sample_rate and not self.token:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        queries = []
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(QueryCapture(connection.alias, queries))
+                )
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+
+        response["X-Profile-Id"] = write_profile(
+            profiler,
+            {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": duration * 1000,
+                "queries": queries,
+            },
+        )
+        return response
+
+    def should_profile(self, request: HttpRequest) -> bool:
+        token = request.headers.get(PROFILE_HEADER)
+        # Compared as bytes: `compare_digest` rejects non-ASCII strings.
+        if (
+            token
+            and self.token
+            and hmac.compare_digest(token.encode(), self.token.encode())
+        ):
+            return True
+        return random.random() < self.sample_rate
+
+
+class QueryCapture:
+    """
+    Database execute wrapper appending every query and its duration to a list.
+
+    The SQL is recorded with its placeholders and without parameters, so identical
+    queries aggregate and no user data ends up in the profiles.
+    """
+
+    def __init__(self, alias: str, queries: list):
+        self.alias = alias
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": self.alias,
+                    "sql": sql,
+                    "many": many,
+                    "duration_ms": (time.perf_counter() - started) * 1000,
+                }
+            )
+
+
+def write_profile(profiler: cProfile.Profile, metadata: dict) -> str:
+    """
+    Write a profile and its metadata, then drop the oldest profiles.
+
+    :param profiler: The profiler that ran around the request.
+    :type profiler: cProfile.Profile
+    :param metadata: The request, its duration and its queries.
+    :type metadata: dict
+    :return: The name of the profile.
+    :rtype: str
+    """
+    directory = get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # Names sort chronologically, which is what the rotation relies on.
+    name = "%s-%s" % (
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f"),
+        uuid.uuid4().hex[:8],
+    )
+    profiler.dump_stats(directory / f"{name}.prof")
+    (directory / f"{name}.json").write_text(json.dumps(metadata))
+
+    max_files = getattr(settings, "PROFILING_MAX_FILES", 200)
+    for metadata_file in sorted(directory.glob("*.json"))[:-max_files]:
+        metadata_file.with_suffix(".prof").unlink(missing_ok=True)
+        metadata_file.unlink(missing_ok=True)
+
+    return name
+
+
+def iter_profiles(directory: Path | None = None) -> Iterator[tuple[Path, dict]]:
+    """
+    Iterate over the captured profiles, oldest first.
+
+    :param directory: The directory holding the profiles, `PROFILING_DIR` by default.
+    :type directory: Path | None
+    :return: Pairs of the `.prof` file and its metadata.
+    :rtype: Iterator[tuple[Path, dict]]
+    """
+    directory = directory or get_profile_dir()
+    for metadata_file in sorted(directory.glob("*.json")):
+        profile = metadata_file.with_suffix(".prof")
+        if not profile.exists():
+            continue
+        yield profile, json.loads(metadata_file.read_text())
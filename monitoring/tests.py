@@ -0,0 +1,194 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from monitoring.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+)
+from monitoring.profiling import ProfilingMiddleware, iter_profiles
+
+
+class ProfilingMiddlewareTest(APITestCase):
+    def setUp(self):
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        self.profile_dir = Path(profile_dir.name)
+        settings_override = override_settings(
+            PROFILING_DIR=self.profile_dir, PROFILING_TOKEN="secret"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="user")
+        self.client.force_authenticate(self.user)
+        self.url = "/api/matches/"
+
+    def test_not_profiled_without_token(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list(iter_profiles()), [])
+
+    def test_wrong_token(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN="wrong")
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_non_ascii_token(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN="été")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_profiled_with_token(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN="secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        [(profile, metadata)] = iter_profiles()
+        self.assertEqual(profile.stem, response["X-Profile-Id"])
+        self.assertEqual(metadata["path"], self.url)
+        self.assertEqual(metadata["status"], 200)
+        self.assertTrue(
+            any("matches_match" in query["sql"] for query in metadata["queries"])
+        )
+
+    @override_settings(PROFILING_TOKEN=None, PROFILING_SAMPLE_RATE=1)
+    def test_sampled(self):
+        response = self.client.get(self.url)
+        self.assertIn("X-Profile-Id", response)
+
+    @override_settings(PROFILING_MAX_FILES=2)
+    def test_rotation(self):
+        ids = [
+            self.client.get(self.url, HTTP_X_PROFILE_TOKEN="secret")["X-Profile-Id"]
+            for _ in range(3)
+        ]
+        self.assertEqual([profile.stem for profile, _ in iter_profiles()], ids[1:])
+        self.assertEqual(len(list(self.profile_dir.glob("*.prof"))), 2)
+
+    def test_summarize_profiles(self):
+        with self.assertRaises(CommandError):
+            call_command("summarize_profiles", stdout=io.StringIO())
+
+        self.client.get(self.url, HTTP_X_PROFILE_TOKEN="secret")
+        stdout = io.StringIO()
+        call_command("summarize_profiles", top=5, stdout=stdout)
+        self.assertIn("1 requests", stdout.getvalue())
+        self.assertIn("matches_match", stdout.getvalue())
+
+    @override_settings(PROFILING_TOKEN=None, PROFILING_SAMPLE_RATE=0)
+    def test_not_loaded_when_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+
+class MetricsRegistryTest(TestCase):
+    def setUp(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.metrics_dir = Path(metrics_dir.name)
+
+    def _registry(self) -> Registry:
+        registry = Registry()
+        registry.register(Counter("requests_total", "Requests.", ["view"]))
+        registry.register(Gauge("in_progress", "In progress."))
+        registry.register(Histogram("latency", "Latency.", buckets=(0.1, 1)))
+        return registry
+
+    def test_render(self):
+        registry = self._registry()
+        registry.register(Counter("requests_total", "Requests.", ["view"])).inc(
+            view='a"b'
+        )
+        registry.register(Histogram("latency", "Latency.")).observe(0.5)
+        registry.register(Histogram("latency", "Latency.")).observe(5)
+
+        self.assertEqual(
+            registry.render(),
+            "# HELP in_progress In progress.\n"
+            "# TYPE in_progress gauge\n"
+            "# HELP latency Latency.\n"
+            "# TYPE latency histogram\n"
+            'latency_bucket{le="0.1"} 0\n'
+            'latency_bucket{le="1"} 1\n'
+            'latency_bucket{le="+Inf"} 2\n'
+            "latency_sum 5.5\n"
+            "latency_count 2\n"
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{view="a\\"b"} 1\n',
+        )
+
+    def test_register_conflicting_type(self):
+        registry = self._registry()
+        with self.assertRaises(ValueError):
+            registry.register(Gauge("requests_total", "Requests."))
+
+    def test_multiprocess(self):
+        with override_settings(METRICS_DIR=self.metrics_dir):
+            worker, exited = self._registry(), self._registry()
+            for registry in (worker, exited):
+                registry._metrics["requests_total"].inc(view="a")
+                registry._metrics["in_progress"].inc()
+                registry._metrics["latency"].observe(0.5)
+            exited.flush()
+
+            snapshot = self.metrics_dir / exited._filename
+            snapshot.write_text(
+                json.dumps({**json.loads(snapshot.read_text()), "pid": 2**22 + 1})
+            )
+
+            collected = worker.collect()
+
+        self.assertEqual(collected["requests_total"], {("a",): 2})
+        self.assertEqual(collected["latency"], {(): [0, 2, 0, 1.0]})
+        # The gauge of the exited process is dropped.
+        self.assertEqual(collected["in_progress"], {(): 1})
+
+    def test_flush_nothing(self):
+        with override_settings(METRICS_DIR=self.metrics_dir):
+            self._registry().flush()
+        self.assertEqual(list(self.metrics_dir.iterdir()), [])
+
+
+class MetricsViewTest(APITestCase):
+    def test_metrics(self):
+        self.client.post("/api/auth/signup/", {"username": "user"})
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn('ticketing_sign_ups_total{outcome="rejected"}', content)
+        self.assertIn(
+            'ticketing_http_requests_total{view="sign_up",method="POST",'
+            'status="400"}',
+            content,
+        )
+        self.assertIn(
+            'ticketing_db_query_duration_seconds_count{alias="default"', content
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(
+            self.client.get("/metrics").status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Bearer")
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
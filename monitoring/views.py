@@ -0,0 +1,46 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+
+from monitoring.metrics import CONTENT_TYPE, REGISTRY
+
+
+class MetricsView(View):
+    """
+    View exposing the metrics of every worker in the Prometheus text format.
+
+    It is a plain Django view: scrapers do not negotiate content, and only
+    authenticate with `METRICS_TOKEN` as a bearer token when it is set. The
+    endpoint is only routed when `ENABLE_METRICS` is set, and should only be
+    reachable from the internal network.
+
+    ---
+    # Permissions
+    - `Authorization: Bearer <METRICS_TOKEN>`, when `METRICS_TOKEN` is set.
+
+    # Responses
+    - 200 OK: The metrics.
+    - 401 Unauthorized: The token is missing or wrong.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Render the metrics.
+
+        :param request: The HTTP request object.
+        :type request: HttpRequest
+        :return: The HTTP response object.
+        :rtype: HttpResponse
+        """
+        token = settings.METRICS_TOKEN
+        if token is not None:
+            authorization = request.headers.get("Authorization", "")
+            scheme, _, credentials = authorization.partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(
+                credentials.encode(), token.encode()
+            ):
+                return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+
+        return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,21 @@
+from django.contrib import admin, messages
+from django.db.models import QuerySet
+from django.http import HttpRequest
+
+from outbox.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ["id", "topic", "key", "status", "attempts", "created_at"]
+    list_filter = ["status", "topic"]
+    search_fields = ["=key"]
+    ordering = ["-id"]
+    actions = ["retry"]
+
+    @admin.action(description="Retry selected messages")
+    def retry(self, request: HttpRequest, queryset: QuerySet[OutboxMessage]):
+        retried = queryset.exclude(status=OutboxMessage.Status.DELIVERED).update(
+            status=OutboxMessage.Status.PENDING, attempts=0, next_attempt_at=None
+        )
+        self.message_user(request, f"{retried} messages queued", messages.SUCCESS)
@@ -0,0 +1,197 @@
+import random
+from collections.abc import Iterable, Sequence
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from monitoring import metrics
+from outbox.models import OutboxMessage
+from outbox.sinks import Sink
+
+OUTBOX_DELIVERIES = metrics.counter(
+    "ticketing_outbox_deliveries_total",
+    "Outbox messages sent to a sink, by sink and outcome.",
+    ["sink", "outcome"],
+)
+OUTBOX_DELIVERY_LAG = metrics.histogram(
+    "ticketing_outbox_delivery_lag_seconds",
+    "Time from the publication of an outbox message to its delivery.",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+
+def publish(topic: str, key: str, payload: dict):
+    """
+    Write a message to the outbox, in the current transaction.
+
+    This is a single `INSERT`. A message with the same topic and key is only
+    stored once.
+
+    :param topic: What happened, such as `reservation.confirmed`.
+    :type topic: str
+    :param key: What it happened to, unique within the topic.
+    :type key: str
+    :param payload: The data of the message, serializable to JSON.
+    :type payload: dict
+    """
+    publish_many(topic, [(key, payload)])
+
+
+def publish_many(topic: str, messages: Iterable[tuple[str, dict]]):
+    """
+    Write several messages of a topic to the outbox with a single `INSERT`, see
+    `publish`.
+
+    :param topic: What happened, such as `reservation.confirmed`.
+    :type topic: str
+    :param messages: The key and payload of each message.
+    :type messages: Iterable[tuple[str, dict]]
+    """
+    OutboxMessage.objects.bulk_create(
+        [
+            OutboxMessage(topic=topic, key=key, payload=payload)
+            for key, payload in messages
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim_batch(relay: str, size: int, lease: float) -> list[OutboxMessage]:
+    """
+    Claim the oldest pending messages due for delivery.
+
+    Messages are leased with a conditional `UPDATE`, so concurrent relays never
+    deliver the same message. If a relay dies, its lease expires after `lease`
+    seconds and another relay delivers the messages again.
+
+    :param relay: The name of the relay.
+    :type relay: str
+    :param size: The largest number of messages to claim.
+    :type size: int
+    :param lease: The seconds the relay has to deliver the messages.
+    :type lease: float
+    :return: The claimed messages, in publication order.
+    :rtype: list[OutboxMessage]
+    """
+    now = timezone.now()
+    due = OutboxMessage.objects.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status=OutboxMessage.Status.PENDING,
+    )
+    ids = list(due.order_by("id").values_list("id", flat=True)[:size])
+    if not ids:
+        return []
+
+    locked_until = now + timedelta(seconds=lease)
+    due.filter(id__in=ids).update(locked_by=relay, locked_until=locked_until)
+    return list(
+        OutboxMessage.objects.filter(
+            id__in=ids, locked_by=relay, locked_until=locked_until
+        ).order_by("id")
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    :param attempts: The number of failed attempts.
+    :type attempts: int
+    :return: The seconds to wait before the next attempt: exponential backoff
+        capped at `OUTBOX_RETRY_MAX_DELAY`, with jitter so messages failed together
+        are not all retried at once.
+    :rtype: float
+    """
+    delay = min(
+        settings.OUTBOX_RETRY_MAX_DELAY,
+        settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def deliver(messages: Sequence[OutboxMessage], sinks: Sequence[Sink]) -> dict:
+    """
+    Deliver claimed messages to every sink that has not accepted them yet.
+
+    Messages accepted by every sink are delivered, and saved with one `UPDATE`.
+    The others are retried with backoff, and failed after `OUTBOX_MAX_ATTEMPTS`
+    attempts.
+
+    :param messages: The messages, claimed by this relay.
+    :type messages: Sequence[OutboxMessage]
+    :param sinks: The sinks.
+    :type sinks: Sequence[Sink]
+    :return: The number of messages delivered, retried and failed.
+    :rtype: dict
+    """
+    counts = {"delivered": 0, "retried": 0, "failed": 0}
+    if not messages:
+        return counts
+
+    errors: dict[int, list[str]] = {message.id: [] for message in messages}
+    for sink in sinks:
+        pending = [m for m in messages if sink.name not in m.delivered_to]
+        if not pending:
+            continue
+        try:
+            failed = sink.send_batch(pending)
+        except Exception as exc:
+            failed = {m.id: f"{type(exc).__name__}: {exc}" for m in pending}
+        for message in pending:
+            if message.id in failed:
+                errors[message.id].append(f"{sink.name}: {failed[message.id]}")
+            else:
+                message.delivered_to.append(sink.name)
+        OUTBOX_DELIVERIES.inc(len(pending) - len(failed), sink=sink.name, outcome="ok")
+        if failed:
+            OUTBOX_DELIVERIES.inc(len(failed), sink=sink.name, outcome="error")
+
+    now = timezone.now()
+    # A relay whose lease expired leaves the messages to the relay that took them.
+    claimed = OutboxMessage.objects.filter(
+        locked_by=messages[0].locked_by, locked_until=messages[0].locked_until
+    )
+    delivered = [m for m in messages if not errors[m.id]]
+    claimed.filter(id__in=[m.id for m in delivered]).update(
+        status=OutboxMessage.Status.DELIVERED,
+        delivered_to=[sink.name for sink in sinks],
+        delivered_at=now,
+        locked_until=None,
+    )
+    for message in delivered:
+        OUTBOX_DELIVERY_LAG.observe((now - message.created_at).total_seconds())
+
+    counts["delivered"] = len(delivered)
+    for message in messages:
+        if not errors[message.id]:
+            continue
+        attempts = message.attempts + 1
+        fields = {
+            "attempts": attempts,
+            "delivered_to": message.delivered_to,
+            "last_error": "\n".join(errors[message.id]),
+            "locked_until": None,
+        }
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            fields["status"] = OutboxMessage.Status.FAILED
+            counts["failed"] += 1
+        else:
+            fields["next_attempt_at"] = now + timedelta(seconds=retry_delay(attempts))
+            counts["retried"] += 1
+        claimed.filter(id=message.id).update(**fields)
+    return counts
+
+
+def purge_delivered(older_than: float) -> int:
+    """
+    Delete the messages delivered more than `older_than` seconds ago.
+
+    :return: The number of messages deleted.
+    :rtype: int
+    """
+    before = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = OutboxMessage.objects.filter(
+        status=OutboxMessage.Status.DELIVERED, delivered_at__lt=before
+    ).delete()
+    return deleted
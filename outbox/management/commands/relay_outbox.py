@@ -0,0 +1,51 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from outbox.relay import Relay
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver the outbox messages to the sinks of OUTBOX_SINKS. SIGTERM or "
+        "SIGINT stop the relay once its current batch is delivered."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Messages delivered at a time. Defaults to OUTBOX_BATCH_SIZE.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait while no message is due. Defaults to "
+            "OUTBOX_POLL_INTERVAL.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no message is due.",
+        )
+
+    def handle(self, *args, **options):
+        relay = Relay(
+            batch_size=options["batch_size"], poll_interval=options["poll_interval"]
+        )
+        self.stdout.write(
+            f"Relaying the outbox to {', '.join(s.name for s in relay.sinks)}"
+        )
+        stop = threading.Event()
+        handlers = {
+            signum: signal.signal(signum, lambda *args: stop.set())
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            relay.run(stop, burst=options["burst"])
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
@@ -0,0 +1,49 @@
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """
+    A message to deliver to the outbox sinks, written in the transaction of the
+    change it describes.
+
+    The message is only visible once that transaction commits, and is never lost
+    if the process dies right after: the `relay_outbox` command delivers it to
+    every sink, retrying failed sinks with backoff. `(topic, key)` is unique, so a
+    message published twice is stored once, and `delivered_to` lists the sinks
+    that already accepted the message, so a retry does not deliver it twice.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        DELIVERED = "delivered"
+        FAILED = "failed"
+
+    topic = models.CharField(max_length=64)
+    key = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    delivered_to = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now=False, auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "outbox message"
+        verbose_name_plural = "outbox messages"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "key"], name="outbox_topic_key_unique"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"], name="outbox_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.topic}:{self.key} ({self.status})"
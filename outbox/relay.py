@@ -0,0 +1,84 @@
+import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from outbox import facade as outbox_facade
+from outbox.sinks import Sink, get_sinks
+
+logger = logging.getLogger(__name__)
+
+
+class Relay:
+    """
+    Loop draining the outbox to its sinks in batches.
+
+    Relays only share the database, so a second relay can run for availability;
+    leases keep them from delivering the same messages.
+    """
+
+    # Seconds between two purges of the delivered messages.
+    purge_interval = 300
+
+    def __init__(
+        self,
+        sinks: Sequence[Sink] | None = None,
+        name: str | None = None,
+        batch_size: int | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.sinks = get_sinks() if sinks is None else sinks
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self._last_purge = -self.purge_interval
+
+    def run_once(self) -> dict:
+        """
+        Deliver one batch of messages.
+
+        :return: The number of messages delivered, retried and failed.
+        :rtype: dict
+        """
+        close_old_connections()
+        now = time.monotonic()
+        if now - self._last_purge >= self.purge_interval:
+            outbox_facade.purge_delivered(settings.OUTBOX_RETENTION)
+            self._last_purge = now
+        messages = outbox_facade.claim_batch(
+            self.name, self.batch_size, settings.OUTBOX_LEASE
+        )
+        return outbox_facade.deliver(messages, self.sinks)
+
+    def run(self, stop: threading.Event, burst: bool = False):
+        """
+        Deliver messages until `stop` is set. Full batches are followed by the next
+        one at once; otherwise the relay waits `poll_interval` seconds.
+
+        Database errors, such as SQLite staying locked past its timeout, are logged
+        and retried after `poll_interval` seconds. Messages claimed before the
+        error are delivered again once their lease expires.
+
+        :param stop: The event stopping the relay.
+        :type stop: threading.Event
+        :param burst: Stop once no message is due.
+        :type burst: bool
+        """
+        while not stop.is_set():
+            try:
+                counts = self.run_once()
+            except DatabaseError:
+                logger.exception(
+                    "Outbox relay %s lost the database, retrying", self.name
+                )
+                stop.wait(self.poll_interval)
+                continue
+            if sum(counts.values()) < self.batch_size:
+                if burst:
+                    break
+                stop.wait(self.poll_interval)
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import urllib.request
+from collections.abc import Sequence
+from pathlib import Path
+
+from django.conf import settings
+from django.core import mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from outbox.models import OutboxMessage
+
+
+def serialize(message: OutboxMessage) -> dict:
+    """
+    :return: The message as sinks deliver it. `id` is stable across retries, so
+        consumers can use it to drop the duplicates of an at-least-once delivery.
+    :rtype: dict
+    """
+    return {
+        "id": message.id,
+        "topic": message.topic,
+        "key": message.key,
+        "payload": message.payload,
+        "created_at": message.created_at,
+    }
+
+
+class Sink:
+    """
+    Base class of the outbox sinks.
+
+    Subclasses implement `send`, or `send_batch` when a batch can be delivered at
+    once. A message is delivered when `send` returns, and retried when it raises.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def send(self, message: OutboxMessage):
+        raise NotImplementedError
+
+    def send_batch(self, messages: Sequence[OutboxMessage]) -> dict[int, str]:
+        """
+        Deliver a batch of messages.
+
+        :param messages: The messages, in publication order.
+        :type messages: Sequence[OutboxMessage]
+        :return: The errors of the messages that were not delivered, by ID.
+        :rtype: dict[int, str]
+        """
+        errors = {}
+        for message in messages:
+            try:
+                self.send(message)
+            except Exception as exc:
+                errors[message.id] = f"{type(exc).__name__}: {exc}"
+        return errors
+
+
+class ConsoleSink(Sink):
+    """
+    Write each message as a line of JSON to standard output.
+    """
+
+    def __init__(self, name: str, stream=None):
+        super().__init__(name)
+        self.stream = stream
+
+    def send_batch(self, messages: Sequence[OutboxMessage]) -> dict[int, str]:
+        stream = self.stream or sys.stdout
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+        stream.write(
+            "".join(encoder.encode(serialize(message)) + "\n" for message in messages)
+        )
+        stream.flush()
+        return {}
+
+
+class FileSink(Sink):
+    """
+    Append each message as a line of JSON to a file, synced to disk once a batch.
+    """
+
+    def __init__(self, name: str, path: str | Path):
+        super().__init__(name)
+        self.path = Path(path)
+
+    def send_batch(self, messages: Sequence[OutboxMessage]) -> dict[int, str]:
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write("".join(encoder.encode(serialize(m)) + "\n" for m in messages))
+            file.flush()
+            os.fsync(file.fileno())
+        return {}
+
+
+class EmailSink(Sink):
+    """
+    Email the confirmation of each reservation to its user.
+
+    Mail goes through Django's email backend, one connection per batch. In
+    development, point `EMAIL_HOST` and `EMAIL_PORT` at a local SMTP stand-in such
+    as `python -m aiosmtpd -n -l localhost:1025`, or use the console backend.
+    Messages without an email address are skipped.
+    """
+
+    subject = "Your ticket for match {match}"
+    body = (
+        "Hello {username},\n\n"
+        "Seat {seat_number} of match {match} is yours. Your ticket:\n\n"
+        "{ticket}\n"
+    )
+
+    def __init__(self, name: str, topics: Sequence[str] = ("reservation.confirmed",)):
+        super().__init__(name)
+        self.topics = set(topics)
+
+    def send_batch(self, messages: Sequence[OutboxMessage]) -> dict[int, str]:
+        emails = {
+            message.id: mail.EmailMessage(
+                subject=self.subject.format(**message.payload),
+                body=self.body.format(**message.payload),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[message.payload["email"]],
+            )
+            for message in messages
+            if message.topic in self.topics and message.payload.get("email")
+        }
+        if not emails:
+            return {}
+
+        errors = {}
+        with mail.get_connection() as connection:
+            for message_id, email in emails.items():
+                try:
+                    connection.send_messages([email])
+                except Exception as exc:
+                    errors[message_id] = f"{type(exc).__name__}: {exc}"
+        return errors
+
+
+class WebhookSink(Sink):
+    """
+    POST each message as JSON to a URL.
+
+    The message ID is sent in the `Idempotency-Key` header, so the receiver can drop
+    redeliveries. Any response other than 2xx is retried.
+    """
+
+    def __init__(self, name: str, url: str, timeout: float = 5.0):
+        super().__init__(name)
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, message: OutboxMessage):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(serialize(message), cls=DjangoJSONEncoder).encode(),
+            headers={
+                "Content-Type": "application/json",
+                "Idempotency-Key": str(message.id),
+            },
+            method="POST",
+        )
+        # Raises `HTTPError` on responses other than 2xx and 3xx.
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_sinks() -> list[Sink]:
+    """
+    Build the sinks configured in `OUTBOX_SINKS`.
+
+    :return: The sinks, named after their key in the setting.
+    :rtype: list[Sink]
+    """
+    return [
+        import_string(config["BACKEND"])(name, **config.get("OPTIONS", {}))
+        for name, config in settings.OUTBOX_SINKS.items()
+    ]
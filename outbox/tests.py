@@ -0,0 +1,274 @@
+import io
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from matches.models import Match, Seat, Team
+from outbox import facade as outbox_facade
+from outbox.models import OutboxMessage
+from outbox.relay import Relay
+from outbox.sinks import ConsoleSink, EmailSink, FileSink, Sink, WebhookSink
+from stadiums.models import Stadium
+
+
+class RecordingSink(Sink):
+    def __init__(self, name: str, fail: bool = False):
+        super().__init__(name)
+        self.fail = fail
+        self.received = []
+
+    def send(self, message: OutboxMessage):
+        if self.fail:
+            raise ConnectionError("Sink is down")
+        self.received.append(message.key)
+
+
+class PublishTest(TestCase):
+    def test_publish_once_per_key(self):
+        outbox_facade.publish("reservation.confirmed", "1", {"reservation": 1})
+        outbox_facade.publish("reservation.confirmed", "1", {"reservation": 1})
+        outbox_facade.publish("reservation.cancelled", "1", {"reservation": 1})
+
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+
+class ReserveSeatOutboxTest(APITestCase):
+    def setUp(self):
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.user = User.objects.create_user(username="user", email="user@a.com")
+        self.match = Match.objects.create(
+            stadium=Stadium.objects.create(name="some_stadium", location="some_city"),
+            home_side=team_1,
+            away_side=team_2,
+            match_day=timezone.localdate() + timedelta(days=30),
+            match_time="15:00:00",
+        )
+        self.seat = Seat.objects.create(match=self.match, seat_number=7)
+
+        self.client.force_authenticate(user=self.user)
+
+    def test_reservation_publishes_confirmation(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/reservation/reserve/",
+                {"match": self.match.id, "seat": self.seat.id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        outbox_queries = [
+            query["sql"] for query in queries if "outbox_outboxmessage" in query["sql"]
+        ]
+        self.assertEqual(len(outbox_queries), 1)
+        self.assertTrue(outbox_queries[0].startswith("INSERT"))
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.topic, "reservation.confirmed")
+        self.assertEqual(message.key, str(response.data["reservation"]))
+        self.assertEqual(message.payload["seat_number"], 7)
+        self.assertEqual(message.payload["email"], "user@a.com")
+        self.assertEqual(message.payload["ticket"], response.data["ticket"])
+
+    def test_failed_reservation_publishes_nothing(self):
+        Seat.objects.filter(id=self.seat.id).update(is_reserved=True)
+        response = self.client.post(
+            "/api/reservation/reserve/", {"match": self.match.id, "seat": self.seat.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_LEASE=60)
+class RelayTest(TestCase):
+    def setUp(self):
+        for key in range(1, 4):
+            outbox_facade.publish("reservation.confirmed", str(key), {"key": key})
+
+    def test_claim_is_exclusive(self):
+        self.assertEqual(len(outbox_facade.claim_batch("relay-1", 2, 60)), 2)
+        self.assertEqual(len(outbox_facade.claim_batch("relay-2", 10, 60)), 1)
+        self.assertEqual(outbox_facade.claim_batch("relay-3", 10, 60), [])
+
+    def test_claim_expired_lease(self):
+        outbox_facade.claim_batch("relay-1", 10, 60)
+        OutboxMessage.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(outbox_facade.claim_batch("relay-2", 10, 60)), 3)
+
+    def test_deliver_batch(self):
+        sink_1, sink_2 = RecordingSink("one"), RecordingSink("two")
+        counts = Relay([sink_1, sink_2], name="relay").run_once()
+
+        self.assertEqual(counts, {"delivered": 3, "retried": 0, "failed": 0})
+        self.assertEqual(sink_1.received, ["1", "2", "3"])
+        self.assertEqual(sink_2.received, ["1", "2", "3"])
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list("status", flat=True)),
+            {OutboxMessage.Status.DELIVERED},
+        )
+        self.assertEqual(Relay([sink_1], name="relay").run_once()["delivered"], 0)
+
+    def test_retry_failed_sink_only(self):
+        healthy, broken = RecordingSink("healthy"), RecordingSink("broken", fail=True)
+        relay = Relay([healthy, broken], name="relay")
+        counts = relay.run_once()
+        self.assertEqual(counts, {"delivered": 0, "retried": 3, "failed": 0})
+
+        message = OutboxMessage.objects.get(key="1")
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.delivered_to, ["healthy"])
+        self.assertIn("broken: ConnectionError: Sink is down", message.last_error)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        # Not due yet.
+        self.assertEqual(relay.run_once()["retried"], 0)
+
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        broken.fail = False
+        self.assertEqual(relay.run_once()["delivered"], 3)
+        self.assertEqual(healthy.received, ["1", "2", "3"])
+        self.assertEqual(broken.received, ["1", "2", "3"])
+
+    def test_fail_after_max_attempts(self):
+        relay = Relay([RecordingSink("broken", fail=True)], name="relay")
+        for _ in range(3):
+            OutboxMessage.objects.update(next_attempt_at=None)
+            counts = relay.run_once()
+        self.assertEqual(counts["failed"], 3)
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list("status", flat=True)),
+            {OutboxMessage.Status.FAILED},
+        )
+
+    @override_settings(OUTBOX_RETRY_BASE_DELAY=1, OUTBOX_RETRY_MAX_DELAY=60)
+    def test_retry_delay(self):
+        self.assertTrue(0.5 <= outbox_facade.retry_delay(1) <= 1)
+        self.assertTrue(4 <= outbox_facade.retry_delay(4) <= 8)
+        self.assertTrue(30 <= outbox_facade.retry_delay(20) <= 60)
+
+    def test_outcome_of_expired_lease_is_ignored(self):
+        messages = outbox_facade.claim_batch("relay-1", 10, 60)
+        OutboxMessage.objects.update(locked_by="relay-2")
+
+        outbox_facade.deliver(messages, [RecordingSink("one")])
+        self.assertFalse(
+            OutboxMessage.objects.filter(status=OutboxMessage.Status.DELIVERED).exists()
+        )
+
+    def test_purge_delivered(self):
+        Relay([RecordingSink("one")], name="relay").run_once()
+        OutboxMessage.objects.filter(key="1").update(
+            delivered_at=timezone.now() - timedelta(days=8)
+        )
+        self.assertEqual(outbox_facade.purge_delivered(7 * 24 * 3600), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+    def test_relay_survives_database_errors(self):
+        sink = RecordingSink("one")
+        claim_batch = outbox_facade.claim_batch
+        calls = iter([OperationalError("database is locked")])
+
+        def flaky_claim(*args):
+            error = next(calls, None)
+            if error:
+                raise error
+            return claim_batch(*args)
+
+        with mock.patch("outbox.facade.claim_batch", flaky_claim):
+            with self.assertLogs("outbox.relay", "ERROR"):
+                Relay([sink], name="relay", poll_interval=0.01).run(
+                    threading.Event(), burst=True
+                )
+
+        self.assertEqual(sink.received, ["1", "2", "3"])
+
+    def test_relay_outbox_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "outbox.jsonl"
+            sinks = {
+                "file": {"BACKEND": "outbox.sinks.FileSink", "OPTIONS": {"path": path}}
+            }
+            with override_settings(OUTBOX_SINKS=sinks):
+                call_command("relay_outbox", "--burst", stdout=io.StringIO())
+            lines = path.read_text().splitlines()
+
+        self.assertEqual([json.loads(line)["key"] for line in lines], ["1", "2", "3"])
+
+
+class SinkTest(TestCase):
+    def setUp(self):
+        outbox_facade.publish(
+            "reservation.confirmed",
+            "1",
+            {
+                "reservation": 1,
+                "match": 2,
+                "seat_number": 7,
+                "username": "user",
+                "email": "user@a.com",
+                "ticket": "AQAA",
+            },
+        )
+        outbox_facade.publish("reservation.confirmed", "2", {"email": ""})
+        self.messages = list(OutboxMessage.objects.order_by("id"))
+
+    def test_console_sink(self):
+        stream = io.StringIO()
+        self.assertEqual(ConsoleSink("console", stream).send_batch(self.messages), {})
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([line["id"] for line in lines], [m.id for m in self.messages])
+
+    def test_file_sink_appends(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = FileSink("file", Path(directory) / "outbox.jsonl")
+            sink.send_batch(self.messages[:1])
+            sink.send_batch(self.messages[1:])
+            self.assertEqual(len(sink.path.read_text().splitlines()), 2)
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_email_sink(self):
+        self.assertEqual(EmailSink("email").send_batch(self.messages), {})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@a.com"])
+        self.assertIn("Seat 7 of match 2", mail.outbox[0].body)
+
+    def test_webhook_sink(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                received.append((self.headers["Idempotency-Key"], json.loads(body)))
+                self.send_response(204 if len(received) == 1 else 500)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/"
+            errors = WebhookSink("webhook", url).send_batch(self.messages)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(list(errors), [self.messages[1].id])
+        self.assertEqual(received[0][0], str(self.messages[0].id))
+        self.assertEqual(received[0][1]["payload"]["ticket"], "AQAA")
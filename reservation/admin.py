@@ -1,5 +1,63 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-from reservation.models import Reservation
+from matches.models import Seat
+from reservation import facade as reservation_facade
+from reservation.models import CheckIn, Reservation
+from ticketing.paginator import EstimatedCountPaginator
 
-admin.site.register(Reservation)
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    """
+    Admin for reservations, built to stay responsive with millions of rows.
+
+    `Reservation.__str__` touches the user, the match with its stadium and teams, and
+    the seat, so they are fetched with the rows in a single query, and edited
+    through raw ID widgets. Users are searched by exact username, which is served
+    by its unique index, and pages are counted with `EstimatedCountPaginator`.
+    """
+
+    list_display = ["id", "user", "match", "seat", "created_at", "cancelled_at"]
+    list_select_related = [
+        "user",
+        "match__stadium",
+        "match__home_side",
+        "match__away_side",
+        "seat",
+    ]
+    list_filter = ["match"]
+    raw_id_fields = ["user", "match", "seat"]
+    search_fields = ["=user__username"]
+    ordering = ["-id"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["release_seats"]
+
+    @admin.action(description="Cancel selected reservations and release their seats")
+    def release_seats(self, request: HttpRequest, queryset: QuerySet[Reservation]):
+        # Evaluated up front: a subquery on active reservations would match nothing
+        # once the facade cancelled them.
+        seat_ids = list(
+            queryset.filter(cancelled_at__isnull=True).values_list("seat_id", flat=True)
+        )
+        seats = Seat.objects.filter(id__in=seat_ids)
+        result = reservation_facade.release_selected_seats(seats)
+        self.message_user(
+            request,
+            "Released %(released_seats)d seats, cancelled %(cancelled_reservations)d "
+            "reservations." % result,
+            messages.SUCCESS,
+        )
+
+
+@admin.register(CheckIn)
+class CheckInAdmin(admin.ModelAdmin):
+    list_display = ["id", "reservation_id", "match_id", "gate", "scanned_at"]
+    list_filter = ["gate"]
+    raw_id_fields = ["reservation", "match"]
+    search_fields = ["=reservation__id"]
+    ordering = ["-id"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
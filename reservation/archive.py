@@ -0,0 +1,157 @@
+import gzip
+import json
+import os
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from matches.models import Match, Seat, SeatEvent
+from matches.seatmap import invalidate_seat_map
+from reservation.models import PurchaseCounter, Reservation
+
+CHUNK_SIZE = 2000
+
+
+def get_archive_path(match_id: int) -> Path:
+    """
+    Return the path of the compressed archive of a match.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :return: The path of the gzipped JSONL archive.
+    :rtype: Path
+    """
+    return Path(settings.ARCHIVE_DIR) / f"match-{match_id}.jsonl.gz"
+
+
+def get_archivable_matches(older_than: date):
+    """
+    Return the not yet archived matches played before the given day.
+
+    :param older_than: Matches on or after this day are kept in the hot tables.
+    :type older_than: date
+    :return: A queryset of matches.
+    :rtype: QuerySet[Match]
+    """
+    return Match.objects.filter(
+        match_day__lt=older_than, archived_at__isnull=True
+    ).order_by("match_day", "match_time")
+
+
+def archive_match(match: Match) -> dict[str, int]:
+    """
+    Move the seats and reservations of a match into its archive file.
+
+    The archive is streamed to a temporary file and renamed into place before
+    any row is deleted, so a crash at any point leaves either the rows or a
+    complete archive behind.
+
+    Streaming and deleting share one transaction, and the seats are locked as
+    they are read, so a reservation or cancellation of the match waits for the
+    archive instead of landing between the two and being deleted unarchived. On
+    SQLite this holds the write lock for as long as the archive takes.
+
+    :param match: The match to archive.
+    :type match: Match
+    :return: The number of archived seats and reservations.
+    :rtype: dict[str, int]
+    """
+    path = get_archive_path(match.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+
+    counts = {"seats": 0, "reservations": 0}
+    with transaction.atomic():
+        with open(tmp_path, "wb") as raw, gzip.open(
+            raw, "wt", encoding="utf-8"
+        ) as archive:
+            seats = (
+                Seat.objects.select_for_update()
+                .filter(match_id=match.id)
+                .order_by("id")
+                .values("id", "seat_number", "is_reserved")
+            )
+            for seat in seats.iterator(CHUNK_SIZE):
+                archive.write(_dump({"type": "seat", **seat}))
+                counts["seats"] += 1
+
+            reservations = (
+                Reservation.objects.filter(match_id=match.id)
+                .order_by("id")
+                .values(
+                    "id",
+                    "seat_id",
+                    "user_id",
+                    "seat__seat_number",
+                    "created_at",
+                    "cancelled_at",
+                )
+            )
+            for reservation in reservations.iterator(CHUNK_SIZE):
+                archive.write(
+                    _dump(
+                        {
+                            "type": "reservation",
+                            "id": reservation["id"],
+                            "user": reservation["user_id"],
+                            "seat": reservation["seat_id"],
+                            "seat_number": reservation["seat__seat_number"],
+                            "created_at": reservation["created_at"],
+                            "cancelled_at": reservation["cancelled_at"],
+                        }
+                    )
+                )
+                counts["reservations"] += 1
+
+            archive.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+
+        SeatEvent.objects.filter(match_id=match.id).delete()
+        Reservation.objects.filter(match_id=match.id).delete()
+        PurchaseCounter.objects.filter(match_id=match.id).delete()
+        Seat.objects.filter(match_id=match.id).delete()
+        Match.objects.filter(id=match.id).update(archived_at=timezone.now())
+        invalidate_seat_map(match.id)
+
+    return counts
+
+
+def iter_archived_reservations(
+    match_id: int, user_id: int | None = None
+) -> Iterator[dict]:
+    """
+    Lazily read the reservations of an archived match.
+
+    Only the requested archive is opened and it is decompressed while iterating,
+    so reading one past ticket never loads the whole match into memory.
+
+    :param match_id: The ID of the archived match.
+    :type match_id: int
+    :param user_id: Only yield the reservations of this user, if given.
+    :type user_id: int | None
+    :return: An iterator over the archived reservations.
+    :rtype: Iterator[dict]
+    """
+    path = get_archive_path(match_id)
+    if not path.exists():
+        return
+
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            record = json.loads(line)
+            if record.pop("type") != "reservation":
+                continue
+            if user_id is not None and record["user"] != user_id:
+                continue
+            yield record
+
+
+def _dump(record: dict) -> str:
+    return json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
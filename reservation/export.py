@@ -0,0 +1,95 @@
+import csv
+from collections.abc import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reservation.models import Reservation
+
+CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = ["reservation", "user", "username", "seat_number", "created_at"]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """
+    File-like object whose `write` returns the value instead of buffering it,
+    letting `csv.writer` format one row at a time for a streaming response.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_export_rows(match_id: int, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Yield the active reservations of a match joined to their user and seat.
+
+    Rows are plain tuples in `EXPORT_COLUMNS` order read through a server-side
+    cursor, so memory stays constant whatever the size of the match.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param chunk_size: The number of rows fetched from the database at a time.
+    :type chunk_size: int
+    :return: An iterator over the export rows.
+    :rtype: Iterator[tuple]
+    """
+    return (
+        Reservation.objects.filter(match_id=match_id, cancelled_at__isnull=True)
+        .order_by("seat__seat_number")
+        .values_list(
+            "id", "user_id", "user__username", "seat__seat_number", "created_at"
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Format export rows as CSV lines, starting with the header.
+
+    :param rows: The export rows.
+    :type rows: Iterable[tuple]
+    :return: An iterator over the CSV lines.
+    :rtype: Iterator[str]
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Format export rows as JSON Lines, one object per reservation.
+
+    :param rows: The export rows.
+    :type rows: Iterable[tuple]
+    :return: An iterator over the JSON lines.
+    :rtype: Iterator[str]
+    """
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(EXPORT_COLUMNS, row))) + "\n"
+
+
+def iter_export(match_id: int, export_format: str) -> Iterator[str]:
+    """
+    Stream the reservations of a match in the given format.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param export_format: One of `EXPORT_FORMATS`.
+    :type export_format: str
+    :return: An iterator over the formatted lines.
+    :rtype: Iterator[str]
+    """
+    rows = iter_export_rows(match_id)
+    if export_format == "csv":
+        return iter_csv(rows)
+    return iter_jsonl(rows)
@@ -0,0 +1,330 @@
+import uuid
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from matches import facade as matches_facade
+from matches.models import Seat, SeatEvent
+from reservation import tickets
+from reservation.models import CheckIn, PurchaseCounter, Reservation
+
+CHECKED_IN = "checked_in"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+REVOKED = "revoked"
+
+
+def claim_purchases(user_id: int, match_id: int, seats: int = 1) -> bool:
+    """
+    Count seats towards the user's cap for a match, if they fit under it.
+
+    The cap is checked and the counter incremented by one conditional `UPDATE`, so
+    concurrent reservations of the same user can never exceed it. The first
+    purchase of a user in a match inserts the counter instead. Must run in the
+    transaction claiming the seats, which is rolled back when this returns False.
+
+    :param user_id: The ID of the user.
+    :type user_id: int
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param seats: The number of seats claimed.
+    :type seats: int
+    :return: True if the seats were counted, False if they exceed the cap.
+    :rtype: bool
+    """
+    limit = settings.RESERVATION_MAX_SEATS_PER_USER
+    counters = PurchaseCounter.objects.filter(user_id=user_id, match_id=match_id)
+    if limit is not None:
+        counters = counters.filter(seats__lte=limit - seats)
+    if counters.update(seats=F("seats") + seats):
+        return True
+    if limit is not None and seats > limit:
+        return False
+
+    try:
+        with transaction.atomic():
+            PurchaseCounter.objects.create(
+                user_id=user_id, match_id=match_id, seats=seats
+            )
+    except IntegrityError:
+        # The counter exists: the user is at the cap, or another reservation of the
+        # user inserted it first.
+        return bool(counters.update(seats=F("seats") + seats))
+    return True
+
+
+def claim_purchases_in_matches(
+    user_id: int, match_ids: list[int], seats: int = 1
+) -> bool:
+    """
+    Like `claim_purchases`, for the same number of seats in several matches, all
+    or none.
+
+    Missing counters are inserted first with one `INSERT`, then every counter is
+    incremented by one conditional `UPDATE`. Must run in the transaction claiming
+    the seats, which is rolled back when this returns False, counters included.
+
+    :param user_id: The ID of the user.
+    :type user_id: int
+    :param match_ids: The IDs of the matches, without repeats.
+    :type match_ids: list[int]
+    :param seats: The number of seats claimed in each match.
+    :type seats: int
+    :return: True if the seats were counted, False if they exceed the cap in any
+        of the matches.
+    :rtype: bool
+    """
+    limit = settings.RESERVATION_MAX_SEATS_PER_USER
+    if limit is not None and seats > limit:
+        return False
+
+    PurchaseCounter.objects.bulk_create(
+        (
+            PurchaseCounter(user_id=user_id, match_id=match_id, seats=0)
+            for match_id in match_ids
+        ),
+        ignore_conflicts=True,
+    )
+    counters = PurchaseCounter.objects.filter(user_id=user_id, match_id__in=match_ids)
+    if limit is not None:
+        counters = counters.filter(seats__lte=limit - seats)
+    return counters.update(seats=F("seats") + seats) == len(match_ids)
+
+
+def cancel_reservation(reservation_id: int, user_id: int) -> bool:
+    """
+    Cancel an active reservation of the user and return its seat to sale.
+
+    :return: True if the reservation was cancelled, False if the user has no such
+        active reservation.
+    :rtype: bool
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        reservation = (
+            Reservation.objects.select_for_update()
+            .filter(id=reservation_id, user_id=user_id, cancelled_at__isnull=True)
+            .values("match_id", "seat_id")
+            .first()
+        )
+        if not reservation:
+            return False
+
+        Reservation.objects.filter(id=reservation_id).update(cancelled_at=now)
+        Seat.objects.filter(id=reservation["seat_id"]).update(
+            is_reserved=False, updated_at=now
+        )
+        PurchaseCounter.objects.filter(
+            user_id=user_id, match_id=reservation["match_id"], seats__gt=0
+        ).update(seats=F("seats") - 1)
+        matches_facade.record_seat_events(
+            match_id=reservation["match_id"],
+            seat_ids=[reservation["seat_id"]],
+            old_state=SeatEvent.State.RESERVED,
+            new_state=SeatEvent.State.AVAILABLE,
+        )
+    return True
+
+
+def release_seats(
+    match_id: int, seat_from: int | None = None, seat_to: int | None = None
+) -> dict[str, int]:
+    """
+    Release every reserved seat of a match, optionally limited to a seat range.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param seat_from: The first seat number of the range, inclusive.
+    :type seat_from: int | None
+    :param seat_to: The last seat number of the range, inclusive.
+    :type seat_to: int | None
+    :return: The number of released seats and cancelled reservations.
+    :rtype: dict[str, int]
+    """
+    seats = Seat.objects.filter(match_id=match_id)
+    if seat_from is not None:
+        seats = seats.filter(seat_number__gte=seat_from)
+    if seat_to is not None:
+        seats = seats.filter(seat_number__lte=seat_to)
+    return release_selected_seats(seats)
+
+
+def release_selected_seats(seats: QuerySet[Seat]) -> dict[str, int]:
+    """
+    Release the reserved seats of a queryset, which may span several matches.
+
+    The active reservations of the seats are cancelled with a single `UPDATE` and
+    the seats are freed with another, both in one transaction, so releasing a whole
+    venue costs the same number of statements as releasing one seat.
+
+    :param seats: The seats to release; unreserved seats are skipped. It is
+        evaluated after the reservations are cancelled, so it must not filter on
+        reservations.
+    :type seats: QuerySet[Seat]
+    :return: The number of released seats and cancelled reservations.
+    :rtype: dict[str, int]
+    """
+    reserved_seats = seats.filter(is_reserved=True)
+    now = timezone.now()
+    with transaction.atomic():
+        # Lock the seats so the seats freed below are exactly the ones logged.
+        seat_ids = list(
+            reserved_seats.select_for_update()
+            .order_by("match_id", "seat_number")
+            .values_list("match_id", "id")
+        )
+
+        cancelled = Reservation.objects.filter(
+            seat__in=reserved_seats.values("id"), cancelled_at__isnull=True
+        ).update(cancelled_at=now)
+        if cancelled:
+            release_purchases(reserved_seats, cancelled_at=now)
+        released = reserved_seats.update(is_reserved=False, updated_at=now)
+        for match_id, rows in groupby(seat_ids, key=itemgetter(0)):
+            matches_facade.record_seat_events(
+                match_id=match_id,
+                seat_ids=[seat_id for _, seat_id in rows],
+                old_state=SeatEvent.State.RESERVED,
+                new_state=SeatEvent.State.AVAILABLE,
+            )
+
+    return {"released_seats": released, "cancelled_reservations": cancelled}
+
+
+def release_purchases(seats: QuerySet[Seat], cancelled_at: datetime):
+    """
+    Take the reservations of `seats` cancelled at `cancelled_at` off the purchase
+    counters of their users, with one `UPDATE` however many users they belong to.
+    """
+    cancelled = Reservation.objects.filter(
+        user_id=OuterRef("user_id"),
+        match_id=OuterRef("match_id"),
+        seat__in=seats.values("id"),
+        cancelled_at=cancelled_at,
+    )
+    per_counter = (
+        cancelled.order_by().values("user_id", "match_id").annotate(n=Count("id"))
+    )
+    # Never below zero, should a counter have been edited by hand.
+    PurchaseCounter.objects.filter(
+        Exists(cancelled), match_id__in=seats.values("match_id")
+    ).update(seats=Greatest(F("seats") - Subquery(per_counter.values("n")), 0))
+
+
+def get_revoked_reservation_ids(
+    match_id: int, since: datetime | None = None
+) -> list[int]:
+    """
+    List the cancelled reservations of a match, whose tickets scanners must refuse.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param since: Only list reservations cancelled at or after this time.
+    :type since: datetime | None
+    :return: The IDs of the reservations.
+    :rtype: list[int]
+    """
+    reservations = Reservation.objects.filter(
+        match_id=match_id, cancelled_at__isnull=False
+    )
+    if since is not None:
+        reservations = reservations.filter(cancelled_at__gte=since)
+    return list(reservations.order_by("id").values_list("id", flat=True))
+
+
+def check_in(match_id: int, scans: list[dict]) -> list[dict]:
+    """
+    Check in a batch of ticket scans of a match.
+
+    Tokens are verified in memory. The reservations they name are then checked in
+    one query, the check-ins inserted with one statement that skips tickets
+    already used, and read back with another. A batch costs three queries
+    however many scans it holds. A ticket is checked in by the first scan
+    synced, in order within a batch. Later scans are duplicates and report where
+    and when the ticket was used.
+
+    :param match_id: The ID of the match.
+    :type match_id: int
+    :param scans: The scans, with their `ticket`, `gate` and `scanned_at`.
+    :type scans: list[dict]
+    :return: One result per scan, in order: the ticket and its `result`, one of
+        `checked_in`, `duplicate`, `revoked` or `invalid`. Valid tickets also
+        get their `reservation`, `seat`, and the `gate` and `checked_in_at` of
+        their check-in; invalid ones an `error`.
+    :rtype: list[dict]
+    """
+    key = tickets.match_key(match_id)
+    verified = []
+    for scan in scans:
+        try:
+            ticket = tickets.verify_ticket(scan["ticket"], match_id, key)
+        except tickets.InvalidTicket as error:
+            ticket = error
+        verified.append((scan, ticket))
+
+    reservation_ids = {
+        ticket.reservation_id
+        for _, ticket in verified
+        if isinstance(ticket, tickets.Ticket)
+    }
+    active_ids = set(
+        Reservation.objects.filter(
+            id__in=reservation_ids, match_id=match_id, cancelled_at__isnull=True
+        ).values_list("id", flat=True)
+    )
+
+    batch = uuid.uuid4()
+    now = timezone.now()
+    first_scans = {}
+    for scan, ticket in verified:
+        if isinstance(ticket, tickets.Ticket) and ticket.reservation_id in active_ids:
+            first_scans.setdefault(ticket.reservation_id, scan)
+    CheckIn.objects.bulk_create(
+        (
+            CheckIn(
+                reservation_id=reservation_id,
+                match_id=match_id,
+                gate=scan["gate"],
+                scanned_at=scan.get("scanned_at") or now,
+                batch=batch,
+            )
+            for reservation_id, scan in first_scans.items()
+        ),
+        ignore_conflicts=True,
+    )
+    check_ins = {
+        reservation_id: (gate, scanned_at, row_batch)
+        for reservation_id, gate, scanned_at, row_batch in CheckIn.objects.filter(
+            reservation_id__in=active_ids
+        ).values_list("reservation_id", "gate", "scanned_at", "batch")
+    }
+
+    results = []
+    for scan, ticket in verified:
+        if not isinstance(ticket, tickets.Ticket):
+            results.append(
+                {"ticket": scan["ticket"], "result": INVALID, "error": str(ticket)}
+            )
+            continue
+
+        result = {
+            "ticket": scan["ticket"],
+            "reservation": ticket.reservation_id,
+            "seat": ticket.seat_id,
+        }
+        if ticket.reservation_id not in active_ids:
+            result["result"] = REVOKED
+        else:
+            gate, scanned_at, row_batch = check_ins[ticket.reservation_id]
+            accepted = row_batch == batch and first_scans[ticket.reservation_id] is scan
+            result["result"] = CHECKED_IN if accepted else DUPLICATE
+            result["gate"] = gate
+            result["checked_in_at"] = scanned_at
+        results.append(result)
+    return results
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reservation import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the seats and reservations of past matches into compressed per-match "
+        "archive files, keeping the hot tables bounded by upcoming matches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Archive matches played more than this many days ago.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the matches that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.localdate() - timedelta(days=options["days"])
+        matches = archive.get_archivable_matches(older_than)
+
+        for match in matches:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive match {match.id} ({match.match_day})")
+                continue
+
+            counts = archive.archive_match(match)
+            self.stdout.write(
+                f"Archived match {match.id}: {counts['seats']} seats, "
+                f"{counts['reservations']} reservations"
+            )
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0009_match_sales_window'),
+        ('reservation', '0002_reservation_cancelled_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['match', 'cancelled_at'], name='reservation_match_cancel_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0010_match_schedule_idx'),
+        ('reservation', '0004_checkin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seats', models.PositiveIntegerField(default=0)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.match')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'purchase counter',
+                'verbose_name_plural': 'purchase counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='purchasecounter',
+            constraint=models.UniqueConstraint(fields=('user', 'match'), name='purchase_counter_user_match_unique'),
+        ),
+    ]
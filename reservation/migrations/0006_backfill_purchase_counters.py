@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill_purchase_counters(apps, schema_editor):
+    """
+    Count the active reservations of every user in every match, so that seats
+    bought before the counters existed count towards the cap.
+    """
+    Reservation = apps.get_model('reservation', 'Reservation')
+    PurchaseCounter = apps.get_model('reservation', 'PurchaseCounter')
+
+    per_counter = (
+        Reservation.objects.filter(cancelled_at__isnull=True)
+        .order_by()
+        .values('user_id', 'match_id')
+        .annotate(seats=Count('id'))
+    )
+    counters = []
+    for row in per_counter.iterator(chunk_size=BATCH_SIZE):
+        counters.append(PurchaseCounter(**row))
+        if len(counters) >= BATCH_SIZE:
+            PurchaseCounter.objects.bulk_create(counters, ignore_conflicts=True)
+            counters = []
+    PurchaseCounter.objects.bulk_create(counters, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0005_purchasecounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_purchase_counters, migrations.RunPython.noop),
+    ]
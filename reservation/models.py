@@ -1,16 +1,89 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from reservation import tickets
+
 
 class Reservation(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     match = models.ForeignKey("matches.Match", on_delete=models.CASCADE)
     seat = models.ForeignKey("matches.Seat", on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now=False, auto_now_add=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "reservation"
         verbose_name_plural = "reservations"
+        indexes = [
+            models.Index(
+                fields=["match", "cancelled_at"],
+                name="reservation_match_cancel_idx",
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.username}:{self.match}:{self.seat}"
+
+    @property
+    def ticket(self) -> str:
+        """
+        The signed ticket token of the reservation, verified offline at the gate.
+        """
+        return tickets.sign_ticket(
+            tickets.Ticket(self.id, self.match_id, self.seat_id, self.user_id)
+        )
+
+
+class CheckIn(models.Model):
+    """
+    The use of a ticket at a gate.
+
+    A reservation has at most one check-in, so a ticket scanned at two gates is
+    caught by the unique constraint whichever scan is synced first. `batch`
+    identifies the request that inserted the row, to tell the scans it accepted
+    from the duplicates of earlier ones.
+    """
+
+    reservation = models.OneToOneField(
+        Reservation, on_delete=models.CASCADE, related_name="check_in"
+    )
+    match = models.ForeignKey("matches.Match", on_delete=models.CASCADE)
+    gate = models.CharField(max_length=32)
+    scanned_at = models.DateTimeField()
+    batch = models.UUIDField()
+    created_at = models.DateTimeField(auto_now=False, auto_now_add=True)
+
+    class Meta:
+        verbose_name = "check-in"
+        verbose_name_plural = "check-ins"
+
+    def __str__(self):
+        return f"{self.reservation_id}@{self.gate}"
+
+
+class PurchaseCounter(models.Model):
+    """
+    The number of seats a user holds in a match, capped at
+    `RESERVATION_MAX_SEATS_PER_USER`.
+
+    Reserving increments the counter with a conditional `UPDATE` in the transaction
+    of the seat claim, so checking the cap and counting the purchase is a single
+    statement on a row only that user contends for, see
+    `reservation.facade.claim_purchases`. Cancelling gives the seats back.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    match = models.ForeignKey("matches.Match", on_delete=models.CASCADE)
+    seats = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "purchase counter"
+        verbose_name_plural = "purchase counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "match"], name="purchase_counter_user_match_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.match_id} ({self.seats})"
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from reservation.export import EXPORT_FORMATS
+
 
 class ReserveSeatSerializer(serializers.Serializer):
     """
@@ -13,3 +16,126 @@ class ReserveSeatSerializer(serializers.Serializer):
 
     match = serializers.IntegerField()
     seat = serializers.IntegerField()
+
+
+class SeasonReservationSerializer(serializers.Serializer):
+    """
+    Serializer for reserving the same seat in several matches.
+
+    ---
+    # Fields
+    - `seat_number`: The seat number to be reserved in every match.
+    - `matches`: The IDs of the matches, at most `MAX_MATCHES`. Optional.
+    - `team`: The ID of a team, to reserve its home matches on sale. Optional.
+    - `stadium`: Only the home matches of `team` at this stadium. Optional.
+
+    # Validations
+    - Either `matches` or `team` is given, not both.
+    - `stadium` is only given with `team`.
+    """
+
+    MAX_MATCHES = 100
+
+    seat_number = serializers.IntegerField()
+    matches = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_MATCHES,
+    )
+    team = serializers.IntegerField(required=False)
+    stadium = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if ("matches" in data) == ("team" in data):
+            raise serializers.ValidationError("Give either matches or team")
+        if "stadium" in data and "team" not in data:
+            raise serializers.ValidationError("stadium is only allowed with team")
+        if "matches" in data:
+            data["matches"] = list(dict.fromkeys(data["matches"]))
+        return data
+
+
+class ReleaseSeatsSerializer(serializers.Serializer):
+    """
+    Serializer for releasing the reserved seats of a match.
+
+    ---
+    # Fields
+    - `seat_from`: The first seat number to release, inclusive. Optional.
+    - `seat_to`: The last seat number to release, inclusive. Optional.
+
+    # Validations
+    - `seat_from` should not be greater than `seat_to`.
+    """
+
+    seat_from = serializers.IntegerField(required=False)
+    seat_to = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        seat_from = data.get("seat_from")
+        seat_to = data.get("seat_to")
+        if seat_from is not None and seat_to is not None and seat_from > seat_to:
+            raise serializers.ValidationError("seat_from is greater than seat_to")
+        return data
+
+
+class ExportReservationsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the reservation export.
+
+    ---
+    # Fields
+    - `output`: The export format, `csv` or `jsonl`. Defaults to `csv`.
+    """
+
+    output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default="csv")
+
+
+class TicketRevocationsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the ticket revocation list.
+
+    ---
+    # Fields
+    - `since`: Only list tickets revoked since this time, typically the
+      `generated_at` of the previous download. Optional.
+    """
+
+    since = serializers.DateTimeField(required=False)
+
+
+class ScanSerializer(serializers.Serializer):
+    """
+    Serializer for a ticket scan.
+
+    ---
+    # Fields
+    - `ticket`: The ticket token read at the gate.
+    - `gate`: The gate the ticket was scanned at.
+    - `scanned_at`: When the ticket was scanned. Defaults to the time of the sync.
+    """
+
+    ticket = serializers.CharField(max_length=100)
+    gate = serializers.CharField(max_length=32)
+    scanned_at = serializers.DateTimeField(required=False)
+
+
+class CheckInSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of ticket scans.
+
+    ---
+    # Fields
+    - `scans`: The scans, at most `CHECK_IN_MAX_BATCH_SIZE`.
+    """
+
+    scans = serializers.ListField(child=ScanSerializer(), allow_empty=False)
+
+    def validate_scans(self, scans):
+        if len(scans) > settings.CHECK_IN_MAX_BATCH_SIZE:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than "
+                f"{settings.CHECK_IN_MAX_BATCH_SIZE} elements."
+            )
+        return scans
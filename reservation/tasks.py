@@ -0,0 +1,50 @@
+from jobs import facade as jobs_facade
+from jobs.models import Job
+from jobs.registry import register
+from reservation import export
+from reservation import facade as reservation_facade
+from reservation.export import EXPORT_FORMATS
+from reservation.models import Reservation
+
+# Rows written between two progress reports of an export.
+PROGRESS_EVERY = 1000
+
+
+@register("reservation.release_seats")
+def release_seats(
+    job: Job, match_id: int, seat_from: int | None = None, seat_to: int | None = None
+) -> dict:
+    """
+    Release the reserved seats of a match, see `ReleaseSeatsView`.
+    """
+    return reservation_facade.release_seats(
+        match_id=match_id, seat_from=seat_from, seat_to=seat_to
+    )
+
+
+@register("reservation.export")
+def export_reservations(job: Job, match_id: int, output: str) -> dict:
+    """
+    Write the attendee list of a match to a file, see `ExportReservationsView`.
+    """
+    total = Reservation.objects.filter(
+        match_id=match_id, cancelled_at__isnull=True
+    ).count()
+    job.set_progress(0, total)
+
+    filename = f"match-{match_id}-reservations.{output}"
+    rows = 0
+    with open(
+        jobs_facade.output_path(job, filename), "w", encoding="utf-8", newline=""
+    ) as file:
+        lines = export.iter_export(match_id, output)
+        if output == "csv":
+            file.write(next(lines))
+        for line in lines:
+            file.write(line)
+            rows += 1
+            if rows % PROGRESS_EVERY == 0:
+                job.set_progress(rows)
+    # Reservations may have changed since they were counted.
+    job.set_progress(rows, rows)
+    return {"file": filename, "content_type": EXPORT_FORMATS[output], "rows": rows}
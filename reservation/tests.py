@@ -1,13 +1,37 @@
+import base64
+import io
+import json
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
-from matches.models import Match, Seat
+from jobs.models import Job
+from jobs.worker import Worker
+from matches.models import Match, Seat, SeatEvent, Team
+from matches.state import NOT_ON_SALE, get_match_state
+from outbox.models import OutboxMessage
+from reservation import facade as reservation_facade
+from reservation import tickets
+from reservation.models import CheckIn, PurchaseCounter, Reservation
+from reservation.views import RESERVATIONS
 from stadiums.models import Stadium
 
 
 class ReserveSeatViewTest(APITestCase):
     def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
         self.endpoint = "/api/reservation/reserve/"
 
         self.user_1 = User.objects.create_user(username="user_1")
@@ -18,9 +42,9 @@ class ReserveSeatViewTest(APITestCase):
         )
         self.match = Match.objects.create(
             stadium=self.stadium,
-            home_side="Team 1",
-            away_side="Team 2",
-            match_day="2024-01-01",
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day=timezone.now().date() + timedelta(days=30),
             match_time="15:00:00",
         )
         self.unreserved_seat = Seat.objects.create(
@@ -47,6 +71,41 @@ class ReserveSeatViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data.get("message"), "Successfully reserved the seat")
         self.assertEqual(Seat.objects.get(id=self.unreserved_seat.id).is_reserved, True)
+        self.assertEqual(
+            tickets.verify_ticket(
+                response.data["ticket"],
+                self.match.id,
+                tickets.match_key(self.match.id),
+            ),
+            (
+                response.data["reservation"],
+                self.match.id,
+                self.unreserved_seat.id,
+                self.user_1.id,
+            ),
+        )
+        self.assertTrue(
+            SeatEvent.objects.filter(
+                seat=self.unreserved_seat, new_state=SeatEvent.State.RESERVED
+            ).exists()
+        )
+
+    def test_reservation_metrics(self):
+        def outcomes():
+            return dict((key[0], value) for key, value in RESERVATIONS.snapshot())
+
+        before = outcomes()
+        self.client.force_authenticate(user=self.user_1)
+        self.client.post(
+            self.endpoint, {"seat": self.unreserved_seat.id, "match": self.match.id}
+        )
+        self.client.post(
+            self.endpoint, {"seat": self.reserved_seat.id, "match": self.match.id}
+        )
+        after = outcomes()
+
+        self.assertEqual(after["succeeded"] - before.get("succeeded", 0), 1)
+        self.assertEqual(after["rejected"] - before.get("rejected", 0), 1)
 
     def test_seat_already_reserved(self):
         self.client.force_authenticate(user=self.user_1)
@@ -96,6 +155,67 @@ class ReserveSeatViewTest(APITestCase):
             "Match not found",
         )
 
+    def test_match_not_on_sale_yet(self):
+        self.match.on_sale_at = timezone.now() + timedelta(days=1)
+        self.match.save()
+        self.client.force_authenticate(user=self.user_1)
+        data = {"seat": self.unreserved_seat.id, "match": self.match.id}
+        self.client.post(self.endpoint, data)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.endpoint, data)
+
+        # Only the savepoints of the view's transaction, nested in the test's.
+        self.assertFalse(
+            [q for q in queries if "SAVEPOINT" not in q["sql"]],
+            queries.captured_queries,
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data.get("error"), "Match is not on sale yet")
+        self.assertFalse(Seat.objects.get(id=self.unreserved_seat.id).is_reserved)
+
+    def test_match_sales_closed(self):
+        self.client.force_authenticate(user=self.user_1)
+        data = {"seat": self.unreserved_seat.id, "match": self.match.id}
+
+        for changes in [
+            {"off_sale_at": timezone.now() - timedelta(minutes=1)},
+            {"status": Match.Status.CANCELLED},
+            {"match_day": timezone.now().date() - timedelta(days=1)},
+        ]:
+            with self.subTest(**changes):
+                Match.objects.filter(id=self.match.id).update(
+                    off_sale_at=None, status=Match.Status.SCHEDULED
+                )
+                for field, value in changes.items():
+                    setattr(self.match, field, value)
+                self.match.save()
+
+                response = self.client.post(self.endpoint, data)
+
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+                self.assertEqual(
+                    response.data.get("error"), "Sales are closed for this match"
+                )
+
+    def test_seat_of_another_match(self):
+        other_match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day=timezone.now().date() - timedelta(days=1),
+            match_time="15:00:00",
+        )
+        other_seat = Seat.objects.create(match=other_match, seat_number=1)
+        self.client.force_authenticate(user=self.user_1)
+
+        response = self.client.post(
+            self.endpoint, {"seat": other_seat.id, "match": self.match.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Seat.objects.get(id=other_seat.id).is_reserved)
+
     def test_concurrent_update(self):
         client1 = APIClient()
         client1.force_authenticate(user=self.user_1)
@@ -112,3 +232,947 @@ class ReserveSeatViewTest(APITestCase):
         self.assertEqual(response2.status_code, status.HTTP_400_BAD_REQUEST)
 
         self.assertEqual(Seat.objects.get(id=self.unreserved_seat.id).is_reserved, True)
+
+
+@override_settings(RESERVATION_MAX_SEATS_PER_USER=2)
+class PurchaseLimitTest(APITestCase):
+    def setUp(self):
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.user = User.objects.create_user(username="user")
+        self.other_user = User.objects.create_user(username="other_user")
+        self.match = Match.objects.create(
+            stadium=Stadium.objects.create(name="some_stadium", location="some_city"),
+            home_side=team_1,
+            away_side=team_2,
+            match_day=timezone.now().date() + timedelta(days=30),
+            match_time="15:00:00",
+        )
+        self.seats = Seat.objects.bulk_create(
+            Seat(match=self.match, seat_number=number) for number in range(1, 6)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def reserve(self, seat: Seat):
+        return self.client.post(
+            "/api/reservation/reserve/", {"match": self.match.id, "seat": seat.id}
+        )
+
+    def counted_seats(self, user: User) -> int:
+        return PurchaseCounter.objects.get(user=user, match=self.match).seats
+
+    def test_reserve_up_to_the_limit(self):
+        self.assertEqual(self.reserve(self.seats[0]).status_code, 201)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.reserve(self.seats[1]).status_code, 201)
+        counter_queries = [
+            q["sql"] for q in queries if "reservation_purchasecounter" in q["sql"]
+        ]
+        self.assertEqual(len(counter_queries), 1)
+        self.assertTrue(counter_queries[0].startswith("UPDATE"))
+
+        response = self.reserve(self.seats[2])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["error"],
+            "Purchase limit reached: at most 2 seats per user for this match",
+        )
+        self.assertFalse(Seat.objects.get(id=self.seats[2].id).is_reserved)
+        self.assertEqual(Reservation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.counted_seats(self.user), 2)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.reserve(self.seats[2]).status_code, 201)
+
+    def test_cancel_frees_the_limit(self):
+        reservation_id = self.reserve(self.seats[0]).data["reservation"]
+        self.reserve(self.seats[1])
+
+        response = self.client.post(f"/api/reservation/{reservation_id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counted_seats(self.user), 1)
+        self.assertEqual(self.reserve(self.seats[2]).status_code, 201)
+
+    def test_release_frees_the_limit(self):
+        self.reserve(self.seats[0])
+        self.reserve(self.seats[1])
+        self.client.force_authenticate(user=self.other_user)
+        self.reserve(self.seats[2])
+
+        reservation_facade.release_seats(self.match.id, seat_from=2)
+
+        self.assertEqual(self.counted_seats(self.user), 1)
+        self.assertEqual(self.counted_seats(self.other_user), 0)
+
+    def test_claim_several_seats(self):
+        claim = reservation_facade.claim_purchases
+        self.assertFalse(claim(self.user.id, self.match.id, seats=3))
+        self.assertTrue(claim(self.user.id, self.match.id, seats=2))
+        self.assertFalse(claim(self.user.id, self.match.id, seats=1))
+        self.assertEqual(self.counted_seats(self.user), 2)
+
+        with override_settings(RESERVATION_MAX_SEATS_PER_USER=None):
+            self.assertTrue(claim(self.user.id, self.match.id, seats=10))
+        self.assertEqual(self.counted_seats(self.user), 12)
+
+
+class SeasonReservationViewTest(APITestCase):
+    def setUp(self):
+        self.endpoint = "/api/reservation/reserve/season/"
+        self.home, *away_sides = Team.objects.bulk_create(
+            Team(name=f"Team {number}") for number in range(1, 6)
+        )
+        self.stadium = Stadium.objects.create(name="home_stadium", location="city")
+        other_stadium = Stadium.objects.create(name="other_stadium", location="city")
+        today = timezone.now().date()
+        self.matches = [
+            Match.objects.create(
+                stadium=stadium,
+                home_side=self.home,
+                away_side=away_side,
+                match_day=today + timedelta(days=days),
+                match_time="15:00:00",
+                on_sale_at=on_sale_at,
+            )
+            for stadium, away_side, days, on_sale_at in [
+                (self.stadium, away_sides[0], 10, None),
+                (self.stadium, away_sides[1], 20, None),
+                (other_stadium, away_sides[2], 30, None),
+                (self.stadium, away_sides[3], 40, timezone.now() + timedelta(days=1)),
+            ]
+        ]
+        Seat.objects.bulk_create(
+            Seat(match=match, seat_number=number)
+            for match in self.matches
+            for number in (1, 2)
+        )
+        self.user = User.objects.create_user(username="user")
+        self.client.force_authenticate(user=self.user)
+
+    def reserved_matches(self, seat_number: int = 2) -> list[int]:
+        return list(
+            Seat.objects.filter(seat_number=seat_number, is_reserved=True)
+            .order_by("match__match_day")
+            .values_list("match_id", flat=True)
+        )
+
+    def test_reserve_matches(self):
+        match_ids = [match.id for match in self.matches[:3]]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.endpoint, {"seat_number": 2, "matches": match_ids}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [reservation["match"] for reservation in response.data["reservations"]],
+            match_ids,
+        )
+        self.assertEqual(self.reserved_matches(), match_ids)
+        self.assertEqual(Reservation.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(SeatEvent.objects.count(), 3)
+        self.assertEqual(
+            OutboxMessage.objects.filter(topic="reservation.confirmed").count(), 3
+        )
+        reservation = response.data["reservations"][0]
+        ticket = tickets.verify_ticket(
+            reservation["ticket"], match_ids[0], tickets.match_key(match_ids[0])
+        )
+        self.assertEqual(ticket.reservation_id, reservation["reservation"])
+
+        seat_queries = [q["sql"] for q in queries if '"matches_seat"' in q["sql"]]
+        self.assertEqual(len(seat_queries), 2)
+        self.assertTrue(seat_queries[1].startswith("UPDATE"))
+        for table in ('"matches_seatevent"', '"reservation_purchasecounter"'):
+            writes = [
+                q["sql"]
+                for q in queries
+                if table in q["sql"] and not q["sql"].startswith("SELECT")
+            ]
+            self.assertLessEqual(len(writes), 2, table)
+        self.assertEqual(
+            list(
+                PurchaseCounter.objects.filter(user=self.user)
+                .order_by("match_id")
+                .values_list("match_id", "seats")
+            ),
+            [(match_id, 1) for match_id in match_ids],
+        )
+
+    def test_reserve_home_matches_on_sale(self):
+        response = self.client.post(
+            self.endpoint,
+            {"seat_number": 2, "team": self.home.id, "stadium": self.stadium.id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.reserved_matches(), [self.matches[0].id, self.matches[1].id]
+        )
+
+    def test_home_matches_without_state_are_skipped(self):
+        # The cache answers for a match as if it did not exist, e.g. a miss cached
+        # before another process created it.
+        get_state = get_match_state
+        missing = self.matches[1].id
+
+        def cached_miss(match_id):
+            return None if match_id == missing else get_state(match_id)
+
+        with mock.patch("reservation.views.get_match_state", cached_miss):
+            response = self.client.post(
+                self.endpoint,
+                {"seat_number": 2, "team": self.home.id, "stadium": self.stadium.id},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserved_matches(), [self.matches[0].id])
+
+    def test_seat_taken_in_one_match(self):
+        Seat.objects.filter(match=self.matches[1], seat_number=2).update(
+            is_reserved=True
+        )
+
+        response = self.client.post(
+            self.endpoint,
+            {"seat_number": 2, "matches": [self.matches[0].id, self.matches[1].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["error"],
+            f"Seat 2 is reserved or not available in matches {self.matches[1].id}",
+        )
+        self.assertEqual(self.reserved_matches(), [self.matches[1].id])
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_match_not_on_sale(self):
+        response = self.client.post(
+            self.endpoint,
+            {"seat_number": 2, "matches": [self.matches[0].id, self.matches[3].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["error"], f"Match {self.matches[3].id}: {NOT_ON_SALE}"
+        )
+        self.assertEqual(self.reserved_matches(), [])
+
+    @override_settings(RESERVATION_MAX_SEATS_PER_USER=1)
+    def test_purchase_limit_rolls_back_every_match(self):
+        self.client.post(
+            "/api/reservation/reserve/",
+            {
+                "match": self.matches[1].id,
+                "seat": Seat.objects.get(match=self.matches[1], seat_number=1).id,
+            },
+        )
+
+        response = self.client.post(
+            self.endpoint,
+            {"seat_number": 2, "matches": [self.matches[0].id, self.matches[1].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.reserved_matches(), [])
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertFalse(PurchaseCounter.objects.filter(match=self.matches[0]).exists())
+
+    def test_matches_or_team(self):
+        response = self.client.post(
+            self.endpoint,
+            {"seat_number": 2, "matches": [self.matches[0].id], "team": self.home.id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TicketTest(APITestCase):
+    def setUp(self):
+        self.ticket = tickets.Ticket(
+            reservation_id=10, match_id=2, seat_id=30, user_id=4
+        )
+        self.key = tickets.match_key(2)
+        self.token = tickets.sign_ticket(self.ticket)
+
+    def test_verify_ticket(self):
+        self.assertEqual(len(self.token), 66)
+        self.assertEqual(tickets.verify_ticket(self.token, 2, self.key), self.ticket)
+
+    def test_keys_differ_per_match(self):
+        self.assertNotEqual(tickets.match_key(1), self.key)
+        with override_settings(TICKET_SIGNING_KEY="another key"):
+            self.assertNotEqual(tickets.match_key(2), self.key)
+
+    def test_reject_invalid_tickets(self):
+        forged = tickets.sign_ticket(self.ticket._replace(seat_id=31), key=b"x" * 32)
+        tampered = bytearray(base64.urlsafe_b64decode(self.token + "=="))
+        tampered[-1] ^= 1
+
+        for token, match_id, revoked, error in [
+            ("not a ticket", 2, (), "Malformed ticket"),
+            (self.token[:-4], 2, (), "Malformed ticket"),
+            ("é" * 66, 2, (), "Malformed ticket"),
+            (tickets._encode(tampered), 2, (), "Invalid signature"),
+            (forged, 2, (), "Invalid signature"),
+            (self.token, 3, (), "Ticket is for another match"),
+            (self.token, 2, {10}, "Ticket was revoked"),
+        ]:
+            with self.subTest(error=error), self.assertRaisesMessage(
+                tickets.InvalidTicket, error
+            ):
+                tickets.verify_ticket(token, match_id, self.key, revoked)
+
+    def test_reject_non_canonical_tickets(self):
+        # The last character holds 2 bits of the MAC and 4 unused bits.
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+        last = alphabet[alphabet.index(self.token[-1]) ^ 1]
+
+        for token in [
+            self.token + "==",
+            self.token[:33] + "\n" + self.token[33:],
+            self.token[:33] + "." + self.token[33:],
+            self.token[:-1] + last,
+        ]:
+            with self.subTest(token=token), self.assertRaisesMessage(
+                tickets.InvalidTicket, "Malformed ticket"
+            ):
+                tickets.verify_ticket(token, 2, self.key)
+
+
+class TicketRevocationsViewTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin")
+        self.user = User.objects.create_user(username="user")
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.match = Match.objects.create(
+            stadium=Stadium.objects.create(name="some_stadium", location="some_city"),
+            home_side=team_1,
+            away_side=team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        now = timezone.now()
+        self.reservations = [
+            Reservation.objects.create(
+                user=self.user,
+                match=self.match,
+                seat=Seat.objects.create(match=self.match, seat_number=number),
+                cancelled_at=cancelled_at,
+            )
+            for number, cancelled_at in [
+                (1, None),
+                (2, now - timedelta(hours=1)),
+                (3, now - timedelta(seconds=30)),
+            ]
+        ]
+        self.endpoint = f"/api/reservation/match/{self.match.id}/revocations/"
+
+        self.client.force_authenticate(user=self.admin)
+
+    def test_revocations(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["revoked"], [r.id for r in self.reservations[1:]]
+        )
+        self.assertEqual(
+            bytes.fromhex(response.data["key"]), tickets.match_key(self.match.id)
+        )
+
+    def test_revocations_since_previous_download(self):
+        since = timezone.now() - timedelta(seconds=10)
+
+        with override_settings(TICKET_REVOCATION_OVERLAP=60):
+            response = self.client.get(self.endpoint, {"since": since.isoformat()})
+        self.assertEqual(response.data["revoked"], [self.reservations[2].id])
+
+        with override_settings(TICKET_REVOCATION_OVERLAP=0):
+            response = self.client.get(self.endpoint, {"since": since.isoformat()})
+        self.assertEqual(response.data["revoked"], [])
+
+    def test_revocations_for_invalid_match(self):
+        response = self.client.get("/api/reservation/match/100/revocations/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_revocations_as_normal_user(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CheckInViewTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin")
+        self.user = User.objects.create_user(username="user")
+        team_1, team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.match = Match.objects.create(
+            stadium=Stadium.objects.create(name="some_stadium", location="some_city"),
+            home_side=team_1,
+            away_side=team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.reservations = [
+            Reservation.objects.create(
+                user=self.user,
+                match=self.match,
+                seat=Seat.objects.create(
+                    match=self.match, seat_number=number, is_reserved=True
+                ),
+            )
+            for number in range(1, 6)
+        ]
+        self.endpoint = f"/api/reservation/match/{self.match.id}/check-in/"
+
+        self.client.force_authenticate(user=self.admin)
+
+    def _scan(self, reservation, gate="A", **kwargs):
+        return {"ticket": reservation.ticket, "gate": gate, **kwargs}
+
+    def _check_in(self, scans):
+        response = self.client.post(self.endpoint, {"scans": scans}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result["result"] for result in response.data["results"]]
+
+    def test_check_in(self):
+        scanned_at = timezone.now() - timedelta(minutes=1)
+
+        response = self.client.post(
+            self.endpoint,
+            {"scans": [self._scan(self.reservations[0], scanned_at=scanned_at)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0],
+            {
+                "ticket": self.reservations[0].ticket,
+                "reservation": self.reservations[0].id,
+                "seat": self.reservations[0].seat_id,
+                "result": "checked_in",
+                "gate": "A",
+                "checked_in_at": scanned_at,
+            },
+        )
+        self.assertTrue(CheckIn.objects.filter(reservation=self.reservations[0]))
+
+    def test_duplicate_scans(self):
+        self._check_in([self._scan(self.reservations[0], gate="A")])
+
+        response = self.client.post(
+            self.endpoint,
+            {
+                "scans": [
+                    self._scan(self.reservations[0], gate="B"),
+                    self._scan(self.reservations[1], gate="B"),
+                    self._scan(self.reservations[1], gate="C"),
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(
+            [(r["result"], r["gate"]) for r in response.data["results"]],
+            [("duplicate", "A"), ("checked_in", "B"), ("duplicate", "B")],
+        )
+        self.assertEqual(CheckIn.objects.count(), 2)
+
+    def test_revoked_and_invalid_tickets(self):
+        self.reservations[0].cancelled_at = timezone.now()
+        self.reservations[0].save()
+        other_match_ticket = tickets.sign_ticket(
+            tickets.Ticket(100, self.match.id + 1, 1, self.user.id)
+        )
+
+        results = self._check_in(
+            [
+                self._scan(self.reservations[0]),
+                {"ticket": "not a ticket", "gate": "A"},
+                {"ticket": other_match_ticket, "gate": "A"},
+            ]
+        )
+
+        self.assertEqual(results, ["revoked", "invalid", "invalid"])
+        self.assertFalse(CheckIn.objects.exists())
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        get_match_state(self.match.id)
+        with CaptureQueriesContext(connection) as few:
+            self._check_in([self._scan(self.reservations[0])])
+        with CaptureQueriesContext(connection) as many:
+            self._check_in([self._scan(r) for r in self.reservations])
+
+        self.assertEqual(len(few), len(many))
+
+    def test_check_in_validation(self):
+        for data in [
+            {"scans": []},
+            {"scans": [{"ticket": self.reservations[0].ticket}]},
+        ]:
+            with self.subTest(data=data):
+                response = self.client.post(self.endpoint, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(CHECK_IN_MAX_BATCH_SIZE=1):
+            response = self.client.post(
+                self.endpoint,
+                {"scans": [self._scan(r) for r in self.reservations[:2]]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_check_in_for_invalid_match(self):
+        response = self.client.post(
+            "/api/reservation/match/100/check-in/",
+            {"scans": [self._scan(self.reservations[0])]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_check_in_as_normal_user(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            self.endpoint, {"scans": [self._scan(self.reservations[0])]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CancelReservationViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.user_1 = User.objects.create_user(username="user_1")
+        self.user_2 = User.objects.create_user(username="user_2")
+        self.stadium = Stadium.objects.create(
+            name="some_stadium",
+            location="some_city",
+        )
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.seat = Seat.objects.create(
+            match=self.match,
+            seat_number=1,
+            is_reserved=True,
+        )
+        self.reservation = Reservation.objects.create(
+            user=self.user_1,
+            match=self.match,
+            seat=self.seat,
+        )
+
+        self.endpoint = f"/api/reservation/{self.reservation.id}/cancel/"
+
+    def test_successful_cancellation(self):
+        self.client.force_authenticate(user=self.user_1)
+
+        response = self.client.post(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Seat.objects.get(id=self.seat.id).is_reserved, False)
+        self.assertIsNotNone(
+            Reservation.objects.get(id=self.reservation.id).cancelled_at
+        )
+        self.assertTrue(
+            SeatEvent.objects.filter(
+                seat=self.seat, new_state=SeatEvent.State.AVAILABLE
+            ).exists()
+        )
+
+    def test_cancel_reservation_of_another_user(self):
+        self.client.force_authenticate(user=self.user_2)
+
+        response = self.client.post(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Seat.objects.get(id=self.seat.id).is_reserved, True)
+
+    def test_cancel_reservation_twice(self):
+        self.client.force_authenticate(user=self.user_1)
+
+        self.client.post(self.endpoint)
+        response = self.client.post(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ReleaseSeatsViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.super_user = User.objects.create_superuser(username="super_user")
+        self.normal_user = User.objects.create_user(username="normal_user")
+        self.stadium = Stadium.objects.create(
+            name="some_stadium",
+            location="some_city",
+        )
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        for seat_number in range(1, 11):
+            seat = Seat.objects.create(
+                match=self.match,
+                seat_number=seat_number,
+                is_reserved=True,
+            )
+            Reservation.objects.create(
+                user=self.normal_user,
+                match=self.match,
+                seat=seat,
+            )
+
+        self.endpoint = f"/api/reservation/match/{self.match.id}/release/"
+
+        self.client.force_authenticate(user=self.super_user)
+
+    def test_release_whole_match(self):
+        response = self.client.post(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("released_seats"), 10)
+        self.assertEqual(response.data.get("cancelled_reservations"), 10)
+        self.assertFalse(Seat.objects.filter(is_reserved=True).exists())
+        self.assertEqual(SeatEvent.objects.filter(match=self.match).count(), 10)
+
+    def test_release_in_background(self):
+        response = self.client.post(
+            self.endpoint, {"seat_from": 1, "seat_to": 4}, HTTP_PREFER="respond-async"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Seat.objects.filter(is_reserved=True).count(), 10)
+
+        Worker("test").run_once()
+        job = Job.objects.get(id=response.data["job"])
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.result, {"released_seats": 4, "cancelled_reservations": 4})
+        self.assertEqual(Seat.objects.filter(is_reserved=True).count(), 6)
+
+    def test_release_seat_range(self):
+        response = self.client.post(self.endpoint, {"seat_from": 3, "seat_to": 5})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("released_seats"), 3)
+        self.assertEqual(response.data.get("cancelled_reservations"), 3)
+        self.assertEqual(
+            Reservation.objects.filter(cancelled_at__isnull=True).count(), 7
+        )
+
+    def test_release_invalid_seat_range(self):
+        response = self.client.post(self.endpoint, {"seat_from": 5, "seat_to": 3})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_seats_of_invalid_match(self):
+        response = self.client.post("/api/reservation/match/100/release/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_release_seats_as_normal_user(self):
+        self.client.force_authenticate(user=self.normal_user)
+
+        response = self.client.post(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ArchiveMatchesTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        settings_override = override_settings(ARCHIVE_DIR=archive_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user_1 = User.objects.create_user(username="user_1")
+        self.user_2 = User.objects.create_user(username="user_2")
+        self.stadium = Stadium.objects.create(
+            name="some_stadium",
+            location="some_city",
+        )
+        self.past_match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.upcoming_match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day=timezone.localdate() + timedelta(days=7),
+            match_time="15:00:00",
+        )
+        for match in (self.past_match, self.upcoming_match):
+            for seat_number, user in ((1, self.user_1), (2, self.user_2)):
+                seat = Seat.objects.create(
+                    match=match, seat_number=seat_number, is_reserved=True
+                )
+                Reservation.objects.create(user=user, match=match, seat=seat)
+
+        self.endpoint = f"/api/reservation/archive/{self.past_match.id}/"
+
+    def test_archive_past_matches(self):
+        call_command("archive_matches", days=30, stdout=io.StringIO())
+
+        self.assertFalse(Seat.objects.filter(match=self.past_match).exists())
+        self.assertFalse(Reservation.objects.filter(match=self.past_match).exists())
+        self.assertEqual(Seat.objects.filter(match=self.upcoming_match).count(), 2)
+        self.assertIsNotNone(Match.objects.get(id=self.past_match.id).archived_at)
+
+    def test_read_archived_reservations(self):
+        call_command("archive_matches", days=30, stdout=io.StringIO())
+        self.client.force_authenticate(user=self.user_1)
+
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [reservation["seat_number"] for reservation in response.data], [1]
+        )
+
+    def test_read_not_archived_match(self):
+        self.client.force_authenticate(user=self.user_1)
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_dry_run(self):
+        call_command("archive_matches", days=30, dry_run=True, stdout=io.StringIO())
+        self.assertEqual(Seat.objects.filter(match=self.past_match).count(), 2)
+
+
+class ExportReservationsViewTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.super_user = User.objects.create_superuser(username="super_user")
+        self.normal_user = User.objects.create_user(username="normal_user")
+        self.stadium = Stadium.objects.create(
+            name="some_stadium",
+            location="some_city",
+        )
+        self.match = Match.objects.create(
+            stadium=self.stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        for seat_number in range(1, 4):
+            seat = Seat.objects.create(
+                match=self.match, seat_number=seat_number, is_reserved=True
+            )
+            Reservation.objects.create(
+                user=self.normal_user, match=self.match, seat=seat
+            )
+
+        self.endpoint = f"/api/reservation/match/{self.match.id}/export/"
+
+        self.client.force_authenticate(user=self.super_user)
+
+    def test_export_in_background(self):
+        response = self.client.get(
+            self.endpoint, {"output": "jsonl"}, HTTP_PREFER="respond-async"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_url = response.data["url"]
+        self.assertEqual(response["Location"], job_url)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            with override_settings(JOBS_OUTPUT_DIR=output_dir):
+                Worker("test").run_once()
+                job = self.client.get(job_url).data
+                self.assertEqual(job["status"], Job.Status.SUCCEEDED)
+                self.assertEqual(job["result"]["rows"], 3)
+                self.assertEqual((job["progress"], job["total"]), (3, 3))
+
+                response = self.client.get(job["download"])
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response["Content-Type"], "application/x-ndjson")
+                lines = b"".join(response.streaming_content).splitlines()
+                response.close()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["username"], "normal_user")
+
+    def test_export_csv(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[1].split(",")[2:4], ["normal_user", "1"])
+
+    def test_export_jsonl(self):
+        response = self.client.get(self.endpoint, {"output": "jsonl"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        records = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([record["seat_number"] for record in records], [1, 2, 3])
+
+    def test_export_invalid_format(self):
+        response = self.client.get(self.endpoint, {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_as_normal_user(self):
+        self.client.force_authenticate(user=self.normal_user)
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "export_reservations",
+            self.match.id,
+            export_format="jsonl",
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
+        self.assertIn("Exported 3 rows", stderr.getvalue())
+
+
+class ReservationAdminTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.admin = User.objects.create_superuser(username="admin")
+        self.client.force_login(self.admin)
+        self.endpoint = "/admin/reservation/reservation/"
+
+        stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        self.match = Match.objects.create(
+            stadium=stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        self.reservations = [
+            Reservation.objects.create(
+                user=self.admin,
+                match=self.match,
+                seat=Seat.objects.create(
+                    match=self.match, seat_number=number, is_reserved=True
+                ),
+            )
+            for number in range(1, 4)
+        ]
+
+    def test_changelist(self):
+        # One query for the rows with their user, match, stadium and seat.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sum('FROM "reservation_reservation"' in q["sql"] for q in queries), 2
+        )
+
+        Reservation.objects.create(
+            user=self.admin,
+            match=self.match,
+            seat=Seat.objects.create(match=self.match, seat_number=4),
+        )
+        with CaptureQueriesContext(connection) as more_queries:
+            self.client.get(self.endpoint)
+        self.assertEqual(len(more_queries), len(queries))
+
+    def test_release_seats_action(self):
+        self.client.post(
+            self.endpoint,
+            {
+                "action": "release_seats",
+                "_selected_action": [self.reservations[0].id],
+            },
+        )
+
+        self.assertEqual(Seat.objects.filter(is_reserved=True).count(), 2)
+        self.assertEqual(
+            Reservation.objects.filter(cancelled_at__isnull=False).count(), 1
+        )
+
+
+class BackfillPurchaseCountersMigrationTest(TransactionTestCase):
+    migrate_from = [("reservation", "0005_purchasecounter")]
+    migrate_to = [("reservation", "0006_backfill_purchase_counters")]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_active_reservations_are_counted(self):
+        apps = self._migrate(self.migrate_from)
+        user = apps.get_model("auth", "User").objects.create(username="user")
+        team_1, team_2 = apps.get_model("matches", "Team").objects.bulk_create(
+            [
+                apps.get_model("matches", "Team")(name="Team 1"),
+                apps.get_model("matches", "Team")(name="Team 2"),
+            ]
+        )
+        match = apps.get_model("matches", "Match").objects.create(
+            stadium=apps.get_model("stadiums", "Stadium").objects.create(
+                name="some_stadium", location="some_city"
+            ),
+            home_side=team_1,
+            away_side=team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        Seat = apps.get_model("matches", "Seat")
+        Reservation = apps.get_model("reservation", "Reservation")
+        for number in range(1, 4):
+            Reservation.objects.create(
+                user=user,
+                match=match,
+                seat=Seat.objects.create(match=match, seat_number=number),
+                cancelled_at=timezone.now() if number == 3 else None,
+            )
+
+        apps = self._migrate(self.migrate_to)
+
+        counter = apps.get_model("reservation", "PurchaseCounter").objects.get()
+        self.assertEqual(
+            (counter.user_id, counter.match_id, counter.seats), (user.id, match.id, 2)
+        )
@@ -1,7 +1,47 @@
 from django.urls import path
 
-from reservation.views import ReserveSeatView
+from reservation.views import (
+    ArchivedReservationsView,
+    CancelReservationView,
+    CheckInView,
+    ExportReservationsView,
+    ReleaseSeatsView,
+    ReserveSeatView,
+    SeasonReservationView,
+    TicketRevocationsView,
+)
 
 urlpatterns = [
     path("reserve/", ReserveSeatView.as_view(), name="reserve-seat"),
+    path("reserve/season/", SeasonReservationView.as_view(), name="reserve-season"),
+    path(
+        "<int:reservation_id>/cancel/",
+        CancelReservationView.as_view(),
+        name="cancel-reservation",
+    ),
+    path(
+        "match/<int:match_id>/release/",
+        ReleaseSeatsView.as_view(),
+        name="release-seats",
+    ),
+    path(
+        "match/<int:match_id>/export/",
+        ExportReservationsView.as_view(),
+        name="export-reservations",
+    ),
+    path(
+        "match/<int:match_id>/revocations/",
+        TicketRevocationsView.as_view(),
+        name="ticket-revocations",
+    ),
+    path(
+        "match/<int:match_id>/check-in/",
+        CheckInView.as_view(),
+        name="check-in",
+    ),
+    path(
+        "archive/<int:match_id>/",
+        ArchivedReservationsView.as_view(),
+        name="archived-reservations",
+    ),
 ]
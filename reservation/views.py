@@ -1,22 +1,64 @@
-from django.db import IntegrityError, transaction
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from jobs import facade as jobs_facade
+from jobs.views import accepted, prefers_async
 from matches import facade as matches_facade
-from matches.models import Match, Seat
+from matches.models import Seat, SeatEvent
+from matches.state import MatchState, get_match_state
+from monitoring import metrics
+from outbox import facade as outbox_facade
+from reservation import archive, export, tickets
+from reservation import facade as reservation_facade
+from reservation.export import EXPORT_FORMATS
 from reservation.models import Reservation
-from reservation.serializers import ReserveSeatSerializer
+from reservation.serializers import (
+    CheckInSerializer,
+    ExportReservationsSerializer,
+    ReleaseSeatsSerializer,
+    ReserveSeatSerializer,
+    SeasonReservationSerializer,
+    TicketRevocationsSerializer,
+)
+from ticketing.docs import no_body, openapi, swagger_auto_schema
+
+RESERVATIONS = metrics.counter(
+    "ticketing_reservations_total",
+    "Seat reservation attempts by outcome: succeeded, conflicted or rejected.",
+    ["outcome"],
+)
+CHECK_INS = metrics.counter(
+    "ticketing_check_ins_total",
+    "Ticket scans synced by gate scanners, by result.",
+    ["result"],
+)
+SEATS_SOLD = metrics.counter(
+    "ticketing_seats_sold_total",
+    "Seats reserved per match.",
+    ["match"],
+)
 
 
 class ReserveSeatView(APIView):
     """
     View for reserving a seat in a match.
 
+    The confirmation is written to the outbox in the transaction of the
+    reservation and sent by the `relay_outbox` command, see `outbox.facade`.
+
+    A user holds at most `RESERVATION_MAX_SEATS_PER_USER` seats per match, counted
+    in the same transaction, see `reservation.facade.claim_purchases`.
+
     ---
     # Permissions
     - User must be authenticated.
@@ -26,8 +68,11 @@ class ReserveSeatView(APIView):
     - `seat`: The seat number to be reserved.
 
     # Responses
-    - 201 Created: Successfully reserved the seat.
+    - 201 Created: Successfully reserved the seat. Returns the reservation ID and
+      its signed ticket token.
     - 400 Bad Request: Invalid request data or seat is reserved/not available.
+    - 403 Forbidden: The match is not on sale yet, its sales are closed, or the
+      user reached the purchase limit of the match.
     - 404 Not Found: Match not found.
     - 409 Conflict: Concurrent update detected. Please try again.
     """
@@ -47,6 +92,7 @@ class ReserveSeatView(APIView):
         responses={
             201: "Successfully reserved the seat.",
             400: "Bad Request. Invalid request data or seat is reserved/not available.",
+            403: "Forbidden. The match is not on sale, or the purchase limit is reached.",
             404: "Not Found. Match not found.",
             409: "Conflict. Concurrent update detected. Please try again.",
         },
@@ -68,62 +114,710 @@ class ReserveSeatView(APIView):
         if response:
             return response
 
-        seat, response = self._get_seat_or_error(serializer.validated_data["seat"])
+        seat, response = self._get_seat_or_error(
+            serializer.validated_data["seat"], match.id
+        )
         if response:
             return response
 
-        reservation = Reservation.objects.create(user=user, match=match, seat=seat)
-
-        try:
-            matches_facade.safe_reserve_seat_by_id(
-                id=seat.id,
-                updated_at=seat.updated_at,
-            )
-        except IntegrityError:
-            reservation.delete()
+        reserved = matches_facade.safe_reserve_seat_by_id(
+            id=seat.id,
+            updated_at=seat.updated_at,
+        )
+        if not reserved:
             return Response(
                 {"error": "Concurrent update detected. Please try again."},
                 status=status.HTTP_409_CONFLICT,
             )
 
+        if not reservation_facade.claim_purchases(user.id, match.id):
+            # Gives the seat claimed above back.
+            transaction.set_rollback(True)
+            return Response(
+                {
+                    "error": "Purchase limit reached: at most "
+                    f"{settings.RESERVATION_MAX_SEATS_PER_USER} seats per user "
+                    "for this match"
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        reservation = Reservation.objects.create(
+            user=user, match_id=match.id, seat=seat
+        )
+        matches_facade.record_seat_events(
+            match_id=match.id,
+            seat_ids=[seat.id],
+            old_state=SeatEvent.State.AVAILABLE,
+            new_state=SeatEvent.State.RESERVED,
+        )
+        ticket = reservation.ticket
+        # Confirmations are sent by the outbox relay, once this transaction commits.
+        outbox_facade.publish(
+            "reservation.confirmed",
+            str(reservation.id),
+            {
+                "reservation": reservation.id,
+                "match": match.id,
+                "seat": seat.id,
+                "seat_number": seat.seat_number,
+                "user": user.id,
+                "username": user.username,
+                "email": user.email,
+                "ticket": ticket,
+            },
+        )
+        SEATS_SOLD.inc(match=match.id)
+
         return Response(
-            {"message": "Successfully reserved the seat"},
+            {
+                "message": "Successfully reserved the seat",
+                "reservation": reservation.id,
+                "ticket": ticket,
+            },
             status=status.HTTP_201_CREATED,
         )
 
+    def finalize_response(self, request: Request, response: Response, *args, **kwargs):
+        """
+        Count the reservation attempt by the outcome of its response.
+
+        Validation errors and authentication failures are raised as exceptions, so
+        the outcome is only known once DRF turned them into a response.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param response: The response returned by the handler or exception handler.
+        :type response: Response
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == "POST":
+            if response.status_code == status.HTTP_201_CREATED:
+                RESERVATIONS.inc(outcome="succeeded")
+            elif response.status_code == status.HTTP_409_CONFLICT:
+                RESERVATIONS.inc(outcome="conflicted")
+            else:
+                RESERVATIONS.inc(outcome="rejected")
+        return response
+
     def _get_match_or_error(
         self, match_id: int
-    ) -> tuple[Match | None, Response | None]:
+    ) -> tuple[MatchState | None, Response | None]:
         """
-        Get a match by its ID or return a 404 response if not found.
+        Get the state of a match on sale, or the response rejecting the request.
+
+        The state comes from the per-process cache, so requests outside the sales
+        window are rejected without touching the database.
 
         :param match_id: The ID of the match.
         :type match_id: int
-        :return: A tuple containing the match and a 404 response or None.
-        :rtype: tuple[Match, Response]
+        :return: A tuple containing the match state and a 403/404 response or None.
+        :rtype: tuple[MatchState, Response]
         """
-        match = matches_facade.get_match_by_id(match_id)
+        match = get_match_state(match_id)
         if not match:
             return None, Response(
                 {"error": "Match not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        error = match.sale_error(timezone.now())
+        if error:
+            return None, Response({"error": error}, status=status.HTTP_403_FORBIDDEN)
+
         return match, None
 
-    def _get_seat_or_error(self, seat_id: int) -> tuple[Seat | None, Response | None]:
+    def _get_seat_or_error(
+        self, seat_id: int, match_id: int
+    ) -> tuple[Seat | None, Response | None]:
         """
-        Get an unreserved seat by its ID or return a 400 response if not available.
+        Get an unreserved seat of the match or return a 400 response if not available.
 
         :param seat_id: The ID of the seat.
         :type seat_id: int
+        :param match_id: The ID of the match the seat must belong to.
+        :type match_id: int
         :return: A tuple containing the seat and a 400 response or None.
         :rtype: tuple[Seat, Response]
         """
-        seat = matches_facade.get_unreserved_seat_by_id(seat_id)
+        seat = matches_facade.get_unreserved_seat_by_id(seat_id, match_id=match_id)
         if not seat:
             return None, Response(
                 {"error": "Seat is reserved or not available"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         return seat, None
+
+
+class SeasonReservationView(ReserveSeatView):
+    """
+    View for reserving the same seat in several matches, e.g. with a season pass.
+
+    The seat is looked up in every match with one query and claimed with one
+    conditional `UPDATE`. Each match counts towards the purchase limit of the user
+    in that match, with one `INSERT` and one conditional `UPDATE` for all of them.
+    The reservations, their seat events and their confirmations are each inserted
+    with one `INSERT`. It all runs in one transaction: either every match is
+    reserved, or none is.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+
+    # Request Body
+    - `seat_number`: The seat number to be reserved in every match.
+    - `matches`: The IDs of the matches. Every one of them must be on sale.
+    - `team`: Instead of `matches`, reserve the home matches of this team that are
+      on sale.
+    - `stadium`: With `team`, only its home matches at this stadium. Optional.
+
+    # Responses
+    - 201 Created: Successfully reserved the seat in every match. Returns the
+      reservation ID and signed ticket token per match.
+    - 400 Bad Request: Invalid request data, or the seat is reserved or not
+      available in some of the matches.
+    - 403 Forbidden: A match is not on sale, or the user reached the purchase limit
+      of a match.
+    - 404 Not Found: A match was not found, or the team has no home match on sale.
+    - 409 Conflict: Concurrent update detected. Please try again.
+    """
+
+    @transaction.atomic
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "seat_number": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "matches": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                ),
+                "team": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "stadium": openapi.Schema(type=openapi.TYPE_INTEGER),
+            },
+            required=["seat_number"],
+        ),
+        responses={
+            201: "Successfully reserved the seat in every match.",
+            400: "Bad Request. Invalid request data or seat is reserved/not available.",
+            403: "Forbidden. A match is not on sale, or a purchase limit is reached.",
+            404: "Not Found. Match not found, or no home match on sale.",
+            409: "Conflict. Concurrent update detected. Please try again.",
+        },
+    )
+    def post(self, request: Request):
+        """
+        Reserve a seat in several matches, all or none.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        serializer = SeasonReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        seat_number = serializer.validated_data["seat_number"]
+        user = request.user
+
+        match_ids, response = self._get_match_ids_or_error(serializer.validated_data)
+        if response:
+            return response
+
+        seat_ids = matches_facade.get_unreserved_seats_by_number(seat_number, match_ids)
+        unavailable = [match_id for match_id in match_ids if match_id not in seat_ids]
+        if unavailable:
+            return Response(
+                {
+                    "error": f"Seat {seat_number} is reserved or not available in "
+                    "matches " + ", ".join(map(str, unavailable))
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not matches_facade.safe_reserve_seats_by_id(list(seat_ids.values())):
+            transaction.set_rollback(True)
+            return Response(
+                {"error": "Concurrent update detected. Please try again."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if not reservation_facade.claim_purchases_in_matches(user.id, match_ids):
+            # Gives the seats claimed above back.
+            transaction.set_rollback(True)
+            return Response(
+                {
+                    "error": "Purchase limit reached: at most "
+                    f"{settings.RESERVATION_MAX_SEATS_PER_USER} seats per user "
+                    "in some of the matches"
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        reservations = Reservation.objects.bulk_create(
+            Reservation(user=user, match_id=match_id, seat_id=seat_ids[match_id])
+            for match_id in match_ids
+        )
+        matches_facade.record_seat_events_of_matches(
+            seats=seat_ids.items(),
+            old_state=SeatEvent.State.AVAILABLE,
+            new_state=SeatEvent.State.RESERVED,
+        )
+        tickets_by_id = {
+            reservation.id: reservation.ticket for reservation in reservations
+        }
+        outbox_facade.publish_many(
+            "reservation.confirmed",
+            (
+                (
+                    str(reservation.id),
+                    {
+                        "reservation": reservation.id,
+                        "match": reservation.match_id,
+                        "seat": reservation.seat_id,
+                        "seat_number": seat_number,
+                        "user": user.id,
+                        "username": user.username,
+                        "email": user.email,
+                        "ticket": tickets_by_id[reservation.id],
+                    },
+                )
+                for reservation in reservations
+            ),
+        )
+        for match_id in match_ids:
+            SEATS_SOLD.inc(match=match_id)
+
+        return Response(
+            {
+                "message": "Successfully reserved the seats",
+                "reservations": [
+                    {
+                        "match": reservation.match_id,
+                        "reservation": reservation.id,
+                        "ticket": tickets_by_id[reservation.id],
+                    }
+                    for reservation in reservations
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _get_match_ids_or_error(
+        self, data: dict
+    ) -> tuple[list[int] | None, Response | None]:
+        """
+        Get the IDs of the matches to reserve, or the response rejecting the request.
+
+        Given matches must all be on sale. The home matches of a team are those on
+        sale at the time of the request.
+
+        :param data: The validated request data.
+        :type data: dict
+        :return: A tuple containing the match IDs and a 403/404 response or None.
+        :rtype: tuple[list[int], Response]
+        """
+        if "matches" in data:
+            for match_id in data["matches"]:
+                _, response = self._get_match_or_error(match_id)
+                if response:
+                    return None, Response(
+                        {"error": f"Match {match_id}: {response.data['error']}"},
+                        status=response.status_code,
+                    )
+            return data["matches"], None
+
+        now = timezone.now()
+        match_ids = [
+            match_id
+            for match_id in matches_facade.get_home_match_ids(
+                data["team"], data.get("stadium")
+            )
+            # A match deleted meanwhile, or whose miss is still cached, has no state.
+            if (state := get_match_state(match_id)) is not None
+            and state.sale_error(now) is None
+        ]
+        if not match_ids:
+            return None, Response(
+                {"error": "No home match of the team is on sale"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return match_ids, None
+
+
+class CancelReservationView(APIView):
+    """
+    View for cancelling a reservation and returning its seat to sale.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - Users can only cancel their own reservations.
+
+    # Responses
+    - 200 OK: Successfully cancelled the reservation.
+    - 404 Not Found: Reservation not found or already cancelled.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=no_body,
+        responses={
+            200: "Successfully cancelled the reservation.",
+            404: "Not Found. Reservation not found or already cancelled.",
+        },
+    )
+    def post(self, request: Request, reservation_id: int):
+        """
+        Cancel a reservation of the current user.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param reservation_id: The ID of the reservation.
+        :type reservation_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        cancelled = reservation_facade.cancel_reservation(
+            reservation_id=reservation_id, user_id=request.user.id
+        )
+        if not cancelled:
+            return Response(
+                {"error": "Reservation not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {"message": "Successfully cancelled the reservation"},
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReleaseSeatsView(APIView):
+    """
+    View for releasing the reserved seats of a match in bulk.
+
+    Meant for rained-out or relocated matches: every reserved seat of the match,
+    or of the given seat range, is returned to sale and its reservation cancelled
+    in one transaction. With the `Prefer: respond-async` header, the seats are
+    released by a background job instead.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Request Body
+    - `seat_from`: The first seat number to release, inclusive. Optional.
+    - `seat_to`: The last seat number to release, inclusive. Optional.
+
+    # Responses
+    - 200 OK: The number of released seats and cancelled reservations.
+    - 202 Accepted: The job releasing the seats, whose result is the counts.
+    - 400 Bad Request: Invalid request data.
+    - 404 Not Found: Match not found.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        request_body=ReleaseSeatsSerializer,
+        responses={
+            200: "The number of released seats and cancelled reservations.",
+            202: "Accepted. The job releasing the seats.",
+            400: "Bad Request. Invalid request data.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def post(self, request: Request, match_id: int):
+        """
+        Release the reserved seats of a match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        serializer = ReleaseSeatsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if not matches_facade.get_match_by_id(match_id):
+            return Response(
+                {"error": "Match not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if prefers_async(request):
+            job = jobs_facade.enqueue(
+                "reservation.release_seats",
+                {"match_id": match_id, **serializer.validated_data},
+                user=request.user,
+            )
+            return accepted(job)
+
+        counts = reservation_facade.release_seats(
+            match_id=match_id, **serializer.validated_data
+        )
+        return Response(counts, status=status.HTTP_200_OK)
+
+
+class ArchivedReservationsView(APIView):
+    """
+    View for reading the user's tickets of an archived match.
+
+    Seats and reservations of past matches are moved out of the hot tables by the
+    `archive_matches` command; this view reads them back from the match archive.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+
+    # Responses
+    - 200 OK: The user's reservations of the match.
+    - 404 Not Found: Match not found or not archived.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: "The user's reservations of the match.",
+            404: "Not Found. Match not found or not archived.",
+        },
+    )
+    def get(self, request: Request, match_id: int):
+        """
+        List the archived reservations of the current user for a match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        match = matches_facade.get_match_by_id(match_id)
+        if not match or not match.archived_at:
+            return Response(
+                {"error": "Archived match not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        reservations = archive.iter_archived_reservations(
+            match_id=match.id, user_id=request.user.id
+        )
+        return Response(list(reservations), status=status.HTTP_200_OK)
+
+
+class ExportReservationsView(APIView):
+    """
+    View for exporting the attendee list of a match.
+
+    The response is streamed row by row straight from a database cursor, so a
+    match with tens of thousands of reservations is exported in constant memory.
+    With the `Prefer: respond-async` header, the export is written to a file by a
+    background job instead, downloaded from the job once it succeeded.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Query Parameters
+    - `output`: The export format, `csv` or `jsonl`. Defaults to `csv`.
+
+    # Responses
+    - 200 OK: The streamed export.
+    - 202 Accepted: The job writing the export.
+    - 400 Bad Request: Invalid query parameters.
+    - 404 Not Found: Match not found.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=ExportReservationsSerializer,
+        responses={
+            200: "The streamed export.",
+            202: "Accepted. The job writing the export.",
+            400: "Bad Request. Invalid query parameters.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def get(self, request: Request, match_id: int):
+        """
+        Stream the active reservations of a match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: StreamingHttpResponse | Response
+        """
+        serializer = ExportReservationsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        output = serializer.validated_data["output"]
+
+        if not matches_facade.get_match_by_id(match_id):
+            return Response(
+                {"error": "Match not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if prefers_async(request):
+            job = jobs_facade.enqueue(
+                "reservation.export",
+                {"match_id": match_id, "output": output},
+                user=request.user,
+            )
+            return accepted(job)
+
+        return StreamingHttpResponse(
+            export.iter_export(match_id, output),
+            content_type=EXPORT_FORMATS[output],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="match-{match_id}-reservations.{output}"'
+                )
+            },
+        )
+
+
+class TicketRevocationsView(APIView):
+    """
+    View for the data gate scanners need to verify the tickets of a match offline.
+
+    Scanners download the key of the match and the list of revoked tickets before
+    the gates open, then refresh the list with `since` set to the `generated_at`
+    of their previous download. Ticket tokens are verified with
+    `reservation.tickets.verify_ticket`, without contacting the server. The list
+    overlaps the previous one by `TICKET_REVOCATION_OVERLAP` seconds, so
+    cancellations committed while the previous list was generated are not missed.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Query Parameters
+    - `since`: Only list tickets revoked since this time. Optional.
+
+    # Responses
+    - 200 OK: The key of the match (hex), the IDs of the revoked reservations and
+      the time the list was generated.
+    - 400 Bad Request: Invalid query parameters.
+    - 404 Not Found: Match not found.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=TicketRevocationsSerializer,
+        responses={
+            200: "The key of the match and the revoked reservations.",
+            400: "Bad Request. Invalid query parameters.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def get(self, request: Request, match_id: int):
+        """
+        Get the key and the revoked tickets of a match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        serializer = TicketRevocationsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get("since")
+
+        if not matches_facade.get_match_by_id(match_id):
+            return Response(
+                {"error": "Match not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        generated_at = timezone.now()
+        if since is not None:
+            since -= timedelta(seconds=settings.TICKET_REVOCATION_OVERLAP)
+        revoked = reservation_facade.get_revoked_reservation_ids(match_id, since)
+        return Response(
+            {
+                "match": match_id,
+                "key": tickets.match_key(match_id).hex(),
+                "revoked": revoked,
+                "generated_at": generated_at,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class CheckInView(APIView):
+    """
+    View for checking in a batch of ticket scans synced by a gate scanner.
+
+    Scanners verify tickets offline and sync their scans in bursts. The whole batch
+    is checked in with a fixed number of queries, see
+    `reservation.facade.check_in`. A ticket already used, at another gate or
+    earlier in the batch, is reported as a duplicate with the gate and time of its
+    check-in.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+    - User must be an admin.
+
+    # Request Body
+    - `scans`: The scans, each with its `ticket`, `gate` and optional `scanned_at`.
+
+    # Responses
+    - 200 OK: One result per scan, in order: `checked_in`, `duplicate`, `revoked`
+      or `invalid`.
+    - 400 Bad Request: Invalid request data.
+    - 404 Not Found: Match not found.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        request_body=CheckInSerializer,
+        responses={
+            200: "One result per scan, in order.",
+            400: "Bad Request. Invalid request data.",
+            404: "Not Found. Match not found.",
+        },
+    )
+    def post(self, request: Request, match_id: int):
+        """
+        Check in the scans of a match.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param match_id: The ID of the match.
+        :type match_id: int
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        serializer = CheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if not get_match_state(match_id):
+            return Response(
+                {"error": "Match not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        results = reservation_facade.check_in(
+            match_id, serializer.validated_data["scans"]
+        )
+        for outcome, count in Counter(r["result"] for r in results).items():
+            CHECK_INS.inc(count, result=outcome)
+        return Response({"results": results}, status=status.HTTP_200_OK)
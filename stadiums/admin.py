@@ -2,4 +2,8 @@ from django.contrib import admin
 
 from stadiums.models import Stadium
 
-admin.site.register(Stadium)
+
+@admin.register(Stadium)
+class StadiumAdmin(admin.ModelAdmin):
+    list_display = ["id", "name", "location"]
+    search_fields = ["name", "location"]
@@ -1,8 +1,7 @@
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
 from stadiums.models import Stadium
+from ticketing.serializers import ValuesSerializer
 
 
 class StadiumSerializer(serializers.ModelSerializer):
@@ -42,3 +41,15 @@ class StadiumSerializer(serializers.ModelSerializer):
             )
 
         return data
+
+
+class StadiumListSerializer(ValuesSerializer):
+    """
+    Read-only fast-path serializer for stadium listings.
+
+    ---
+    # Fields
+    Same as `StadiumSerializer`.
+    """
+
+    fields = {"id": "id", "name": "name", "location": "location"}
@@ -61,3 +61,23 @@ class AddStadiumViewTest(APITestCase):
 
         response = self.client.post(self.endpoint, data=data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StadiumListViewTest(APITestCase):
+    def setUp(self):
+        self.endpoint = "/api/stadiums/"
+
+        self.user = User.objects.create_user(username="user")
+        Stadium.objects.create(name="stadium_2", location="some_city")
+        Stadium.objects.create(name="stadium_1", location="some_city")
+
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_stadiums(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [stadium["name"] for stadium in response.json()],
+            ["stadium_1", "stadium_2"],
+        )
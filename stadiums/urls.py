@@ -1,7 +1,8 @@
 from django.urls import path
 
-from stadiums.views import AddStadiumView
+from stadiums.views import AddStadiumView, StadiumListView
 
 urlpatterns = [
+    path("", StadiumListView.as_view(), name="stadium-list"),
     path("stadium/", AddStadiumView.as_view(), name="add-stadium"),
 ]
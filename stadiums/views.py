@@ -1,12 +1,13 @@
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from stadiums.serializers import StadiumSerializer
+from stadiums.models import Stadium
+from stadiums.serializers import StadiumListSerializer, StadiumSerializer
+from ticketing.docs import openapi, swagger_auto_schema
+from ticketing.renderers import FastJSONRenderer
 
 
 class AddStadiumView(APIView):
@@ -60,3 +61,36 @@ class AddStadiumView(APIView):
             data=serializer.data,
             status=status.HTTP_201_CREATED,
         )
+
+
+class StadiumListView(APIView):
+    """
+    View for listing the stadiums.
+
+    ---
+    # Permissions
+    - User must be authenticated.
+
+    # Responses
+    - 200 OK: The stadiums, ordered by name.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer]
+    serializer_class = StadiumListSerializer
+
+    @swagger_auto_schema(responses={200: StadiumSerializer(many=True)})
+    def get(self, request: Request):
+        """
+        List the stadiums.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :return: The HTTP response object.
+        :rtype: Response
+        """
+        stadiums = Stadium.objects.order_by("name", "location")
+        return Response(
+            data=self.serializer_class(stadiums).data,
+            status=status.HTTP_200_OK,
+        )
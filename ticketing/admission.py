@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from monitoring import metrics
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+ADMISSION_DECISIONS = metrics.counter(
+    "ticketing_admission_decisions_total",
+    "Requests admitted or rejected by the admission controller, by priority.",
+    ["priority", "decision"],
+)
+ADMISSION_LIMIT = metrics.gauge(
+    "ticketing_admission_limit",
+    "Concurrency limit of the admission controller, summed over workers.",
+)
+ADMISSION_IN_FLIGHT = metrics.gauge(
+    "ticketing_admission_in_flight",
+    "Requests admitted and being served.",
+)
+ADMISSION_OVERLOADED = metrics.gauge(
+    "ticketing_admission_overloaded",
+    "1 while any worker considers the database or the requests overloaded.",
+    mode="max",
+)
+ADMISSION_DB_LATENCY = metrics.gauge(
+    "ticketing_admission_db_latency_seconds",
+    "Moving average of the query latency, of the slowest worker.",
+    mode="max",
+)
+ADMISSION_REQUEST_LATENCY = metrics.gauge(
+    "ticketing_admission_request_latency_seconds",
+    "Moving average of the request latency, of the slowest worker.",
+    mode="max",
+)
+
+
+class MovingAverage:
+    """
+    Exponentially weighted moving average that forgets idle periods.
+
+    Without samples for `window` seconds the average resets, so when shedding
+    stopped the traffic it measured, the next request probes the current latency
+    instead of being rejected on stale data forever.
+    """
+
+    def __init__(self, alpha: float, window: float):
+        self.alpha = alpha
+        self.window = window
+        self._value = 0.0
+        self._updated = -math.inf
+
+    def add(self, sample: float, now: float):
+        if now - self._updated > self.window:
+            self._value = sample
+        else:
+            self._value += self.alpha * (sample - self._value)
+        self._updated = now
+
+    def value(self, now: float) -> float:
+        return self._value if now - self._updated <= self.window else 0.0
+
+
+class AdmissionController:
+    """
+    Adaptive admission control of a worker.
+
+    Two moving averages track the latency of database queries and of requests.
+    When either exceeds its target the worker is overloaded: low-priority requests
+    are rejected outright, and the concurrency limit is cut multiplicatively, at
+    most once per `decrease_interval`. While latency is on target, the limit grows
+    additively, by one per limit's worth of completed requests (AIMD). Requests
+    are admitted as long as fewer than the limit are in flight, and low-priority
+    ones only while fewer than `low_priority_share` of it are. Critical requests,
+    which complete purchases, are always admitted so capacity freed by shedding
+    goes to them.
+    """
+
+    decrease_factor = 0.9
+    decrease_interval = 0.1
+
+    def __init__(
+        self,
+        db_latency_target: float,
+        request_latency_target: float,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        low_priority_share: float,
+        alpha: float = 0.1,
+        window: float = 5.0,
+    ):
+        self.db_latency_target = db_latency_target
+        self.request_latency_target = request_latency_target
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.low_priority_share = low_priority_share
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.db_latency = MovingAverage(alpha, window)
+        self.request_latency = MovingAverage(alpha, window)
+        self._last_decrease = -math.inf
+        self._lock = threading.Lock()
+        ADMISSION_LIMIT.set(self.limit)
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            db_latency_target=settings.ADMISSION_DB_LATENCY_TARGET,
+            request_latency_target=settings.ADMISSION_REQUEST_LATENCY_TARGET,
+            initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+            min_limit=settings.ADMISSION_MIN_LIMIT,
+            max_limit=settings.ADMISSION_MAX_LIMIT,
+            low_priority_share=settings.ADMISSION_LOW_PRIORITY_SHARE,
+        )
+
+    def overloaded(self, now: float) -> bool:
+        return (
+            self.db_latency.value(now) > self.db_latency_target
+            or self.request_latency.value(now) > self.request_latency_target
+        )
+
+    def admit(self, priority: str) -> bool:
+        """
+        Decide on a request, and count it as in flight if admitted.
+
+        :param priority: `CRITICAL`, `NORMAL` or `LOW`.
+        :type priority: str
+        :return: Whether the request is admitted.
+        :rtype: bool
+        """
+        now = time.monotonic()
+        with self._lock:
+            if priority == CRITICAL:
+                admitted = True
+            elif priority == LOW:
+                admitted = (
+                    not self.overloaded(now)
+                    and self.in_flight < self.limit * self.low_priority_share
+                )
+            else:
+                admitted = self.in_flight < self.limit
+            if admitted:
+                self.in_flight += 1
+
+        ADMISSION_DECISIONS.inc(
+            priority=priority, decision="admitted" if admitted else "rejected"
+        )
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        return admitted
+
+    def release(self, duration: float):
+        """
+        Record the completion of an admitted request and adapt the limit.
+
+        :param duration: The time the request took, in seconds.
+        :type duration: float
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            self.request_latency.add(duration, now)
+            overloaded = self.overloaded(now)
+            if overloaded:
+                if now - self._last_decrease >= self.decrease_interval:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_LIMIT.set(self.limit)
+        ADMISSION_OVERLOADED.set(int(overloaded))
+        ADMISSION_REQUEST_LATENCY.set(self.request_latency.value(now))
+        ADMISSION_DB_LATENCY.set(self.db_latency.value(now))
+
+    def observe_query(self, duration: float):
+        with self._lock:
+            self.db_latency.add(duration, time.monotonic())
+
+
+class QueryLatency:
+    """
+    Database execute wrapper feeding query latencies to an admission controller.
+    """
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.controller.observe_query(time.perf_counter() - started)
+
+
+def install_query_latency(controller: AdmissionController):
+    """
+    Make every database connection feed its query latencies to `controller`.
+
+    :param controller: The admission controller.
+    :type controller: AdmissionController
+    :return: The `connection_created` receiver, kept alive by the caller since
+        signals only hold weak references.
+    :rtype: Callable
+    """
+    wrapper = QueryLatency(controller)
+
+    def receiver(sender, connection: BaseDatabaseWrapper, **kwargs):
+        # Replace the wrapper of a previous controller. Like `DatabaseMetrics`, the
+        # wrapper goes first, as `execute_wrapper()` blocks remove the last one.
+        wrappers = connection.execute_wrappers
+        for index in reversed(range(len(wrappers))):
+            if isinstance(wrappers[index], QueryLatency):
+                del wrappers[index]
+        wrappers.insert(0, wrapper)
+
+    return receiver
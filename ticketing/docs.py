@@ -0,0 +1,34 @@
+"""
+API documentation decorators, loaded only when the documentation is enabled.
+
+Views import `openapi`, `swagger_auto_schema` and `no_body` from here rather than
+from drf_yasg. With `ENABLE_DOCS` turned off they are inert stand-ins, so API-only
+workers never import drf_yasg, whose import alone pulls in `pkg_resources` and
+adds tens of milliseconds to every cold start.
+"""
+
+from django.conf import settings
+
+if settings.ENABLE_DOCS:
+    from drf_yasg import openapi
+    from drf_yasg.utils import no_body, swagger_auto_schema
+else:
+
+    def _inert(*args, **kwargs):
+        return None
+
+    class _InertOpenAPI:
+        """
+        Stand-in for `drf_yasg.openapi` whose every attribute is inert.
+        """
+
+        def __getattr__(self, name):
+            return _inert
+
+    def swagger_auto_schema(*args, **kwargs):
+        return lambda view_method: view_method
+
+    openapi = _InertOpenAPI()
+    no_body = None
+
+__all__ = ["no_body", "openapi", "swagger_auto_schema"]
@@ -0,0 +1,21 @@
+from django.urls import path, re_path
+
+from ticketing.schema import CachedSchemaView
+
+urlpatterns = [
+    re_path(
+        r"^swagger(?P<format>\.json|\.yaml)$",
+        CachedSchemaView.without_ui(cache_timeout=0),
+        name="schema-json",
+    ),
+    path(
+        "swagger/",
+        CachedSchemaView.with_ui("swagger", cache_timeout=0),
+        name="schema-swagger-ui",
+    ),
+    path(
+        "redoc/",
+        CachedSchemaView.with_ui("redoc", cache_timeout=0),
+        name="schema-redoc",
+    ),
+]
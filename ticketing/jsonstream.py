@@ -0,0 +1,195 @@
+import codecs
+import json
+import re
+from collections.abc import Iterator
+from typing import BinaryIO
+
+CHUNK_SIZE = 64 * 1024
+
+# Chunks a single value may span before it is rejected as too large.
+MAX_VALUE_CHUNKS = 4
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONStreamError(ValueError):
+    """
+    Raised when a JSON or NDJSON stream is malformed.
+    """
+
+
+class JSONStreamReader:
+    """
+    Read JSON values one at a time from a binary stream.
+
+    Only the unread part of the current chunk is buffered, so memory is bounded by
+    the chunk size and the largest single value, never by the size of the stream.
+    Values are decoded by the standard library's `raw_decode`, again from their
+    start each time a chunk is appended, so a value may span at most
+    `max_value_size` characters: malformed input is rejected once that much is
+    buffered, instead of buffering the rest of the stream and decoding it over and
+    over. `peak_size` is the most characters buffered at once.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        max_value_size: int | None = None,
+    ):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size or MAX_VALUE_CHUNKS * chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.peak_size = 0
+
+    def fill(self) -> bool:
+        """
+        Append the next chunk of the stream to the buffer.
+
+        :return: Whether there was anything left to read.
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        self.eof = not data
+        text = self.decoder.decode(data, final=self.eof)
+        self.buffer = self.buffer[self.position :] + text
+        self.position = 0
+        self.peak_size = max(self.peak_size, len(self.buffer))
+        return not self.eof
+
+    def peek(self) -> str:
+        """
+        Skip whitespace.
+
+        :return: The next character, or an empty string at the end of the stream.
+        :rtype: str
+        """
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position : self.position + 1]
+
+    def expect(self, character: str):
+        if self.peek() != character:
+            raise JSONStreamError(f"Expected {character!r} at {self.describe()}")
+        self.position += 1
+
+    def value(self):
+        """
+        :return: The next JSON value.
+        :raises JSONStreamError: If the next value is malformed or too large.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as exc:
+                if not self.fill_value():
+                    raise JSONStreamError(f"{exc.msg} at {self.describe()}") from exc
+                continue
+            # A number at the end of the buffer may go on in the next chunk.
+            if end == len(self.buffer) and self.fill_value():
+                continue
+            self.position = end
+            return value
+
+    def fill_value(self) -> bool:
+        """
+        Append the next chunk to the buffer for the value being decoded.
+
+        :raises JSONStreamError: If the value already spans `max_value_size`.
+        :return: Whether there was anything left to read.
+        :rtype: bool
+        """
+        if len(self.buffer) - self.position >= self.max_value_size:
+            raise JSONStreamError(
+                f"Value longer than {self.max_value_size} characters at "
+                f"{self.describe()}"
+            )
+        return self.fill()
+
+    def array(self) -> Iterator:
+        """
+        Iterate over the items of the next value, which must be an array.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.position += 1
+                return
+            self.expect(",")
+
+    def describe(self) -> str:
+        snippet = self.buffer[self.position : self.position + 20]
+        return f"{snippet!r}" if snippet else "the end of the stream"
+
+
+def iter_json_array(
+    stream: BinaryIO | JSONStreamReader, key: str | None = None
+) -> Iterator:
+    """
+    Stream the items of a JSON array.
+
+    The document is either the array itself or an object holding it under `key`.
+    The other members of the object are read and dropped.
+
+    :param stream: The binary stream, such as a request, or a reader of it.
+    :type stream: BinaryIO | JSONStreamReader
+    :param key: The member of a top-level object holding the array.
+    :type key: str | None
+    :raises JSONStreamError: If the document is malformed.
+    :return: An iterator over the items of the array.
+    :rtype: Iterator
+    """
+    reader = _get_reader(stream)
+    if reader.peek() == "[":
+        yield from reader.array()
+    elif key is not None and reader.peek() == "{":
+        reader.position += 1
+        while reader.peek() != "}":
+            name = reader.value()
+            if not isinstance(name, str):
+                raise JSONStreamError(f"Expected a member name, got {name!r}")
+            reader.expect(":")
+            if name == key:
+                yield from reader.array()
+            else:
+                reader.value()
+            if reader.peek() != "}":
+                reader.expect(",")
+        reader.position += 1
+    else:
+        raise JSONStreamError(f"Expected an array at {reader.describe()}")
+
+    if reader.peek():
+        raise JSONStreamError(f"Extra data at {reader.describe()}")
+
+
+def iter_ndjson(stream: BinaryIO | JSONStreamReader) -> Iterator:
+    """
+    Stream the values of a newline-delimited JSON document.
+
+    :param stream: The binary stream, such as a request, or a reader of it.
+    :type stream: BinaryIO | JSONStreamReader
+    :raises JSONStreamError: If a value is malformed.
+    :return: An iterator over the values, one per line.
+    :rtype: Iterator
+    """
+    reader = _get_reader(stream)
+    while reader.peek():
+        yield reader.value()
+
+
+def _get_reader(stream: BinaryIO | JSONStreamReader) -> JSONStreamReader:
+    return stream if isinstance(stream, JSONStreamReader) else JSONStreamReader(stream)
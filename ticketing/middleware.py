@@ -0,0 +1,179 @@
+import gzip
+import re
+import time
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+
+from ticketing import admission
+from ticketing.admission import AdmissionController, install_query_latency
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+_accepts_gzip = re.compile(r"\bgzip\b").search
+_accepts_brotli = re.compile(r"\bbr\b").search
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses with brotli or gzip.
+
+    Unlike Django's `GZipMiddleware`, only the content types listed in
+    `COMPRESSION_CONTENT_TYPES` (JSON, JSON Lines, CSV and the seat map formats by
+    default) are compressed, so HTML pages carrying CSRF tokens are left alone, and
+    responses smaller than `COMPRESSION_MIN_SIZE` bytes are not worth the CPU time.
+    Brotli is preferred when the client accepts it and the `brotli` package is
+    installed. Streaming responses, such as exports, are compressed as they stream.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.content_types = tuple(
+            getattr(settings, "COMPRESSION_CONTENT_TYPES", ("application/json",))
+        )
+        self.gzip_level = getattr(settings, "COMPRESSION_GZIP_LEVEL", 6)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if response.has_header("Content-Encoding") or not content_type.startswith(
+            self.content_types
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accept_encoding = request.headers.get("Accept-Encoding", "")
+        if brotli is not None and _accepts_brotli(accept_encoding):
+            encoding = "br"
+        elif _accepts_gzip(accept_encoding):
+            encoding = "gzip"
+        else:
+            return response
+
+        if response.streaming:
+            if response.is_async:  # pragma: no cover - no async views
+                return response
+            response.streaming_content = self._compress_sequence(
+                response.streaming_content, encoding
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressed = self._compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed body is no longer byte-for-byte the entity the ETag
+        # was computed for.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _compress(self, content: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(content, quality=self.brotli_quality)
+        return gzip.compress(content, compresslevel=self.gzip_level, mtime=0)
+
+    def _compress_sequence(self, sequence, encoding: str):
+        # Compressed data is yielded whenever the compressor emits a block, not per
+        # chunk: exports stream one row per chunk, and flushing after each of them
+        # would ruin the compression ratio.
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, wbits=16 + zlib.MAX_WBITS)
+            compress, finish = compressor.compress, compressor.flush
+
+        for chunk in sequence:
+            data = compress(chunk)
+            if data:
+                yield data
+        yield finish()
+
+
+class AdmissionMiddleware:
+    """
+    Shed low-priority traffic when the database or the requests slow down.
+
+    Requests are classified by the URL name of their view: the views listed in
+    `ADMISSION_CRITICAL_VIEWS` complete purchases and are always admitted, the ones
+    in `ADMISSION_LOW_PRIORITY_VIEWS` (listings, docs, sign-up) are the first to be
+    rejected, and every other view is admitted up to the concurrency limit. The
+    decisions are taken by an `AdmissionController`, see `ticketing.admission`.
+    Rejected requests get a 503 with `Retry-After: ADMISSION_RETRY_AFTER`. A
+    streaming response, such as an export, holds its slot until the server closes
+    it, so its latency includes sending the body.
+
+    With `ADMISSION_ENABLED` off, the middleware removes itself from the chain.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ADMISSION_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.controller = AdmissionController.from_settings()
+        self.critical_views = set(settings.ADMISSION_CRITICAL_VIEWS)
+        self.low_priority_views = set(settings.ADMISSION_LOW_PRIORITY_VIEWS)
+        self.retry_after = settings.ADMISSION_RETRY_AFTER
+
+        # Signals only hold weak references to their receivers.
+        self._receiver = install_query_latency(self.controller)
+        connection_created.connect(self._receiver)
+        for connection in connections.all(initialized_only=True):
+            self._receiver(sender=None, connection=connection)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        started = getattr(request, "_admitted_at", None)
+        if started is None:
+            return response
+
+        if response.streaming:
+            close = response.close
+
+            def close_and_release():
+                try:
+                    close()
+                finally:
+                    self.controller.release(time.perf_counter() - started)
+
+            response.close = close_and_release
+        else:
+            self.controller.release(time.perf_counter() - started)
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        view = request.resolver_match.view_name
+        if view in self.critical_views:
+            priority = admission.CRITICAL
+        elif view in self.low_priority_views:
+            priority = admission.LOW
+        else:
+            priority = admission.NORMAL
+
+        if not self.controller.admit(priority):
+            return JsonResponse(
+                {"error": "Service is overloaded. Please retry later."},
+                status=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        request._admitted_at = time.perf_counter()
+        return None
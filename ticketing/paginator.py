@@ -0,0 +1,66 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts every row of a large table.
+
+    An exact `COUNT(*)` reads the whole table or index, which takes seconds once a
+    table holds millions of seats or reservations and is repeated for every
+    changelist page. For an unfiltered queryset the row count is read from the
+    planner statistics instead, as long as they report more than
+    `exact_count_limit` rows. A filtered queryset is counted up to
+    `exact_count_limit` rows only, so narrowing filters are still exact while broad
+    ones stop at the limit.
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.exact_count_limit:
+                return estimate
+
+        return queryset.order_by()[: self.exact_count_limit].count()
+
+
+def estimate_row_count(model, using: str = "default") -> int | None:
+    """
+    Read a table's row count from the database statistics.
+
+    The statistics are maintained by autovacuum on PostgreSQL and by `ANALYZE` on
+    SQLite, and are only as fresh as their last run.
+
+    :param model: The model whose table is estimated.
+    :type model: type[Model]
+    :param using: The database alias.
+    :type using: str
+    :return: The estimated row count, or None if the database has no statistics.
+    :rtype: int | None
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+    elif connection.vendor == "sqlite":
+        # The first number of any `sqlite_stat1` row of a table is its row count.
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    else:
+        return None
+
+    try:
+        with transaction.atomic(using), connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # SQLite creates `sqlite_stat1` on the first `ANALYZE`.
+        return None
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
@@ -0,0 +1,99 @@
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.request import Request
+
+SchemaView = get_schema_view(
+    openapi.Info(
+        title="Volleyball Ticketing API",
+        default_version="v1",
+        description="Volleyball Ticketing API description",
+    ),
+    public=True,
+    permission_classes=(
+        permissions.AllowAny,
+        permissions.IsAuthenticated,
+        permissions.IsAdminUser,
+    ),
+)
+
+
+class CachedSchemaView(SchemaView):
+    """
+    Schema view that generates the OpenAPI document at most once per process.
+
+    Generating the schema walks every view and `swagger_auto_schema` decorator,
+    which is far too expensive to repeat for every hit of monitoring probes and
+    developer tools. The rendered document is kept in memory per format, version
+    and scheme, and served with an `ETag` so clients can revalidate for free. It
+    leaves out the host, which clients take from the URL they fetched it from, so
+    the `Host` header of one request never ends up in the document served to
+    others. If `OPENAPI_SCHEMA_FILE` is set to an artifact written at deploy time
+    by `generate_swagger`, it is served for the JSON formats instead of generating
+    anything at all.
+
+    The schema only changes with the code, and every deploy starts new processes,
+    so the cache never needs to be invalidated while a process is running.
+    """
+
+    _cache: dict[tuple, tuple[bytes, str]] = {}
+
+    def get(self, request: Request, version: str = "", format: str | None = None):
+        renderer = request.accepted_renderer
+        if not isinstance(
+            renderer, (OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer)
+        ):
+            # The UI pages are rendered from an empty schema and fetch the
+            # document itself through `?format=openapi`.
+            return super().get(request, version, format)
+
+        version = request.version or version or ""
+        key = (renderer.format, version, request.scheme)
+        cached = self._cache.get(key)
+        if cached is None:
+            content = self._render(request, version, renderer)
+            etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+            cached = self._cache[key] = (content, etag)
+
+        content, etag = cached
+        # Compressed responses carry the weak form of the ETag.
+        if request.headers.get("If-None-Match", "").removeprefix("W/") == etag:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        return HttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+            headers={"ETag": etag},
+        )
+
+    def _render(self, request: Request, version: str, renderer) -> bytes:
+        """
+        Load the schema artifact or generate and render the schema.
+
+        :param request: The HTTP request object.
+        :type request: Request
+        :param version: The API version.
+        :type version: str
+        :param renderer: The accepted spec renderer.
+        :type renderer: drf_yasg.renderers._SpecRenderer
+        :return: The rendered schema.
+        :rtype: bytes
+        """
+        artifact = settings.OPENAPI_SCHEMA_FILE
+        if (
+            artifact
+            and renderer.codec_class is OpenAPICodecJson
+            and Path(artifact).exists()
+        ):
+            return Path(artifact).read_bytes()
+
+        schema = super().get(request, version).data
+        schema.pop("host", None)
+        return renderer.render(schema, renderer.media_type, self.get_renderer_context())
@@ -0,0 +1,29 @@
+from django.db.models import QuerySet
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer building plain dicts straight from `.values_list()` rows.
+
+    `ModelSerializer` instantiates a model and runs every field's
+    `to_representation` for each row, which dominates the response time of large
+    listings. Subclasses of this class only declare `fields`, a mapping of output
+    keys to ORM lookups, and rows are zipped into dicts without any per-field work.
+    Values the JSON renderer understands natively (dates, times, decimals) are left
+    as they are.
+
+    ---
+    # Usage
+    - `MySerializer(queryset).data` returns a list of dicts.
+    """
+
+    fields: dict[str, str] = {}
+
+    def __init__(self, queryset: QuerySet):
+        self.queryset = queryset
+
+    @property
+    def data(self) -> list[dict]:
+        keys = tuple(self.fields)
+        rows = self.queryset.values_list(*self.fields.values())
+        return [dict(zip(keys, row)) for row in rows]
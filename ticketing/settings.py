@@ -27,6 +27,12 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Serve the Django admin, the API documentation and the metrics. Turned off for
+# API-only workers by the production settings, see `ticketing.settings_production`.
+ENABLE_ADMIN = True
+ENABLE_DOCS = True
+ENABLE_METRICS = True
+
 
 # Application definition
 
@@ -46,9 +52,16 @@ INSTALLED_APPS = [
     "stadiums",
     "matches",
     "reservation",
+    "jobs",
+    "outbox",
+    "benchmarks",
+    "monitoring",
 ]
 
 MIDDLEWARE = [
+    "monitoring.metrics.MetricsMiddleware",
+    "ticketing.middleware.CompressionMiddleware",
+    "ticketing.middleware.AdmissionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,6 +69,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "monitoring.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "ticketing.urls"
@@ -84,8 +98,11 @@ WSGI_APPLICATION = "ticketing.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # SQLite, with transactions waiting for the write lock, see
+        # `ticketing.sqlite3.base`.
+        "ENGINE": "ticketing.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {"timeout": 20},
     }
 }
 
@@ -140,3 +157,136 @@ SWAGGER_SETTINGS = {
         "Basic": {"type": "basic"},
     },
 }
+
+# Directory holding the compressed per-match archives written by `archive_matches`.
+ARCHIVE_DIR = BASE_DIR / "archive"
+
+# Pre-generated OpenAPI document served by the schema views instead of generating
+# one, when set and the file exists. Write it at deploy time with
+# `python manage.py generate_swagger -o openapi.json`.
+OPENAPI_SCHEMA_FILE = None
+
+# Request profiling, see `monitoring.profiling.ProfilingMiddleware`. Requests are
+# profiled at `PROFILING_SAMPLE_RATE` (0 to 1) or when they carry `PROFILING_TOKEN`
+# in the `X-Profile-Token` header. With neither set the middleware is not loaded.
+PROFILING_SAMPLE_RATE = 0
+PROFILING_TOKEN = None
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_MAX_FILES = 200
+
+# Metrics exposed on `/metrics`, see `monitoring.metrics`. Multi-process servers set
+# `METRICS_DIR` to a directory shared by their workers, emptied on every restart.
+# When `METRICS_TOKEN` is set, scrapers must send it as a bearer token.
+METRICS_DIR = None
+METRICS_TOKEN = None
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Renderers of the API. `FastJSONRenderer` falls back to DRF's `JSONRenderer` when
+# orjson is not installed.
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "ticketing.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Response compression, see `ticketing.middleware.CompressionMiddleware`. Brotli is
+# used when the `brotli` package is installed and the client accepts it.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = [
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.ticketing.",
+    "text/csv",
+]
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Load shedding, see `ticketing.middleware.AdmissionMiddleware`. Latency targets are
+# moving averages in seconds, of single queries and of whole requests.
+ADMISSION_ENABLED = True
+ADMISSION_DB_LATENCY_TARGET = 0.1
+ADMISSION_REQUEST_LATENCY_TARGET = 1.0
+ADMISSION_INITIAL_LIMIT = 100
+ADMISSION_MIN_LIMIT = 10
+ADMISSION_MAX_LIMIT = 1000
+ADMISSION_LOW_PRIORITY_SHARE = 0.5
+ADMISSION_RETRY_AFTER = 5
+ADMISSION_CRITICAL_VIEWS = [
+    "reserve-seat",
+    "reserve-season",
+    "cancel-reservation",
+    "check-in",
+    "sign_in",
+]
+ADMISSION_LOW_PRIORITY_VIEWS = [
+    "match-list",
+    "stadium-list",
+    "sign_up",
+    "schema-json",
+    "schema-swagger-ui",
+    "schema-redoc",
+]
+
+# Per-process cache of the sales window of matches, see `matches.state`. Changes made
+# by other processes are seen after `MATCH_STATE_CACHE_TTL` seconds.
+MATCH_STATE_CACHE_TTL = 5.0
+MATCH_STATE_CACHE_SIZE = 10000
+
+# Seat maps of upcoming matches, see `matches.seatmap`. Snapshots are brought up to
+# date from the seat events on every read and kept for `SEAT_MAP_CACHE_TIMEOUT`
+# seconds, which bounds how long an event committed out of ID order can be missed
+# on databases that do not serialize commits. `prewarm_seat_maps` caches the
+# matches going on sale within `SEAT_MAP_PREWARM_WINDOW` seconds; run it more
+# often than the timeout. The local memory cache is per process; the production
+# settings share one between the workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "seat_maps": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "seat-maps",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+SEAT_MAP_CACHE = "seat_maps"
+SEAT_MAP_CACHE_TIMEOUT = 600
+SEAT_MAP_PREWARM_WINDOW = 3600
+
+# Signed ticket tokens, see `reservation.tickets`. Keys are derived per match from
+# `TICKET_SIGNING_KEY`, or from `SECRET_KEY` when it is not set. Revocation lists
+# overlap the previous download by `TICKET_REVOCATION_OVERLAP` seconds.
+TICKET_SIGNING_KEY = None
+TICKET_REVOCATION_OVERLAP = 60
+
+# Largest batch of ticket scans accepted by the check-in endpoint.
+CHECK_IN_MAX_BATCH_SIZE = 1000
+
+# Most seats a user may hold in a match, counted by `reservation.models.PurchaseCounter`.
+# `None` lifts the cap.
+RESERVATION_MAX_SEATS_PER_USER = 4
+
+# Background jobs run by `python manage.py run_jobs`, see `jobs.facade`. A running job
+# whose heartbeat is older than `JOBS_STALE_AFTER` seconds is failed. Files written by
+# jobs go to `JOBS_OUTPUT_DIR`.
+JOBS_HEARTBEAT_INTERVAL = 5.0
+JOBS_STALE_AFTER = 60
+JOBS_POLL_INTERVAL = 1.0
+JOBS_OUTPUT_DIR = BASE_DIR / "job_output"
+
+# Transactional outbox drained by `python manage.py relay_outbox`, see `outbox.facade`.
+# Sinks are built from `BACKEND` with `OPTIONS` as keyword arguments. Failed deliveries
+# are retried with exponential backoff from `OUTBOX_RETRY_BASE_DELAY` up to
+# `OUTBOX_RETRY_MAX_DELAY` seconds, `OUTBOX_MAX_ATTEMPTS` times. Delivered messages
+# are deleted after `OUTBOX_RETENTION` seconds.
+OUTBOX_SINKS = {
+    "console": {"BACKEND": "outbox.sinks.ConsoleSink"},
+}
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_POLL_INTERVAL = 1.0
+OUTBOX_LEASE = 60
+OUTBOX_RETRY_BASE_DELAY = 1.0
+OUTBOX_RETRY_MAX_DELAY = 600
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION = 7 * 24 * 3600
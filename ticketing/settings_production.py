@@ -0,0 +1,126 @@
+"""
+Production settings for ticketing project.
+
+Use them with `DJANGO_SETTINGS_MODULE=ticketing.settings_production`. By default
+they describe a lean, API-only worker: no admin, no API documentation, no
+sessions, messages or templates, and token authentication only. Pods that should
+serve the admin or the documentation opt back in with environment variables:
+
+- `DJANGO_SECRET_KEY`: required.
+- `DJANGO_ALLOWED_HOSTS`: comma separated host names.
+- `TICKETING_ENABLE_ADMIN`: set to `1` to serve the Django admin.
+- `TICKETING_ENABLE_DOCS`: set to `1` to serve the Swagger and ReDoc docs.
+- `TICKETING_OPENAPI_SCHEMA_FILE`: OpenAPI document written at deploy time by
+  `generate_swagger`, served instead of generating one.
+- `TICKETING_PROFILING_SAMPLE_RATE`: share of requests to profile, 0 by default.
+- `TICKETING_PROFILING_TOKEN`: profile requests carrying it in `X-Profile-Token`.
+- `TICKETING_ENABLE_METRICS`: set to `1` to serve `/metrics`.
+- `TICKETING_METRICS_TOKEN`: bearer token scrapers must send to read `/metrics`.
+- `TICKETING_METRICS_DIR`: directory the workers aggregate their metrics in.
+- `TICKETING_TICKET_SIGNING_KEY`: key the ticket tokens are signed with, so that
+  rotating `DJANGO_SECRET_KEY` does not invalidate the tickets already issued.
+- `TICKETING_JOBS_OUTPUT_DIR`: directory the `run_jobs` workers write exports to,
+  shared with the pods serving the API.
+- `TICKETING_SEAT_MAP_CACHE_URL`: Redis URL of the seat map cache shared by the
+  workers, so that `prewarm_seat_maps` warms all of them. Needs the `redis`
+  package.
+"""
+
+import os
+
+from ticketing.settings import *  # noqa: F401,F403
+from ticketing.settings import (
+    CACHES,
+    INSTALLED_APPS,
+    JOBS_OUTPUT_DIR,
+    MIDDLEWARE,
+    TEMPLATES,
+)
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
+
+ENABLE_ADMIN = _env_flag("TICKETING_ENABLE_ADMIN")
+ENABLE_DOCS = _env_flag("TICKETING_ENABLE_DOCS")
+OPENAPI_SCHEMA_FILE = os.environ.get("TICKETING_OPENAPI_SCHEMA_FILE") or None
+
+PROFILING_SAMPLE_RATE = float(os.environ.get("TICKETING_PROFILING_SAMPLE_RATE", 0))
+PROFILING_TOKEN = os.environ.get("TICKETING_PROFILING_TOKEN") or None
+
+ENABLE_METRICS = _env_flag("TICKETING_ENABLE_METRICS")
+METRICS_TOKEN = os.environ.get("TICKETING_METRICS_TOKEN") or None
+METRICS_DIR = os.environ.get("TICKETING_METRICS_DIR") or None
+
+TICKET_SIGNING_KEY = os.environ.get("TICKETING_TICKET_SIGNING_KEY") or None
+
+JOBS_OUTPUT_DIR = os.environ.get("TICKETING_JOBS_OUTPUT_DIR") or JOBS_OUTPUT_DIR
+
+if os.environ.get("TICKETING_SEAT_MAP_CACHE_URL"):
+    CACHES = {
+        **CACHES,
+        "seat_maps": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["TICKETING_SEAT_MAP_CACHE_URL"],
+        },
+    }
+
+_excluded_apps = set()
+_excluded_middleware = set()
+
+if not ENABLE_ADMIN:
+    # Every API endpoint authenticates with tokens, only the admin needs the
+    # browser machinery of sessions, CSRF cookies and messages.
+    _excluded_apps |= {
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+    }
+    _excluded_middleware |= {
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    }
+
+if not ENABLE_DOCS:
+    _excluded_apps.add("drf_yasg")
+
+if not (ENABLE_ADMIN or ENABLE_DOCS):
+    _excluded_apps.add("django.contrib.staticfiles")
+    TEMPLATES = []
+elif not ENABLE_ADMIN:
+    TEMPLATES = [
+        {
+            **TEMPLATES[0],
+            "OPTIONS": {
+                "context_processors": [
+                    "django.template.context_processors.request",
+                ],
+            },
+        }
+    ]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _excluded_apps]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE if middleware not in _excluded_middleware
+]
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.TokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "ticketing.renderers.FastJSONRenderer",
+    ],
+}
@@ -0,0 +1,16 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions take the write lock when they begin.
+
+    With several processes writing, such as the web server and the `run_jobs`
+    workers, a transaction that reads before writing cannot wait for the lock: it
+    fails at once with "database is locked" when another process writes, as
+    waiting could deadlock. `BEGIN IMMEDIATE` makes it wait up to the `timeout` of
+    the connection instead, like the `transaction_mode` option of Django 5.1.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
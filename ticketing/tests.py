@@ -0,0 +1,325 @@
+import datetime
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from matches.models import Match, Seat, Team
+from stadiums.models import Stadium
+from ticketing import admission, jsonstream
+from ticketing.admission import AdmissionController, MovingAverage
+from ticketing.middleware import AdmissionMiddleware, CompressionMiddleware
+from ticketing.paginator import EstimatedCountPaginator
+from ticketing.renderers import FastJSONRenderer
+from ticketing.schema import CachedSchemaView
+
+
+class CachedSchemaViewTest(APITestCase):
+    def setUp(self):
+        self.endpoint = "/swagger.json"
+
+        CachedSchemaView._cache.clear()
+        self.addCleanup(CachedSchemaView._cache.clear)
+
+        self.super_user = User.objects.create_superuser(username="super_user")
+        self.client.force_authenticate(user=self.super_user)
+
+    def test_schema_is_generated_once(self):
+        with mock.patch.object(
+            CachedSchemaView.generator_class,
+            "get_schema",
+            autospec=True,
+            side_effect=CachedSchemaView.generator_class.get_schema,
+        ) as get_schema:
+            first = self.client.get(self.endpoint)
+            second = self.client.get(self.endpoint)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(get_schema.call_count, 1)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "other.example"])
+    def test_schema_does_not_depend_on_the_host(self):
+        first = self.client.get(self.endpoint)
+        second = self.client.get(self.endpoint, HTTP_HOST="other.example")
+
+        self.assertEqual(first.content, second.content)
+        self.assertNotIn("host", first.json())
+
+    def test_schema_not_modified(self):
+        etag = self.client.get(self.endpoint)["ETag"]
+
+        response = self.client.get(self.endpoint, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_served_from_artifact(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            artifact = Path(artifact_dir) / "openapi.json"
+            artifact.write_bytes(b'{"swagger": "2.0"}')
+
+            with override_settings(OPENAPI_SCHEMA_FILE=artifact):
+                response = self.client.get(self.endpoint)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+
+
+class EstimatedCountPaginatorTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        for day in range(1, 31):
+            Match.objects.create(
+                stadium=stadium,
+                home_side=self.team_1,
+                away_side=self.team_2,
+                match_day=f"2024-01-{day:02}",
+                match_time="15:00:00",
+            )
+
+    def test_estimates_unfiltered_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        paginator = EstimatedCountPaginator(Match.objects.order_by("id"), 5)
+        paginator.exact_count_limit = 10
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 30)
+        self.assertFalse(any("COUNT" in query["sql"] for query in queries))
+
+    def test_caps_filtered_count(self):
+        paginator = EstimatedCountPaginator(
+            Match.objects.filter(match_day__gte="2024-01-11").order_by("id"), 5
+        )
+        paginator.exact_count_limit = 10
+        self.assertEqual(paginator.count, 10)
+
+        paginator = EstimatedCountPaginator(
+            Match.objects.filter(match_day__gte="2024-01-26").order_by("id"), 5
+        )
+        self.assertEqual(paginator.count, 5)
+
+
+class FastJSONRendererTest(TestCase):
+    def test_render_like_json_renderer(self):
+        data = {
+            "day": datetime.date(2024, 1, 1),
+            "at": datetime.datetime(2024, 1, 1, 15, tzinfo=datetime.timezone.utc),
+            "errors": {0: {"gate": ["This field is required."]}},
+        }
+
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+
+class CompressionMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.team_1, self.team_2 = Team.objects.bulk_create(
+            [Team(name="Team 1"), Team(name="Team 2")]
+        )
+        self.user = User.objects.create_user(username="user")
+        self.client.force_authenticate(user=self.user)
+        stadium = Stadium.objects.create(name="some_stadium", location="some_city")
+        match = Match.objects.create(
+            stadium=stadium,
+            home_side=self.team_1,
+            away_side=self.team_2,
+            match_day="2024-01-01",
+            match_time="15:00:00",
+        )
+        Seat.objects.bulk_create(
+            Seat(match=match, seat_number=number) for number in range(1, 101)
+        )
+        self.endpoint = f"/api/matches/match/{match.id}/seat-map/"
+
+    def test_gzip(self):
+        response = self.client.get(self.endpoint, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 100)
+
+    def test_not_accepted(self):
+        response = self.client.get(self.endpoint)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(response.json()), 100)
+
+    @override_settings(COMPRESSION_MIN_SIZE=1_000_000)
+    def test_below_min_size(self):
+        response = self.client.get(self.endpoint, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @override_settings(COMPRESSION_MIN_SIZE=1)
+    def test_html_is_not_compressed(self):
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+        response = self.client.get("/admin/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streaming(self):
+        def rows():
+            for number in range(1000):
+                yield f"{number},seat\n".encode()
+
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(rows(), content_type="text/csv")
+        )
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+        response = middleware(request)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            b"".join(rows()),
+        )
+
+
+class AdmissionControllerTest(TestCase):
+    def _controller(self, **kwargs) -> AdmissionController:
+        return AdmissionController(
+            **{
+                "db_latency_target": 0.1,
+                "request_latency_target": 1.0,
+                "initial_limit": 4,
+                "min_limit": 2,
+                "max_limit": 8,
+                "low_priority_share": 0.5,
+                **kwargs,
+            }
+        )
+
+    def test_limits(self):
+        controller = self._controller()
+
+        self.assertTrue(controller.admit(admission.LOW))
+        self.assertTrue(controller.admit(admission.LOW))
+        self.assertFalse(controller.admit(admission.LOW))
+        self.assertTrue(controller.admit(admission.NORMAL))
+        self.assertTrue(controller.admit(admission.NORMAL))
+        self.assertFalse(controller.admit(admission.NORMAL))
+        self.assertTrue(controller.admit(admission.CRITICAL))
+        self.assertEqual(controller.in_flight, 5)
+
+    def test_overload_sheds_low_priority_and_decreases_limit(self):
+        controller = self._controller()
+        controller.observe_query(0.5)
+
+        self.assertFalse(controller.admit(admission.LOW))
+        self.assertTrue(controller.admit(admission.NORMAL))
+        controller.release(0.01)
+        self.assertAlmostEqual(controller.limit, 3.6)
+
+    def test_limit_increases_on_target(self):
+        controller = self._controller()
+        for _ in range(4):
+            controller.admit(admission.NORMAL)
+            controller.release(0.01)
+        self.assertGreater(controller.limit, 4.9)
+
+    def test_moving_average_forgets_idle_periods(self):
+        average = MovingAverage(alpha=0.5, window=5)
+        average.add(1.0, now=0)
+        average.add(0.0, now=1)
+        self.assertEqual(average.value(now=1), 0.5)
+        self.assertEqual(average.value(now=7), 0.0)
+
+
+@override_settings(ADMISSION_DB_LATENCY_TARGET=0)
+class AdmissionMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user")
+        self.client.force_authenticate(user=self.user)
+
+    def test_sheds_low_priority_when_overloaded(self):
+        # Any query exceeds the target, so the first listing overloads the worker.
+        self.assertEqual(self.client.get("/api/matches/").status_code, 200)
+
+        response = self.client.get("/api/matches/")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "5")
+
+        response = self.client.post("/api/reservation/reserve/", {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_streaming_response_is_released_when_closed(self):
+        middleware = AdmissionMiddleware(
+            lambda request: StreamingHttpResponse(iter([b"a", b"b"]))
+        )
+        request = RequestFactory().get("/")
+        request.resolver_match = mock.Mock(view_name="export")
+
+        self.assertIsNone(middleware.process_view(request, None, (), {}))
+        response = middleware(request)
+        self.assertEqual(b"".join(response), b"ab")
+        self.assertEqual(middleware.controller.in_flight, 1)
+
+        response.close()
+        self.assertEqual(middleware.controller.in_flight, 0)
+
+    @override_settings(ADMISSION_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            AdmissionMiddleware(lambda request: None)
+
+
+class JSONStreamTest(TestCase):
+    def stream(self, text: str, chunk_size: int = 3):
+        # Reads in tiny chunks, so values and characters span chunks.
+        stream = io.BytesIO(text.encode())
+        return mock.Mock(read=lambda size: stream.read(chunk_size))
+
+    def test_iter_json_array(self):
+        text = '{"match": {"id": 1}, "seats": [{"seat_number": 12}, {"n": "é"}]}'
+        self.assertEqual(
+            list(jsonstream.iter_json_array(self.stream(text), key="seats")),
+            [{"seat_number": 12}, {"n": "é"}],
+        )
+        self.assertEqual(
+            list(jsonstream.iter_json_array(self.stream(" [1, 23 ,456] "))),
+            [1, 23, 456],
+        )
+        self.assertEqual(list(jsonstream.iter_json_array(self.stream("[]"))), [])
+
+    def test_iter_ndjson(self):
+        text = '{"seat_number": 1}\n\n{"seat_number": 20}\n30'
+        self.assertEqual(
+            list(jsonstream.iter_ndjson(self.stream(text))),
+            [{"seat_number": 1}, {"seat_number": 20}, 30],
+        )
+
+    def test_malformed_input_is_not_buffered(self):
+        # Unterminated, so every chunk leaves the value incomplete.
+        body = io.BytesIO(b'[{"seat_number": "' + b"x" * 10_000_000)
+        reader = jsonstream.JSONStreamReader(body, chunk_size=64 * 1024)
+
+        with self.assertRaisesMessage(jsonstream.JSONStreamError, "Value longer"):
+            list(reader.array())
+
+        self.assertLessEqual(reader.peak_size, 5 * 64 * 1024)
+        self.assertLess(body.tell(), 1_000_000)
+
+    def test_malformed(self):
+        for text in ['{"seats": [1, 2', "[1 2]", "[1] 2", '{"seats": 1}', "1"]:
+            with self.subTest(text=text), self.assertRaises(jsonstream.JSONStreamError):
+                list(jsonstream.iter_json_array(self.stream(text), key="seats"))
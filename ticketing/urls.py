@@ -1,39 +1,25 @@
-from django.contrib import admin
-from django.urls import include, path, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Volleyball Ticketing API",
-        default_version="v1",
-        description="Volleyball Ticketing API description",
-    ),
-    public=True,
-    permission_classes=(
-        permissions.AllowAny,
-        permissions.IsAuthenticated,
-        permissions.IsAdminUser,
-    ),
-)
+from django.conf import settings
+from django.urls import include, path
 
+from monitoring.views import MetricsView
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/auth/", include("authentication.urls")),
     path("api/stadiums/", include("stadiums.urls")),
     path("api/matches/", include("matches.urls")),
     path("api/reservation/", include("reservation.urls")),
-    re_path(
-        r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
-        name="schema-json",
-    ),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("api/jobs/", include("jobs.urls")),
 ]
+
+if settings.ENABLE_METRICS:
+    urlpatterns.append(path("metrics", MetricsView.as_view(), name="metrics"))
+
+# The admin and the API documentation are only imported when enabled, so API-only
+# workers do not pay for them at start-up.
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
+
+if settings.ENABLE_DOCS:
+    urlpatterns.append(path("", include("ticketing.docs_urls")))